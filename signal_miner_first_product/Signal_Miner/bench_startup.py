@@ -0,0 +1,96 @@
+"""Startup time of the CLIs and of the modules the dashboard imports.
+
+    python bench_startup.py
+    python bench_startup.py --runs 7 --budget-ms 500
+
+Every measurement runs in a fresh interpreter. Module rows come from
+`python -X importtime -c "import <module>"`: the module's cumulative
+import time and its slowest direct imports. CLI rows are wall-clock
+times of `--help`, interpreter start included. Medians over `--runs`;
+exits non-zero when any median exceeds `--budget-ms`.
+"""
+import argparse
+import os
+import statistics
+import subprocess  # nosec B404
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MODULES = ["signal_miner", "executor.pr_executor", "rfg.generate_pack", "rfg.pinecone_helper", "store.run_store",
+           "store.jobs"]
+
+CLIS = [
+    ["signal_miner.py", "--help"],
+    ["-m", "executor.pr_executor", "--help"],
+    ["-m", "rfg.generate_pack", "--help"],
+]
+
+
+def parse_importtime(stderr, module):
+    """(cumulative us, [(direct import, cumulative us)]) for `module` from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        indent = len(name) - len(name.lstrip(" ")) - 1
+        rows.append((indent, name.strip(), int(cumulative)))
+    for i in range(len(rows) - 1, -1, -1):
+        if rows[i][0] == 0 and rows[i][1] == module:
+            children = []
+            # children are printed before their parent, two spaces deeper
+            for indent, name, us in reversed(rows[:i]):
+                if indent == 0:
+                    break
+                if indent == 2:
+                    children.append((name, us))
+            return rows[i][2], sorted(children, key=lambda c: -c[1])
+    raise RuntimeError(f"{module} not found in importtime output")
+
+
+def time_import(module):
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],  # nosec B603
+                          cwd=HERE, capture_output=True, text=True, check=True)
+    return parse_importtime(proc.stderr, module)
+
+
+def time_cli(args):
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=HERE, capture_output=True, check=True)  # nosec B603
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark import and CLI startup time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if any median exceeds this")
+    parser.add_argument("--top", type=int, default=3, help="slowest direct imports to list per module")
+    args = parser.parse_args()
+
+    medians = {}
+    print(f"{'target':<40} {'median ms':>10}  slowest direct imports (ms)")
+    for module in MODULES:
+        runs = [time_import(module) for _ in range(args.runs)]
+        median = statistics.median(us for us, _ in runs) / 1000
+        slowest = ", ".join(f"{name} {us / 1000:.0f}" for name, us in runs[-1][1][:args.top])
+        medians[f"import {module}"] = median
+        print(f"{'import ' + module:<40} {median:>10.1f}  {slowest}")
+    for cli in CLIS:
+        median = statistics.median(time_cli(cli) for _ in range(args.runs)) * 1000
+        label = " ".join(cli)
+        medians[label] = median
+        print(f"{label:<40} {median:>10.1f}")
+
+    if args.budget_ms is not None:
+        over = [label for label, ms in medians.items() if ms > args.budget_ms]
+        if over:
+            print(f"Over the {args.budget_ms:.0f} ms budget: {', '.join(over)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
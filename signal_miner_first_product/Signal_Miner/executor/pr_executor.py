@@ -1,4 +1,3 @@
-import json
 import os
 import re
 import time
@@ -6,6 +5,12 @@ from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional, Tuple
 from urllib.parse import urlparse
 
+from store.serialization import PrPreview, dump, dumps, load, validate
+
+# PyGithub is only needed to open a real PR; it is imported on first use so
+# previews and `--help` never load it (tests patch this name)
+Github = None
+
 
 def now_stamp() -> str:
     return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
@@ -24,12 +29,11 @@ def load_decision_pack(pack_path: str) -> Dict[str, Any]:
     if not os.path.exists(pack_path):
         raise FileNotFoundError(f"Decision Pack not found: {pack_path}")
     
-    with open(pack_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return load(pack_path, Dict[str, Any])
 
 
 def generate_pr_content(pack: Dict[str, Any], domain: str) -> Dict[str, Any]:
-    """Generate PR content from Decision Pack"""
+    """Generate PR content from Decision Pack, checked against PrPreview"""
     title = pack.get("title", f"Growth experiment for {domain}")
     slug = slugify(title)
     stamp = now_stamp()
@@ -46,7 +50,7 @@ def generate_pr_content(pack: Dict[str, Any], domain: str) -> Dict[str, Any]:
     
     commit_message = f"Add growth experiment: {title}\n\nHypothesis: {hypothesis[:100]}...\nExpected: {lift_text}"
     
-    return {
+    return validate({
         "branch_name": branch_name,
         "title": title,
         "files": {
@@ -57,7 +61,7 @@ def generate_pr_content(pack: Dict[str, Any], domain: str) -> Dict[str, Any]:
         "domain": domain,
         "slug": slug,
         "stamp": stamp
-    }
+    }, PrPreview)
 
 
 def load_pr_template() -> str:
@@ -96,10 +100,12 @@ This PR implements a growth experiment based on competitor signal analysis.
 def create_github_pr(content: Dict[str, Any], pack: Dict[str, Any], lp_html: str, 
                     github_token: str, repo: str) -> str:
     """Create GitHub PR using API"""
-    try:
-        from github import Github
-    except ImportError:
-        raise ImportError("PyGithub not installed. Run: pip install PyGithub")
+    global Github
+    if Github is None:
+        try:
+            from github import Github
+        except ImportError:
+            raise ImportError("PyGithub not installed. Run: pip install PyGithub")
     
     g = Github(github_token)
     
@@ -133,7 +139,7 @@ def create_github_pr(content: Dict[str, Any], pack: Dict[str, Any], lp_html: str
     
     # Create files
     files_to_create = {
-        content["files"]["decision_pack"]: json.dumps(pack, indent=2),
+        content["files"]["decision_pack"]: dumps(pack, pretty=True),
         content["files"]["landing_page"]: lp_html
     }
     
@@ -175,11 +181,11 @@ def create_github_pr(content: Dict[str, Any], pack: Dict[str, Any], lp_html: str
 
 def write_preview(content: Dict[str, Any], pack: Dict[str, Any], lp_html: str, 
                  output_dir: str) -> str:
-    """Write PR preview to JSON file"""
+    """Write PR preview to JSON file (checked against PrPreview first, SchemaError if malformed)"""
     os.makedirs(output_dir, exist_ok=True)
     
     # Create diff-like content
-    pack_diff = f"+++ {content['files']['decision_pack']}\n{json.dumps(pack, indent=2)}"
+    pack_diff = f"+++ {content['files']['decision_pack']}\n{dumps(pack, pretty=True)}"
     lp_diff = f"+++ {content['files']['landing_page']}\n{lp_html}"
     
     preview = {
@@ -201,15 +207,15 @@ def write_preview(content: Dict[str, Any], pack: Dict[str, Any], lp_html: str,
     filename = f"{content['slug']}_pr_preview.json"
     filepath = os.path.join(output_dir, filename)
     
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(preview, f, ensure_ascii=False, indent=2)
+    dump(validate(preview, PrPreview), filepath, pretty=True)
     
     return filepath
 
 
 def preview_or_create_pr(pack_path: str, lp_html: str, domain: str, 
                         github_token: Optional[str] = None, 
-                        github_repo: Optional[str] = None) -> Dict[str, Any]:
+                        github_repo: Optional[str] = None,
+                        db_path: Optional[str] = None) -> Dict[str, Any]:
     """
     Main function to preview or create PR
     
@@ -219,7 +225,20 @@ def preview_or_create_pr(pack_path: str, lp_html: str, domain: str,
         - mode: "preview" or "pr_created"
         - message: str
         - url: str (for PR) or filepath (for preview)
+
+    With `db_path` the outcome is also recorded in the run store, linked
+    to the decision pack saved at `pack_path`.
     """
+    result = _preview_or_create_pr(pack_path, lp_html, domain, github_token, github_repo)
+    if db_path:
+        from store.run_store import RunStore
+        with RunStore(db_path) as store:
+            store.record_pr_result(domain, result, pack_path=pack_path)
+    return result
+
+
+def _preview_or_create_pr(pack_path: str, lp_html: str, domain: str,
+                          github_token: Optional[str], github_repo: Optional[str]) -> Dict[str, Any]:
     try:
         # Load decision pack
         pack = load_decision_pack(pack_path)
@@ -272,7 +291,7 @@ def preview_or_create_pr(pack_path: str, lp_html: str, domain: str,
 
 
 if __name__ == "__main__":
-    # CLI for testing
+    # CLI for testing: python -m executor.pr_executor pack.json (from Signal_Miner/)
     import argparse
     
     parser = argparse.ArgumentParser(description="PR Executor for GrowthSignal")
@@ -296,4 +315,4 @@ if __name__ == "__main__":
         args.github_repo
     )
     
-    print(json.dumps(result, indent=2))
+    print(dumps(result, pretty=True))
@@ -0,0 +1,90 @@
+"""Benchmark the price engine against the legacy PRICE_RE pass on stored snapshots.
+
+    python -m miner.bench_prices "output/snapshots/*.html" --repeat 50
+
+Parsing is the same for both and is done once up front. Columns:
+  legacy pass   old extract_generic body (headlines, lists, PRICE_RE on 40 texts)
+  new pass      extract_signals (same, plus the price engine over the whole text)
+  regex/full    PRICE_RE alone over the whole document text
+  engine/full   extract_prices alone over the same text
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from miner.prices import extract_prices  # noqa: E402
+from signal_miner import extract_signals  # noqa: E402
+
+# The pattern extract_generic used before the price engine, kept verbatim for comparison
+LEGACY_PRICE_RE = re.compile(r'(\$\s?\d{1,3}(?:[,\d{3}])*(?:\.\d{2})?)')
+
+
+def legacy_signals(soup):
+    texts = []
+    for tag in soup.find_all(["h1", "h2", "h3", "p"]):
+        t = tag.get_text(strip=True)
+        if t and len(t.split()) > 3:
+            texts.append(t)
+        if len(texts) >= 40:
+            break
+    lists = []
+    for ul in soup.find_all(["ul", "ol"]):
+        items = [li.get_text(strip=True) for li in ul.find_all("li") if li.get_text(strip=True)]
+        if items:
+            lists.append(items)
+        if len(lists) >= 10:
+            break
+    prices = sorted({m.strip() for m in LEGACY_PRICE_RE.findall(" ".join(texts))})
+    return {"headlines_paragraphs": texts[:40], "lists": lists[:10], "prices": prices}
+
+
+def legacy_regex(text):
+    return sorted({m.strip() for m in LEGACY_PRICE_RE.findall(text)})
+
+
+def timed(fn, arg, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        out = fn(arg)
+    return (time.perf_counter() - t0) / repeat, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark price extraction over HTML snapshots")
+    parser.add_argument("pattern", nargs="?", default="output/snapshots/*.html", help="glob of snapshot files")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(args.pattern))
+    if not paths:
+        raise SystemExit(f"No snapshots match {args.pattern}")
+
+    totals = [0.0, 0.0, 0.0, 0.0]
+    print(f"{'snapshot':<44} {'legacy pass':>12} {'new pass':>10} {'regex/full':>11} {'engine/full':>12} "
+          f"{'prices old/new':>15}")
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            soup = BeautifulSoup(f.read(), "html.parser")
+        text = soup.get_text(" ")
+        t_old, old = timed(legacy_signals, soup, args.repeat)
+        t_new, new = timed(extract_signals, soup, args.repeat)
+        t_re, _ = timed(legacy_regex, text, args.repeat * 10)
+        t_engine, _ = timed(extract_prices, text, args.repeat * 10)
+        for i, t in enumerate((t_old, t_new, t_re, t_engine)):
+            totals[i] += t
+        name = path.replace("\\", "/").rsplit("/", 1)[-1][:44]
+        print(f"{name:<44} {t_old * 1e3:>10.2f}ms {t_new * 1e3:>8.2f}ms {t_re * 1e6:>9.1f}us {t_engine * 1e6:>10.1f}us "
+              f"{len(old['prices']):>7}/{len(new['prices']):<7}")
+    print(f"{'total':<44} {totals[0] * 1e3:>10.2f}ms {totals[1] * 1e3:>8.2f}ms {totals[2] * 1e6:>9.1f}us "
+          f"{totals[3] * 1e6:>10.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Consumes a successful streamed response: reader(url, response) -> result
+Reader = Callable[[str, requests.Response], Any]
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, with bursts up to `burst`.
+
+    `reserve` always takes a token, letting the balance go negative, and
+    returns how long the caller must wait for it. Callers that wait that
+    long are served in reservation order without polling the bucket again.
+    """
+
+    def __init__(self, rate: float, burst: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.clock = clock
+        self.updated = clock()
+
+    def reserve(self) -> float:
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class RobotsCache:
+    """Per-host robots.txt rules, fetched once and kept for `ttl` seconds.
+
+    Follows urllib.robotparser's reading of status codes: 401/403 disallow
+    everything, other 4xx allow everything. Network errors and 5xx also
+    allow everything but are cached for `error_ttl` only, so a host that
+    was briefly down is re-checked soon.
+    """
+
+    def __init__(self, session: requests.Session, user_agent: str, ttl: float = 3600.0,
+                 error_ttl: float = 300.0, timeout: float = 10.0):
+        self.session = session
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.timeout = timeout
+        self._rules: Dict[str, Tuple[float, RobotFileParser]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _fetch(self, origin: str) -> Tuple[float, RobotFileParser]:
+        parser = RobotFileParser(origin + "/robots.txt")
+        try:
+            r = self.session.get(parser.url, timeout=self.timeout, headers={"User-Agent": self.user_agent})
+        except requests.RequestException:
+            parser.allow_all = True
+            return self.error_ttl, parser
+        if r.status_code in (401, 403):
+            parser.disallow_all = True
+        elif r.status_code >= 500:
+            parser.allow_all = True
+            return self.error_ttl, parser
+        elif r.status_code >= 400:
+            parser.allow_all = True
+        else:
+            parser.parse(r.text.splitlines())
+        return self.ttl, parser
+
+    def rules(self, url: str) -> RobotFileParser:
+        parts = urlparse(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            host_lock = self._locks.setdefault(origin, threading.Lock())
+        # one fetch per host even when several workers ask at once
+        with host_lock:
+            cached = self._rules.get(origin)
+            if cached is None or cached[0] < time.monotonic():
+                ttl, parser = self._fetch(origin)
+                cached = (time.monotonic() + ttl, parser)
+                self._rules[origin] = cached
+        return cached[1]
+
+    def allowed(self, url: str) -> bool:
+        return self.rules(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url: str) -> Optional[float]:
+        rules = self.rules(url)
+        delay = rules.crawl_delay(self.user_agent)
+        if delay is None:
+            rate = rules.request_rate(self.user_agent)
+            delay = rate.seconds / rate.requests if rate else None
+        return float(delay) if delay is not None else None
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CrawlScheduler:
+    """Polite concurrent fetcher.
+
+    Pending fetches sit in a heap ordered by the time they may next be
+    sent. Each host has a token bucket (`rate` requests/second, `burst`),
+    slowed further to the robots.txt Crawl-delay when one is set, so a
+    single host is never hammered while requests to other hosts proceed
+    in parallel on the worker pool. 429 and 5xx responses and connection
+    errors are retried with exponential backoff, honouring Retry-After up
+    to `max_backoff` seconds.
+
+    Fetch results are page text on success or `{"error": ...}`, matching
+    `safe_request`.
+    """
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None, rate: float = 1.0, burst: float = 2.0,
+                 max_workers: int = 8, retries: int = 3, backoff: float = 1.0, max_backoff: float = 60.0,
+                 timeout: Any = (5, 12), respect_robots: bool = True,
+                 session: Optional[requests.Session] = None):
+        self.headers = dict(headers or {})
+        self.rate = rate
+        self.burst = burst
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.respect_robots = respect_robots
+        self.session = session or self._make_session(max_workers)
+        self.robots = RobotsCache(self.session, self.headers.get("User-Agent", "*"))
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+
+    @staticmethod
+    def _make_session(max_workers: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _load_host(self, url: str) -> TokenBucket:
+        """Create the host's bucket, paced to robots.txt Crawl-delay / Request-rate if set"""
+        rate, burst = self.rate, self.burst
+        if self.respect_robots:
+            delay = self.robots.crawl_delay(url)
+            if delay:
+                rate, burst = min(rate, 1.0 / delay), 1.0
+        with self._lock:
+            return self._buckets.setdefault(urlparse(url).netloc.lower(), TokenBucket(rate, burst))
+
+    @staticmethod
+    def _check(url: str, r: requests.Response) -> Tuple[Optional[Dict[str, str]], Optional[float]]:
+        """(error dict or None, retry delay if the error is retryable)"""
+        if r.status_code in RETRY_STATUSES:
+            delay = retry_after_seconds(r.headers.get("Retry-After"))
+            return {"error": f"HTTP {r.status_code} for url: {url}"}, delay if delay is not None else 0.0
+        try:
+            r.raise_for_status()
+        except requests.HTTPError as e:
+            return {"error": str(e)}, None
+        return None, None
+
+    def _attempt(self, url: str, reader: Optional[Reader] = None) -> Tuple[Any, Optional[float]]:
+        """One request: (result or error dict, retry delay if the failure is retryable)"""
+        if self.respect_robots and not self.robots.allowed(url):
+            return {"error": "Disallowed by robots.txt"}, None
+        try:
+            r = self.session.get(url, headers=self.headers, timeout=self.timeout, stream=reader is not None)
+            if reader is None:
+                error, retry_after = self._check(url, r)
+                return (error or r.text), retry_after
+            with r:  # a streamed response holds its connection until closed
+                error, retry_after = self._check(url, r)
+                return (error or reader(url, r)), retry_after
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            return {"error": str(e)}, 0.0
+        except requests.RequestException as e:
+            return {"error": str(e)}, None
+
+    def _backoff(self, attempt: int, retry_after: float) -> float:
+        delay = min(self.max_backoff, self.backoff * (2 ** attempt)) * random.uniform(0.5, 1.0)  # nosec B311
+        # a server asking for hours (or a far-off Retry-After date) must not stall the whole crawl
+        return min(self.max_backoff, max(delay, retry_after))
+
+    def crawl(self, urls: Iterable[str], reader: Optional[Reader] = None) -> Iterator[Tuple[str, Any]]:
+        """Fetch every URL politely, yielding (url, result or error dict) as each finishes.
+
+        The result is the page text, or with `reader` the response is
+        requested with `stream=True` and the result is whatever `reader`
+        returns for it. An exception raised by `reader` becomes that URL's
+        `{"error": ...}` and is not retried. A URL given more than once is
+        fetched and yielded once.
+        """
+        # entries are (due, seq, url, attempt, reserved): `reserved` means the host
+        # token was already taken and the fetch starts as soon as it is due
+        heap = []
+        for url in dict.fromkeys(urls):
+            heapq.heappush(heap, (0.0, next(self._seq), url, 0, False))
+        # URLs of hosts whose robots.txt is still loading
+        parked: Dict[str, List[Tuple[str, int]]] = {}
+        in_flight: Dict[Any, Tuple[str, str, int]] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="crawl") as pool:
+            while heap or in_flight:
+                now = time.monotonic()
+                while heap and heap[0][0] <= now and len(in_flight) < self.max_workers:
+                    _, _, url, attempt, reserved = heapq.heappop(heap)
+                    if not reserved:
+                        host = urlparse(url).netloc.lower()
+                        with self._lock:
+                            bucket = None if host in parked else self._buckets.get(host)
+                            wait_s = bucket.reserve() if bucket else 0.0
+                        if bucket is None:
+                            # the host's pace depends on its robots.txt, so load that first
+                            if host not in parked:
+                                parked[host] = []
+                                in_flight[pool.submit(self._load_host, url)] = ("host", host, 0)
+                            parked[host].append((url, attempt))
+                            continue
+                        if wait_s > 0:
+                            heapq.heappush(heap, (now + wait_s, next(self._seq), url, attempt, True))
+                            continue
+                    in_flight[pool.submit(self._attempt, url, reader)] = ("fetch", url, attempt)
+                if not in_flight:
+                    time.sleep(max(0.0, heap[0][0] - time.monotonic()))
+                    continue
+                if len(in_flight) >= self.max_workers or not heap:
+                    # nothing can start until a fetch finishes
+                    timeout = None
+                else:
+                    # every due entry was dispatched above, so the head is the next one to come due
+                    timeout = max(0.0, heap[0][0] - time.monotonic())
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    kind, target, attempt = in_flight.pop(future)
+                    if kind == "host":
+                        future.result()
+                        for url, parked_attempt in parked.pop(target):
+                            heapq.heappush(heap, (0.0, next(self._seq), url, parked_attempt, False))
+                        continue
+                    try:
+                        result, retry_after = future.result()
+                    except Exception as e:
+                        # requests errors are handled in _attempt; anything else is a reader bug for this page
+                        result, retry_after = {"error": f"{type(e).__name__}: {e}"}, None
+                    if retry_after is not None and attempt < self.retries:
+                        due = time.monotonic() + self._backoff(attempt, retry_after)
+                        heapq.heappush(heap, (due, next(self._seq), target, attempt + 1, False))
+                    else:
+                        yield target, result
+
+    def fetch(self, url: str, reader: Optional[Reader] = None) -> Any:
+        """Fetch a single URL with the same politeness and retry rules"""
+        for _, result in self.crawl([url], reader):
+            return result
+        return {"error": f"No result for {url}"}
@@ -0,0 +1,217 @@
+"""Long-running miner: re-crawls each URL on its own interval in one warm process.
+
+The allowlist is the URL file (`url.txt`), one URL per line with an
+optional refresh interval:
+
+    https://news.ycombinator.com/   15m
+    https://openai.com/research     1d
+    https://techcrunch.com/startups/
+
+URLs without one use the daemon's default interval. The file is re-read
+whenever its modification time or size changes: new URLs are mined right
+away, removed ones are dropped from the schedule and changed intervals
+apply from the URL's last crawl.
+
+One crawler (HTTP connection pool, robots.txt cache, per-host pacing),
+the site extractor registry and the run index connection live for the
+whole process, so a cycle only pays for the fetches themselves.
+"""
+import heapq
+import os
+import re
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import signal_miner
+from store.run_store import RunStore, default_db_path
+
+DEFAULT_INTERVAL = 3600.0
+RETRY_INTERVAL = 300.0
+RELOAD_CHECK = 5.0
+
+UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+INTERVAL_RE = re.compile(r"^(\d+(?:\.\d+)?)([smhd]?)$")
+
+
+def parse_interval(text: str) -> float:
+    """Seconds in "90", "90s", "15m", "6h" or "1d" """
+    match = INTERVAL_RE.match(text.strip().lower())
+    if not match:
+        raise ValueError(f"Invalid interval {text!r}, expected e.g. 900, 15m, 6h or 1d")
+    seconds = float(match.group(1)) * UNITS[match.group(2) or "s"]
+    if seconds <= 0:
+        raise ValueError(f"Interval must be positive, got {text!r}")
+    return seconds
+
+
+def load_allowlist(path: str, default_interval: Optional[float] = None) -> Dict[str, Optional[float]]:
+    """URL -> refresh interval (`default_interval` when the line has none), in file order"""
+    urls: Dict[str, Optional[float]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parts = line.split()
+            if len(parts) > 2:
+                raise ValueError(f"{path}:{number}: expected 'URL [interval]'")
+            interval = parse_interval(parts[1]) if len(parts) == 2 else default_interval
+            urls.setdefault(parts[0], interval)
+    return urls
+
+
+class MinerDaemon:
+    """Scheduled re-crawls of an allowlist file.
+
+    `tick()` does one pass (reload the allowlist if it changed, mine every
+    due URL) and returns the per-site results; `run()` loops until `stop()`.
+    A failed fetch is retried after `retry_interval` rather than the URL's
+    full interval; so is a URL whose crawl or result write raised, which is
+    logged without stopping the other URLs or the loop.
+    """
+
+    def __init__(self, urls_file: str, out_dir: str = "output", limit: int = 5,
+                 default_interval: float = DEFAULT_INTERVAL, retry_interval: float = RETRY_INTERVAL,
+                 reload_check: float = RELOAD_CHECK, crawler=None, reader=None, warehouse=None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.urls_file = urls_file
+        self.out_dir = out_dir
+        self.limit = limit
+        self.default_interval = default_interval
+        self.retry_interval = retry_interval
+        self.reload_check = reload_check
+        self.crawler = crawler or signal_miner.shared_crawler()
+        self.reader = reader
+        self.warehouse = warehouse
+        self.clock = clock
+        os.makedirs(out_dir, exist_ok=True)
+        self.run_index = RunStore(default_db_path(out_dir))
+        self.intervals: Dict[str, float] = {}
+        self.last_crawl: Dict[str, float] = {}
+        # (due, url); entries whose due time no longer matches `self.due` are stale
+        self.heap: List[Tuple[float, str]] = []
+        self.due: Dict[str, float] = {}
+        self._file_state: Optional[Tuple[float, int]] = None
+        self._next_reload = 0.0
+        self._stop = threading.Event()
+
+    def close(self) -> None:
+        self.run_index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _schedule(self, url: str, due: float) -> None:
+        self.due[url] = due
+        heapq.heappush(self.heap, (due, url))
+
+    def _reschedule(self, url: str, failed: bool) -> None:
+        if url not in self.intervals:
+            return
+        finished = self.clock()
+        self.last_crawl[url] = finished
+        interval = self.intervals[url]
+        self._schedule(url, finished + (min(self.retry_interval, interval) if failed else interval))
+
+    def reload(self, force: bool = False) -> bool:
+        """Re-read the allowlist if the file changed; returns whether it was applied"""
+        try:
+            st = os.stat(self.urls_file)
+        except FileNotFoundError:
+            return False
+        state = (st.st_mtime, st.st_size)
+        if not force and state == self._file_state:
+            return False
+        try:
+            urls = load_allowlist(self.urls_file, self.default_interval)
+        except ValueError as e:
+            # keep the current schedule until the file is fixed
+            print(f"[WARN] Allowlist not reloaded: {e}")
+            self._file_state = state
+            return False
+        self._file_state = state
+        now = self.clock()
+        for url in set(self.intervals) - set(urls):
+            del self.intervals[url]
+            self.due.pop(url, None)
+            self.last_crawl.pop(url, None)
+        for url, interval in urls.items():
+            if url not in self.intervals:
+                self._schedule(url, now)
+            elif interval != self.intervals[url] and url in self.last_crawl:
+                self._schedule(url, self.last_crawl[url] + interval)
+            self.intervals[url] = interval
+        return True
+
+    def due_urls(self) -> List[str]:
+        now = self.clock()
+        urls = []
+        while self.heap and self.heap[0][0] <= now:
+            due, url = heapq.heappop(self.heap)
+            if self.due.get(url) == due:
+                del self.due[url]
+                urls.append(url)
+        return urls
+
+    def next_wakeup(self) -> float:
+        """Seconds until a URL is due or the allowlist should be checked again"""
+        while self.heap and self.due.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+        wake = self._next_reload
+        if self.heap:
+            wake = min(wake, self.heap[0][0])
+        return max(0.0, wake - self.clock())
+
+    def tick(self) -> List[Dict[str, Any]]:
+        now = self.clock()
+        if now >= self._next_reload:
+            self.reload()
+            self._next_reload = now + self.reload_check
+        urls = self.due_urls()
+        results = []
+        if not urls:
+            return results
+        pending = dict.fromkeys(urls)
+        try:
+            for url, res in self.crawler.crawl(urls, self.reader):
+                pending.pop(url, None)
+                try:
+                    r = signal_miner.site_result(url, res, limit=self.limit, out_dir=self.out_dir)
+                    signal_miner.write_site_result(r, self.out_dir, self.run_index)
+                    if self.warehouse is not None:
+                        self.warehouse.append_run(r)
+                except Exception as e:
+                    print(f"[WARN] {url} not recorded, retrying in {self.retry_interval:g}s: {type(e).__name__}: {e}")
+                    self._reschedule(url, failed=True)
+                    continue
+                self._reschedule(url, failed=bool(r["error"]))
+                results.append(r)
+        except Exception as e:
+            # the crawl itself stopped; whatever it had not yielded yet is retried
+            print(f"[WARN] Crawl failed, retrying {len(pending)} URLs in {self.retry_interval:g}s: "
+                  f"{type(e).__name__}: {e}")
+        for url in pending:
+            self._reschedule(url, failed=True)
+        return results
+
+    def run(self, on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> None:
+        """Mine on schedule until `stop()` (also called on SIGINT/SIGTERM from the main thread)"""
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, lambda *_: self.stop())
+        while not self._stop.is_set():
+            for r in self.tick():
+                if on_result is not None:
+                    try:
+                        on_result(r)
+                    except Exception as e:
+                        print(f"[WARN] on_result failed for {r['url']}: {type(e).__name__}: {e}")
+            self._stop.wait(self.next_wakeup())
+
+    def stop(self) -> None:
+        self._stop.set()
@@ -0,0 +1,115 @@
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+import soupsieve
+from bs4 import BeautifulSoup
+
+Extractor = Callable[[str], Dict[str, Any]]
+
+BUILTIN_SITES_PATH = os.path.join(os.path.dirname(__file__), "sites.json")
+
+
+def normalize_host(netloc: str) -> str:
+    host = netloc.lower().rsplit("@", 1)[-1].split(":", 1)[0]
+    return host[4:] if host.startswith("www.") else host
+
+
+class SelectorRule:
+    """One output key of a site config, with its CSS selectors compiled up front"""
+
+    __slots__ = ("key", "select", "items", "attr", "limit", "min_words")
+
+    def __init__(self, key: str, select: str, items: Optional[str] = None, attr: Optional[str] = None,
+                 limit: int = 20, min_words: int = 0):
+        self.key = key
+        self.select = soupsieve.compile(select)
+        self.items = soupsieve.compile(items) if items else None
+        self.attr = attr
+        self.limit = limit
+        self.min_words = min_words
+
+    def _text(self, el) -> str:
+        value = el.get(self.attr) if self.attr else el.get_text(strip=True)
+        return (value or "").strip()
+
+    def apply(self, soup) -> List[Any]:
+        out: List[Any] = []
+        for el in self.select.iselect(soup):
+            if self.items is not None:
+                # container rule: one list of item texts per matched element
+                value = [t for t in (self._text(i) for i in self.items.iselect(el)) if t]
+            else:
+                value = self._text(el)
+                if len(value.split()) < self.min_words:
+                    value = ""
+            if value:
+                out.append(value)
+            if len(out) >= self.limit:
+                break
+        return out
+
+
+class SelectorPlan:
+    """Declarative site extractor: parse once, then run each compiled rule"""
+
+    def __init__(self, rules: List[SelectorRule]):
+        self.rules = rules
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Dict[str, Any]]) -> "SelectorPlan":
+        return cls([SelectorRule(key, **spec) for key, spec in config.items()])
+
+    def __call__(self, html: str) -> Dict[str, Any]:
+        soup = BeautifulSoup(html, "html.parser")
+        return {rule.key: rule.apply(soup) for rule in self.rules}
+
+
+class ExtractorRegistry:
+    """Maps domains to extractors.
+
+    Patterns are either an exact host ("news.ycombinator.com") or a
+    wildcard for subdomains ("*.example.com"). Both are stored in one dict,
+    so resolving a host costs one lookup per label rather than a scan over
+    every registered pattern, and results are memoised per host.
+    """
+
+    def __init__(self, default: Extractor):
+        self.default = default
+        self._patterns: Dict[str, Extractor] = {}
+        self._resolved: Dict[str, Extractor] = {}
+
+    def register(self, pattern: str, extractor: Extractor) -> None:
+        self._patterns[normalize_host(pattern)] = extractor
+        self._resolved.clear()
+
+    def __contains__(self, pattern: str) -> bool:
+        return normalize_host(pattern) in self._patterns
+
+    def resolve(self, netloc: str) -> Extractor:
+        host = normalize_host(netloc)
+        extractor = self._resolved.get(host)
+        if extractor is None:
+            extractor = self._patterns.get(host)
+            labels = host.split(".")
+            for i in range(1, len(labels)):
+                if extractor is not None:
+                    break
+                extractor = self._patterns.get("*." + ".".join(labels[i:]))
+            extractor = extractor or self.default
+            self._resolved[host] = extractor
+        return extractor
+
+
+def load_site_configs(path: str) -> Dict[str, Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_registry(default: Extractor, config_paths: Optional[List[str]] = None) -> ExtractorRegistry:
+    """Compile the built-in site configs plus any extra config files (later files win)"""
+    registry = ExtractorRegistry(default)
+    for path in [BUILTIN_SITES_PATH] + list(config_paths or []):
+        for pattern, config in load_site_configs(path).items():
+            registry.register(pattern, SelectorPlan.from_config(config))
+    return registry
@@ -0,0 +1,172 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+CURRENCY_CODES = {"$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "₹": "INR"}
+
+# Letters written in front of "$" that name a different dollar ("C$20", "US$20")
+DOLLAR_PREFIXES = {"US": "USD", "C": "CAD", "CA": "CAD", "A": "AUD", "AU": "AUD", "NZ": "NZD", "HK": "HKD", "S": "SGD"}
+
+ISO_CODES = ["USD", "EUR", "GBP", "CAD", "AUD", "NZD", "HKD", "SGD", "INR", "JPY"]
+
+# Optional parts are written `(?:...|)`, not `(?:...)?`: `re` runs an
+# optional group through its general repeat machinery, an empty
+# alternative is a plain branch. Absent parts therefore match "", not None.
+QUALIFIER = (
+    r"(?:\s*(?:/|per\s+|a\s+|an\s+|each\s+)\s*"
+    r"(?P<{name}>month|mo|year|yr|annum|week|wk|day|hour|hr|seat|user|member|editor|agent|licen[cs]e)s?\b|)"
+)
+# Code and period/unit qualifiers after the price ("USD", "/mo per seat")
+PRICE_TAIL = (
+    r"(?:\s?(?P<code>" + "|".join(ISO_CODES) + r")\b|)"
+    + QUALIFIER.format(name="q1")
+    + QUALIFIER.format(name="q2")
+)
+# Amounts after the symbol: "1,299.99" or, with a decimal comma, "1.299,00"
+# and "12,50". A comma followed by three digits is always a thousands
+# separator ("$2,5000" is 2).
+PRICE_BODY = (
+    r"\s?(?P<amount>\d{1,3}(?=,\d{3})(?:,\d{3})+(?!\d)"
+    r"|\d{1,3}(?=\.\d{3})(?:\.\d{3})+(?=,\d{1,2}(?!\d))|\d+)"
+    r"(?P<cents>\.\d{1,2}|,\d{1,2}(?!\d)|)(?P<mult>[kKmM]\b|)"
+    + PRICE_TAIL
+)
+# Amounts written before the symbol ("1 299 €", "49,90 €"), matched at the
+# end of a short window that stops at the symbol; groups of three digits
+# may be separated by a space, a no-break space, "." or ",".
+TRAILING_AMOUNT = (
+    r"(?<![\d.,])(?P<amount>\d{1,3}(?P<sep>[ \u00a0\u202f.,])\d{3}(?:(?P=sep)\d{3})*(?!\d)|\d+)"
+    r"(?P<cents>[.,]\d{1,2}|)[^\S\n]?\Z"
+)
+TRAILING_WINDOW = 32
+
+# The symbols are found with `str.find` and PRICE_RE is matched, anchored,
+# right after each of them: a symbol class or alternation in front of it
+# would make `re` test every position of the text, about six times the
+# cost of the legacy `\$` scan.
+PRICE_RE = re.compile(PRICE_BODY)
+TRAILING_RE = re.compile(TRAILING_AMOUNT)
+TAIL_RE = re.compile(PRICE_TAIL)
+NON_DIGITS = re.compile(r"\D")
+
+PLAN_NAMES = {
+    "Free", "Hobby", "Personal", "Individual", "Starter", "Basic", "Essentials", "Standard", "Plus",
+    "Pro", "Professional", "Premium", "Team", "Teams", "Growth", "Startup", "Scale", "Business",
+    "Enterprise", "Ultimate",
+}
+PLAN_PUNCTUATION = ":;,.!?()[]|-–—\"'"
+
+PERIODS = {
+    "month": "month", "mo": "month", "year": "year", "yr": "year", "annum": "year",
+    "week": "week", "wk": "week", "day": "day", "hour": "hour", "hr": "hour",
+}
+UNITS = {"seat": "seat", "user": "user", "member": "member", "editor": "editor", "agent": "agent",
+         "license": "license", "licence": "license"}
+MULTIPLIERS = {"k": 1_000, "m": 1_000_000}
+
+# How far back from a price to look for the plan name it belongs to. The
+# search also stops at the previous price and at a blank line (a block
+# boundary in `get_text` output), so a name labels only the first price
+# after it within its block.
+PLAN_WINDOW = 120
+
+
+def _plan_before(text: str, start: int, floor: int = 0) -> Optional[str]:
+    # line by line with rfind, so the words before a blank line are never
+    # split; str.split and a set lookup per word are far cheaper than a
+    # word-bounded alternation, which `re` would try at every position
+    lo = max(floor, start - PLAN_WINDOW)
+    end = start
+    while end > lo:
+        newline = text.rfind("\n", lo, end)
+        words = text[newline + 1 if newline != -1 else lo:end].split()
+        if not words and end != start:
+            return None
+        for word in reversed(words):
+            if word in PLAN_NAMES:
+                return word
+            word = word.strip(PLAN_PUNCTUATION)
+            if word in PLAN_NAMES:
+                return word
+        if newline == -1:
+            return None
+        end = newline
+    return None
+
+
+def _symbols(text: str) -> List[Tuple[int, str]]:
+    """(position, symbol) of every currency symbol in the text, in order"""
+    found = []
+    for marker in CURRENCY_CODES:
+        i = text.find(marker)
+        while i != -1:
+            found.append((i, marker))
+            i = text.find(marker, i + 1)
+    if len(found) > 1:
+        found.sort()
+    return found
+
+
+def extract_prices(text: str) -> List[Dict[str, Any]]:
+    """Structured price records from document text, in document order.
+
+    Each record has `raw`, `amount`, `currency`, `period` ("month", "year",
+    ... or None), `unit` ("seat", "user", ... or None) and `plan` (a plan
+    name between the previous price and this one, in the same block, or
+    None). Duplicate offers are reported once.
+    """
+    records: List[Dict[str, Any]] = []
+    seen = set()
+    floor = 0
+    match = PRICE_RE.match
+    for start, marker in _symbols(text):
+        m = None
+        # "49 €", "1 299 €": digits right before a symbol that no digit follows
+        before = text[start - 1:start]
+        if ((before.isdigit() or before.isspace() and text[start - 2:start - 1].isdigit())
+                and not text[start + 1:start + 2].isdigit()):
+            m = TRAILING_RE.search(text, max(floor, start - TRAILING_WINDOW), start)
+        if m is not None:
+            digits, _, cents = m.groups()
+            tail = TAIL_RE.match(text, start + 1)
+            mult = ""
+            code, q1, q2 = tail.groups()
+            start, end = m.start(), tail.end()
+        else:
+            m = match(text, start + 1)
+            if m is None:
+                continue
+            digits, cents, mult, code, q1, q2 = m.groups()
+            end = m.end()
+        if not digits.isdigit():
+            digits = NON_DIGITS.sub("", digits)
+        amount = float(digits + "." + cents[1:] if cents else digits)
+        if mult:
+            amount *= MULTIPLIERS[mult.lower()]
+        period = unit = None
+        if q1:
+            period = PERIODS.get(q1) or PERIODS.get(q2)
+            unit = UNITS.get(q1) or UNITS.get(q2)
+        currency = code or CURRENCY_CODES[marker]
+        if not code and marker == "$" and start and text[start - 1].isalpha():
+            prefix = text[max(0, start - 2):start]
+            currency = DOLLAR_PREFIXES.get(prefix if prefix.isalpha() else prefix[-1], currency)
+        plan = _plan_before(text, start, floor)
+        floor = end
+        key = (plan, amount, currency, period, unit)
+        if key in seen:
+            continue
+        seen.add(key)
+        records.append({
+            "raw": " ".join(text[start:floor].split()),
+            "amount": amount,
+            "currency": currency,
+            "period": period,
+            "unit": unit,
+            "plan": plan,
+        })
+    return records
+
+
+def format_price(record: Dict[str, Any]) -> str:
+    """Short display string, e.g. "Pro: $29/mo per seat" """
+    return f"{record['plan']}: {record['raw']}" if record.get("plan") else record["raw"]
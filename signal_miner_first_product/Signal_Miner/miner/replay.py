@@ -0,0 +1,173 @@
+"""Replay: re-extract signals from stored HTML snapshots, without the network.
+
+After an extractor change, `signal_miner.py --replay` runs every snapshot
+in `output/snapshots/` (optionally a `--since`/`--until` date range and
+one `--domain`) through the current site extractors and rewrites the
+signals of the run that saved it:
+
+    python signal_miner.py --replay --since 2025-01-01 --until 2025-03-31
+    python signal_miner.py --replay --domain openai.com --sites my_sites.json
+
+Snapshots are `{domain}_{YYYYMMDDTHHMMSSZ}.html`, optionally compressed
+(`.html.gz`, `.html.bz2`, `.html.xz`); the range is read from the name,
+so skipped files are never opened. Parsing runs in `--workers` processes
+that each read their own files and send back only the signals; the
+parent is the single writer to the run store. A snapshot with no run
+recorded (e.g. from before the run store) becomes a new run stamped
+with the snapshot time. Per-site JSON files are rewritten when they
+hold the replayed run.
+"""
+import bz2
+import gzip
+import lzma
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+import signal_miner
+from store.run_store import RunStore, default_db_path
+from store.serialization import dump, load
+
+OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+SNAPSHOT_RE = re.compile(r"^(?P<domain>.+)_(?P<stamp>\d{8}T\d{6}Z)\.html(?P<ext>\.gz|\.bz2|\.xz)?$")
+STAMP_FORMAT = "%Y%m%dT%H%M%SZ"
+
+
+class Snapshot(NamedTuple):
+    path: str
+    domain: str
+    stamp: str
+
+    @property
+    def key(self) -> str:
+        return snapshot_key(self.path)
+
+    @property
+    def timestamp(self) -> str:
+        return datetime.strptime(self.stamp, STAMP_FORMAT).replace(tzinfo=timezone.utc).isoformat()
+
+
+def snapshot_key(path: str) -> str:
+    """File name without a compression suffix; a run matches its snapshot whether or not it was compressed since"""
+    name = os.path.basename(path)
+    stem, ext = os.path.splitext(name)
+    return stem if ext in OPENERS else name
+
+
+def stamp_bound(day: Optional[str], end: bool = False) -> Optional[str]:
+    """A YYYY-MM-DD (or YYYY-MM-DDTHH:MM:SS) bound in snapshot-name form; `end` makes a day inclusive"""
+    if not day:
+        return None
+    digits = re.sub(r"[^0-9]", "", day)[:14]
+    if len(digits) < 8:
+        raise ValueError(f"Invalid date {day!r}, expected YYYY-MM-DD")
+    digits = digits.ljust(14, "9" if end else "0")
+    return f"{digits[:8]}T{digits[8:]}Z"
+
+
+def find_snapshots(snapshots_dir: str, since: Optional[str] = None, until: Optional[str] = None,
+                   domain: Optional[str] = None) -> List[Snapshot]:
+    """Snapshots in the inclusive date range, oldest first; an uncompressed copy wins over a compressed one"""
+    low, high = stamp_bound(since), stamp_bound(until, end=True)
+    found: Dict[str, Snapshot] = {}
+    if not os.path.isdir(snapshots_dir):
+        return []
+    for name in os.listdir(snapshots_dir):
+        match = SNAPSHOT_RE.match(name)
+        if not match:
+            continue
+        snap = Snapshot(os.path.join(snapshots_dir, name), match.group("domain"), match.group("stamp"))
+        if (domain and snap.domain != domain) or (low and snap.stamp < low) or (high and snap.stamp > high):
+            continue
+        if snap.key not in found or not match.group("ext"):
+            found[snap.key] = snap
+    return sorted(found.values(), key=lambda s: (s.stamp, s.domain))
+
+
+def read_snapshot(path: str) -> str:
+    opener = OPENERS.get(os.path.splitext(path)[1], open)
+    with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _init_worker(sites: Sequence[str]) -> None:
+    if sites:
+        signal_miner.site_extractors(list(sites))
+
+
+def extract_snapshot(task) -> Dict[str, Any]:
+    """Worker: (path, host, limit) -> {"signals": ...} or {"error": ...}"""
+    path, host, limit = task
+    try:
+        parsed = signal_miner.site_extractors().resolve(host)(read_snapshot(path))
+    except Exception as exc:
+        return {"error": f"{type(exc).__name__}: {exc}"}
+    return {"signals": {k: v[:limit] if isinstance(v, list) else v for k, v in parsed.items()}}
+
+
+def replay(output_dir: str = "output", since: Optional[str] = None, until: Optional[str] = None,
+           domain: Optional[str] = None, limit: int = 5, workers: Optional[int] = None,
+           sites: Sequence[str] = (), on_result=None) -> Dict[str, int]:
+    """Re-extract and rewrite the runs of matching snapshots.
+
+    Returns counts: `replayed` snapshots, runs whose signals `changed`,
+    runs `added` for snapshots without one, and snapshots that `failed`.
+    Runs whose signals come out the same are left untouched.
+    `on_result(result, status)` is called for each snapshot.
+    """
+    snapshots = find_snapshots(os.path.join(output_dir, "snapshots"), since, until, domain)
+    stats = {"replayed": 0, "changed": 0, "added": 0, "failed": 0}
+    if not snapshots:
+        return stats
+    tasks = [(s.path, s.domain, limit) for s in snapshots]
+    with RunStore(default_db_path(output_dir)) as store:
+        runs = {snapshot_key(row["snapshot"]): (row["id"], row["path"]) for row in store.conn.execute(
+            "SELECT id, snapshot, path FROM runs WHERE snapshot IS NOT NULL")}
+        # workers parse ahead while the previous results are loaded and written here, one at a time
+        for snap, extracted in zip(snapshots, _extract_all(tasks, workers, sites)):
+            if "error" in extracted:
+                stats["failed"] += 1
+                if on_result:
+                    on_result({"domain": snap.domain, "snapshot": snap.path, "error": extracted["error"]}, "failed")
+                continue
+            stats["replayed"] += 1
+            run_id, path = runs.get(snap.key, (None, None))
+            previous = store.load_result(run_id) if run_id is not None else None
+            if previous is None:
+                result = {"url": None, "domain": snap.domain, "timestamp": snap.timestamp, "error": None,
+                          "snapshot": snap.path, "signals": extracted["signals"]}
+                status = "added"
+            else:
+                result = dict(previous, signals=extracted["signals"])
+                status = "changed" if previous.get("signals") != result["signals"] else "unchanged"
+            if status != "unchanged":
+                stats[status] += 1
+                result["replayed_at"] = signal_miner.now_utc_iso()
+                store.record_run(result, path)
+                if path and _holds_run(path, result["timestamp"]):
+                    dump(result, path)
+            if on_result:
+                on_result(result, status)
+    return stats
+
+
+def _extract_all(tasks: List[tuple], workers: Optional[int], sites: Sequence[str]) -> Iterator[Dict[str, Any]]:
+    if workers is not None and workers <= 1:
+        _init_worker(sites)
+        yield from map(extract_snapshot, tasks)
+        return
+    # chunks amortise inter-process round trips while keeping every worker busy to the end
+    chunksize = max(1, min(32, len(tasks) // (4 * (workers or os.cpu_count() or 1))))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tuple(sites),)) as pool:
+        yield from pool.map(extract_snapshot, tasks, chunksize=chunksize)
+
+
+def _holds_run(path: str, timestamp: str) -> bool:
+    """Whether the per-site file at `path` is the result of this run (it only keeps the domain's latest)"""
+    try:
+        item = load(path)
+    except (OSError, ValueError):
+        return False
+    return isinstance(item, dict) and item.get("timestamp") == timestamp
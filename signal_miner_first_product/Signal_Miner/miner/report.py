@@ -0,0 +1,167 @@
+"""Signals report (signals.md, optionally signals.html) rendered incrementally.
+
+Each domain's section body (its error or its truncated snippets) is
+cached in a small SQLite file next to the report, keyed by a hash of
+exactly what the body shows: the error and the first `ITEMS_SHOWN`
+items of each non-empty signal type. A run whose shown items did not
+change reuses the cached body; only changed domains are re-rendered.
+The report is streamed to disk section by section, never built in
+memory. The Markdown output is the same as before caching.
+"""
+import hashlib
+import html
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from store.serialization import dumps
+
+ITEMS_SHOWN = 6
+SNIPPET_CHARS = 220
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    domain TEXT PRIMARY KEY,
+    hash TEXT NOT NULL,
+    markdown TEXT NOT NULL,
+    html TEXT
+);
+"""
+
+HTML_HEAD = ("<!DOCTYPE html>\n<html lang=\"en\">\n<head><meta charset=\"UTF-8\"><title>Signals Report</title></head>\n"
+             "<body>\n<h1>Signals Report</h1>\n")
+
+
+def default_cache_path(output_dir: str) -> str:
+    return os.path.join(output_dir, "report_cache.db")
+
+
+def now_utc_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def snippet(item: Any) -> str:
+    # list items (UL/OL groups) are joined
+    text = "; ".join(item) if isinstance(item, list) else str(item)
+    text = text.replace("\n", " ")
+    return text[:SNIPPET_CHARS - 3] + "..." if len(text) > SNIPPET_CHARS else text
+
+
+def shown(result: Dict[str, Any]) -> Tuple[Optional[str], List[Tuple[str, List[Any]]]]:
+    """What a section body displays: the error, or the first items of each non-empty signal type"""
+    if result.get("error"):
+        return result["error"], []
+    return None, [(key, items[:ITEMS_SHOWN]) for key, items in (result.get("signals") or {}).items() if items]
+
+
+def section_hash(result: Dict[str, Any]) -> str:
+    return hashlib.blake2b(dumps(shown(result)).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def markdown_body(result: Dict[str, Any]) -> str:
+    error, signals = shown(result)
+    if error:
+        return "\n".join([f"- **Error:** {error}\n", "\n---\n"])
+    lines = []
+    for key, items in signals:
+        lines.append(f"### {key}\n")
+        lines += [f"{i}. {snippet(it)}\n" for i, it in enumerate(items, 1)]
+    lines.append("\n---\n")
+    return "\n".join(lines)
+
+
+def html_body(result: Dict[str, Any]) -> str:
+    error, signals = shown(result)
+    if error:
+        return f"<p><strong>Error:</strong> {html.escape(str(error))}</p>\n<hr>\n"
+    parts = []
+    for key, items in signals:
+        parts.append(f"<h3>{html.escape(key)}</h3>\n<ol>\n")
+        parts += [f"  <li>{html.escape(snippet(it))}</li>\n" for it in items]
+        parts.append("</ol>\n")
+    parts.append("<hr>\n")
+    return "".join(parts)
+
+
+class ReportWriter:
+    """Writes the report for a list of per-site results, reusing cached section bodies.
+
+    `write()` returns counts of domains `rendered` and `reused`.
+    """
+
+    def __init__(self, md_path: str, cache_path: Optional[str] = None, html_path: Optional[str] = None):
+        self.md_path = md_path
+        self.html_path = html_path
+        self.cache_path = cache_path or default_cache_path(os.path.dirname(md_path) or ".")
+        parent = os.path.dirname(self.cache_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.conn = sqlite3.connect(self.cache_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def sections(self, results: Iterable[Dict[str, Any]], stats: Dict[str, int]):
+        """(result, markdown body, html body or None) per result; bodies come from the cache when unchanged"""
+        cached = {row[0]: row[1:] for row in self.conn.execute("SELECT domain, hash, markdown, html FROM sections")}
+        updates = []
+        for r in results:
+            domain = r.get("domain", "unknown")
+            digest = section_hash(r)
+            entry = cached.get(domain)
+            if entry and entry[0] == digest and (self.html_path is None or entry[2] is not None):
+                stats["reused"] += 1
+                yield r, entry[1], entry[2]
+                continue
+            md = markdown_body(r)
+            body = html_body(r) if self.html_path else None
+            stats["rendered"] += 1
+            updates.append((domain, digest, md, body))
+            cached[domain] = (digest, md, body)
+            yield r, md, body
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO sections (domain, hash, markdown, html) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (domain) DO UPDATE SET hash = excluded.hash, markdown = excluded.markdown, "
+                "html = excluded.html",
+                updates,
+            )
+
+    def write(self, results: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        stats = {"rendered": 0, "reused": 0}
+        generated = now_utc_iso()
+        md = open(self.md_path, "w", encoding="utf-8")
+        page = open(self.html_path, "w", encoding="utf-8") if self.html_path else None
+        try:
+            md.write("\n".join(["# Signals Report\n", f"_Generated: {generated}_\n"]))
+            if page:
+                page.write(HTML_HEAD + f"<p><em>Generated: {html.escape(generated)}</em></p>\n")
+            for r, md_body, page_body in self.sections(results, stats):
+                header = [f"## {r.get('domain')}\n", f"- URL: {r.get('url')}\n", f"- Timestamp: {r.get('timestamp')}\n"]
+                md.write("\n" + "\n".join(header) + "\n" + md_body)
+                if page:
+                    page.write(f"<h2>{html.escape(str(r.get('domain')))}</h2>\n<ul>\n"
+                               f"  <li>URL: {html.escape(str(r.get('url')))}</li>\n"
+                               f"  <li>Timestamp: {html.escape(str(r.get('timestamp')))}</li>\n</ul>\n" + page_body)
+            if page:
+                page.write("</body>\n</html>\n")
+        finally:
+            md.close()
+            if page:
+                page.close()
+        return stats
+
+
+def write_report(results: Iterable[Dict[str, Any]], md_path: str, html_path: Optional[str] = None,
+                 cache_path: Optional[str] = None) -> Dict[str, int]:
+    with ReportWriter(md_path, cache_path=cache_path, html_path=html_path) as writer:
+        return writer.write(results)
@@ -0,0 +1,224 @@
+import codecs
+import os
+import re
+import time
+from html.parser import HTMLParser
+from typing import Any, Callable, Dict, List, Optional
+
+from miner.prices import extract_prices, format_price
+
+TEXT_TAGS = {"h1", "h2", "h3", "p"}
+LIST_TAGS = {"ul", "ol"}
+# contents that bs4's get_text leaves out
+SKIP_TAGS = {"script", "style", "template"}
+
+META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([A-Za-z0-9_.:-]+)""", re.I)
+
+# stop reasons
+LIMITS_MET, MAX_BYTES, MAX_SECONDS = "limits", "max_bytes", "max_seconds"
+
+
+class StreamLimits:
+    """Budgets for one streamed page"""
+
+    def __init__(self, max_bytes: int = 5_000_000, max_seconds: float = 20.0, max_texts: int = 40,
+                 max_lists: int = 10, chunk_size: int = 16_384):
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.max_texts = max_texts
+        self.max_lists = max_lists
+        self.chunk_size = chunk_size
+
+
+class SignalParser(HTMLParser):
+    """Incremental equivalent of `extract_signals`, fed one chunk at a time.
+
+    Headline/paragraph texts and list items are collected the way
+    `tag.get_text(strip=True)` would see them, and visible text is kept for
+    the price engine. `done` turns true once the text and list limits are
+    met, so the caller can stop reading the response.
+    """
+
+    def __init__(self, max_texts: int = 40, max_lists: int = 10):
+        super().__init__(convert_charrefs=True)
+        self.max_texts = max_texts
+        self.max_lists = max_lists
+        self.texts: List[str] = []
+        self.visible: List[str] = []
+        self._pending: List[str] = []
+        # [tag, parts, item slots] for open h1-h3/p/li; an li reserves its slot in every
+        # open list when it starts, so items keep start-tag order like find_all("li")
+        self._open: List[List[Any]] = []
+        self._lists: List[List[Optional[str]]] = []  # open ul/ol item lists
+        self._list_slots: List[List[Optional[str]]] = []  # every ul/ol in start-tag order
+        self._filled = 0
+        self._skip = 0
+
+    @property
+    def lists(self) -> List[List[str]]:
+        lists = ([i for i in items if i is not None] for items in self._list_slots)
+        return [items for items in lists if items][:self.max_lists]
+
+    @property
+    def done(self) -> bool:
+        return len(self.texts) >= self.max_texts and self._filled >= self.max_lists and not self._lists
+
+    def _flush(self) -> None:
+        # text nodes can arrive in pieces; strip the whole node like bs4 does
+        if not self._pending:
+            return
+        data = "".join(self._pending)
+        self._pending.clear()
+        self.visible.append(data)
+        stripped = data.strip()
+        if stripped:
+            for _, parts, _ in self._open:
+                parts.append(stripped)
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip:
+            self._pending.append(data)
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        self._flush()
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag in TEXT_TAGS:
+            self._open.append([tag, [], None])
+        elif tag == "li":
+            slots = []
+            for items in self._lists:
+                slots.append((items, len(items)))
+                items.append(None)
+            self._open.append([tag, [], slots])
+        elif tag in LIST_TAGS:
+            items: List[Optional[str]] = []
+            self._lists.append(items)
+            self._list_slots.append(items)
+
+    def handle_endtag(self, tag: str) -> None:
+        self._flush()
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in TEXT_TAGS or tag == "li":
+            for i in range(len(self._open) - 1, -1, -1):
+                if self._open[i][0] == tag:
+                    for closed in reversed(self._open[i:]):
+                        self._close(*closed)
+                    del self._open[i:]
+                    break
+        elif tag in LIST_TAGS and self._lists:
+            self._close_list()
+
+    def _close_list(self) -> None:
+        if any(item is not None for item in self._lists.pop()):
+            self._filled += 1
+
+    def _close(self, tag: str, parts: List[str], slots) -> None:
+        text = "".join(parts)
+        if tag == "li":
+            if text:
+                for items, index in slots:
+                    items[index] = text
+        elif text and len(text.split()) > 3 and len(self.texts) < self.max_texts:
+            self.texts.append(text)
+
+    def finish(self) -> Dict[str, Any]:
+        """Close whatever is still open (end of input or early stop) and return the signals"""
+        self.close()
+        self._flush()
+        for closed in reversed(self._open):
+            self._close(*closed)
+        self._open.clear()
+        while self._lists:
+            self._close_list()
+        price_records = extract_prices(" ".join(self.visible))
+        return {
+            "headlines_paragraphs": self.texts[:self.max_texts],
+            "lists": self.lists,
+            "prices": [format_price(r) for r in price_records],
+            "price_records": price_records,
+        }
+
+
+class StreamedPage:
+    """Result of a streamed fetch: signals already extracted, snapshot on disk"""
+
+    def __init__(self, signals: Dict[str, Any], snapshot: Optional[str], bytes_read: int, stopped: Optional[str]):
+        self.signals = signals
+        self.snapshot = snapshot
+        self.bytes_read = bytes_read
+        self.stopped = stopped
+
+
+def _encoding(response, head: bytes) -> str:
+    content_type = response.headers.get("Content-Type", "")
+    if "charset=" in content_type.lower() and response.encoding:
+        return response.encoding
+    m = META_CHARSET.search(head)
+    if m:
+        try:
+            return codecs.lookup(m.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def stream_page(response, snapshot_path: Optional[str], limits: Optional[StreamLimits] = None,
+                extractor: Optional[Callable[[str], Dict[str, Any]]] = None) -> StreamedPage:
+    """Read a `stream=True` response chunk by chunk, teeing decoded text to the snapshot.
+
+    Without `extractor` the chunks go straight into a SignalParser and
+    reading stops as soon as its limits are met. A site-specific
+    `extractor` needs the whole document, so the text is buffered (still
+    within the byte and time budgets) and handed over at the end.
+    """
+    limits = limits or StreamLimits()
+    parser = None if extractor else SignalParser(limits.max_texts, limits.max_lists)
+    buffered: List[str] = []
+    decoder = None
+    bytes_read = 0
+    stopped = None
+    started = time.monotonic()
+    out = open(snapshot_path, "w", encoding="utf-8") if snapshot_path else None
+    try:
+        for chunk in response.iter_content(chunk_size=limits.chunk_size):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(_encoding(response, chunk[:4096]))(errors="replace")
+            bytes_read += len(chunk)
+            text = decoder.decode(chunk)
+            if out:
+                out.write(text)
+            if parser is not None:
+                parser.feed(text)
+                if parser.done:
+                    stopped = LIMITS_MET
+                    break
+            else:
+                buffered.append(text)
+            if bytes_read >= limits.max_bytes:
+                stopped = MAX_BYTES
+                break
+            if time.monotonic() - started >= limits.max_seconds:
+                stopped = MAX_SECONDS
+                break
+        if decoder is not None and stopped is None:
+            tail = decoder.decode(b"", final=True)
+            if out:
+                out.write(tail)
+            if parser is not None:
+                parser.feed(tail)
+            else:
+                buffered.append(tail)
+    except BaseException:
+        if out:
+            out.close()
+            os.remove(snapshot_path)  # a failed attempt leaves no partial snapshot behind
+            out = None
+        raise
+    finally:
+        response.close()
+        if out:
+            out.close()
+    signals = parser.finish() if parser is not None else extractor("".join(buffered))
+    return StreamedPage(signals, snapshot_path, bytes_read, stopped)
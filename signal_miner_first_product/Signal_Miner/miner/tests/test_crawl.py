@@ -0,0 +1,175 @@
+import io
+import os
+import sys
+import threading
+import time
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import requests  # noqa: E402
+
+
+def make_response(status, text="", headers=None):
+    r = requests.models.Response()
+    r.status_code = status
+    r._content = text.encode("utf-8")
+    r.encoding = "utf-8"
+    r.headers.update(headers or {})
+    r.url = "http://test"
+    return r
+
+
+class FakeSession:
+    """Serves canned responses per URL and records when each request was made"""
+
+    def __init__(self, routes):
+        self.routes = {url: list(responses) for url, responses in routes.items()}
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        with self.lock:
+            self.calls.append((url, time.monotonic()))
+            responses = self.routes.get(url) or [make_response(404)]
+            return responses.pop(0) if len(responses) > 1 else responses[0]
+
+
+def test_token_bucket_allows_burst_then_paces():
+    """A bucket hands out `burst` tokens at once, then one per 1/rate seconds"""
+    from miner.crawl import TokenBucket
+
+    now = [100.0]
+    bucket = TokenBucket(rate=2.0, burst=2.0, clock=lambda: now[0])
+
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1.0
+    now[0] += 2.0
+    assert bucket.reserve() == 0.0
+
+
+def test_robots_disallow_and_crawl_delay_are_cached():
+    """robots.txt is fetched once per host and its rules apply to every URL there"""
+    from miner.crawl import CrawlScheduler
+
+    session = FakeSession({
+        "http://a.test/robots.txt": [make_response(200, "User-agent: *\nDisallow: /private\nRequest-rate: 5/1\n")],
+        "http://a.test/": [make_response(200, "home")],
+        "http://a.test/about": [make_response(200, "about")],
+        "http://a.test/private/x": [make_response(200, "secret")],
+    })
+    crawler = CrawlScheduler({"User-Agent": "SignalMiner"}, rate=100.0, burst=5.0, session=session)
+
+    results = dict(crawler.crawl(["http://a.test/", "http://a.test/about", "http://a.test/private/x"]))
+
+    assert results["http://a.test/private/x"] == {"error": "Disallowed by robots.txt"}
+    assert results["http://a.test/"] == "home" and results["http://a.test/about"] == "about"
+    page_calls = [t for url, t in session.calls if not url.endswith("robots.txt")]
+    assert [url for url, _ in session.calls].count("http://a.test/robots.txt") == 1
+    assert page_calls[1] - page_calls[0] >= 0.15
+
+
+def test_retries_429_honouring_retry_after():
+    """Throttled and failing responses are retried; permanent errors are not"""
+    from miner.crawl import CrawlScheduler
+
+    session = FakeSession({
+        "http://b.test/": [make_response(429, headers={"Retry-After": "0.1"}), make_response(503),
+                           make_response(200, "ok")],
+        "http://b.test/gone": [make_response(404)],
+    })
+    crawler = CrawlScheduler(rate=100.0, burst=5.0, backoff=0.01, respect_robots=False, session=session)
+
+    results = dict(crawler.crawl(["http://b.test/", "http://b.test/gone"]))
+
+    assert results["http://b.test/"] == "ok"
+    assert "404" in results["http://b.test/gone"]["error"]
+    calls = [t for url, t in session.calls if url == "http://b.test/"]
+    assert len(calls) == 3 and calls[1] - calls[0] >= 0.1
+
+
+def test_retry_after_is_capped_at_max_backoff():
+    """A Retry-After longer than max_backoff waits max_backoff instead"""
+    from miner.crawl import CrawlScheduler
+
+    session = FakeSession({"http://b.test/": [make_response(503, headers={"Retry-After": "3600"}),
+                                              make_response(200, "ok")]})
+    crawler = CrawlScheduler(rate=100.0, burst=5.0, backoff=0.01, max_backoff=0.2, respect_robots=False,
+                             session=session)
+
+    assert crawler._backoff(0, 3600.0) == 0.2
+    started = time.monotonic()
+    assert crawler.fetch("http://b.test/") == "ok"
+    assert time.monotonic() - started < 2.0
+
+
+def test_repeated_urls_are_fetched_once():
+    """A URL listed twice is requested and yielded once"""
+    from miner.crawl import CrawlScheduler
+
+    session = FakeSession({"http://d.test/": [make_response(200, "d")], "http://e.test/": [make_response(200, "e")]})
+    crawler = CrawlScheduler(rate=100.0, burst=5.0, respect_robots=False, session=session)
+
+    results = list(crawler.crawl(["http://d.test/", "http://e.test/", "http://d.test/"]))
+
+    assert sorted(results) == [("http://d.test/", "d"), ("http://e.test/", "e")]
+    assert sorted(url for url, _ in session.calls) == ["http://d.test/", "http://e.test/"]
+
+
+def test_slow_host_does_not_block_other_hosts():
+    """Per-host pacing only delays that host; other hosts proceed in parallel"""
+    from miner.crawl import CrawlScheduler
+
+    routes = {f"http://slow.test/{i}": [make_response(200, str(i))] for i in range(3)}
+    routes.update({f"http://h{i}.test/": [make_response(200, str(i))] for i in range(5)})
+    session = FakeSession(routes)
+    crawler = CrawlScheduler(rate=5.0, burst=1.0, max_workers=4, respect_robots=False, session=session)
+
+    order = [url for url, _ in crawler.crawl(list(routes))]
+
+    assert sorted(order) == sorted(routes)
+    # the two paced slow.test requests come after every other host has been served
+    assert order[-2:] == ["http://slow.test/1", "http://slow.test/2"]
+
+
+def test_full_pool_waits_without_spinning():
+    """With every worker busy and more fetches due, the crawler blocks instead of polling"""
+    from miner.crawl import CrawlScheduler
+
+    class SlowSession(FakeSession):
+        def get(self, url, **kwargs):
+            time.sleep(0.3)
+            return super().get(url, **kwargs)
+
+    routes = {f"http://h{i}.test/": [make_response(200, str(i))] for i in range(4)}
+    crawler = CrawlScheduler(rate=100.0, max_workers=1, respect_robots=False, session=SlowSession(routes))
+
+    wall, cpu = time.monotonic(), time.process_time()
+    assert len(list(crawler.crawl(list(routes)))) == 4
+    wall, cpu = time.monotonic() - wall, time.process_time() - cpu
+
+    assert wall >= 1.2 and cpu < 0.25 * wall
+
+
+def test_reader_exception_becomes_that_urls_error():
+    """A reader that raises on one page yields an error for that URL; the rest of the crawl goes on"""
+    from miner.crawl import CrawlScheduler
+
+    pages = {url: make_response(200, url.rsplit("/", 1)[1]) for url in ("http://c.test/bad", "http://c.test/good")}
+    for r in pages.values():
+        r.raw = io.BytesIO()  # streamed responses are closed after the reader
+    session = FakeSession({url: [r] for url, r in pages.items()})
+    crawler = CrawlScheduler(rate=100.0, burst=5.0, respect_robots=False, session=session)
+
+    def reader(url, r):
+        if url.endswith("bad"):
+            raise UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+        return r.text
+
+    results = dict(crawler.crawl(["http://c.test/bad", "http://c.test/good"], reader))
+
+    assert results["http://c.test/good"] == "good"
+    assert results["http://c.test/bad"]["error"].startswith("UnicodeDecodeError: ")
+    assert [url for url, _ in session.calls].count("http://c.test/bad") == 1
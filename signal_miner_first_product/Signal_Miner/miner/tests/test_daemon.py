@@ -0,0 +1,114 @@
+import os
+import sys
+import tempfile
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+PAGE = "<html><body><h1>Pricing plans for growing teams</h1><p>Pro plan costs $49 per month billed yearly</p></body></html>"
+
+
+class FakeCrawler:
+    """Returns a canned page (or an error for URLs containing 'down') and records each batch"""
+
+    def __init__(self):
+        self.batches = []
+
+    def crawl(self, urls, reader=None):
+        self.batches.append(list(urls))
+        for url in urls:
+            yield url, {"error": "HTTP 503"} if "down" in url else PAGE
+
+
+class RaisingCrawler(FakeCrawler):
+    """Like FakeCrawler, but the crawl raises when it reaches a URL containing 'boom'"""
+
+    def crawl(self, urls, reader=None):
+        self.batches.append(list(urls))
+        for url in urls:
+            if "boom" in url:
+                raise RuntimeError("reader crashed")
+            yield url, PAGE
+
+
+def write_urls(path, lines, mtime):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.utime(path, (mtime, mtime))
+
+
+def test_allowlist_parsing():
+    """Lines are 'URL [interval]', comments and repeats are skipped, bad intervals are rejected"""
+    import pytest
+    from miner.daemon import load_allowlist, parse_interval
+
+    assert [parse_interval(v) for v in ("90", "90s", "15m", "6h", "1d")] == [90, 90, 900, 21600, 86400]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "url.txt")
+        write_urls(path, ["# comment", "https://a.test/ 15m", "", "https://b.test/", "https://a.test/ 1h"], 1)
+        assert load_allowlist(path, 3600) == {"https://a.test/": 900, "https://b.test/": 3600}
+        write_urls(path, ["https://a.test/ soon"], 2)
+        with pytest.raises(ValueError):
+            load_allowlist(path)
+
+
+def test_daemon_schedules_per_url_and_hot_reloads():
+    """Each URL is re-crawled on its own interval and allowlist edits apply without a restart"""
+    from miner.daemon import MinerDaemon
+    from store.run_store import RunStore, default_db_path
+
+    now = [1000.0]
+    crawler = FakeCrawler()
+    with tempfile.TemporaryDirectory() as tmp:
+        urls_file = os.path.join(tmp, "url.txt")
+        out_dir = os.path.join(tmp, "output")
+        write_urls(urls_file, ["https://fast.test/ 60", "https://slow.test/ 600", "https://down.test/"], 1)
+        with MinerDaemon(urls_file, out_dir, default_interval=3600, retry_interval=120, reload_check=10,
+                         crawler=crawler, clock=lambda: now[0]) as daemon:
+            results = daemon.tick()
+            assert sorted(r["domain"] for r in results) == ["down.test", "fast.test", "slow.test"]
+            assert next(r for r in results if r["domain"] == "fast.test")["signals"]["headlines_paragraphs"]
+
+            now[0] += 30
+            assert daemon.tick() == [] and daemon.next_wakeup() == 10
+            now[0] += 30
+            assert [r["url"] for r in daemon.tick()] == ["https://fast.test/"]
+            assert crawler.batches[-1] == ["https://fast.test/"]
+            # the failed fetch is retried after retry_interval, not the default hour
+            now[0] += 60
+            assert sorted(r["url"] for r in daemon.tick()) == ["https://down.test/", "https://fast.test/"]
+
+            # drop slow.test, add new.test, change fast.test to 5 minutes
+            write_urls(urls_file, ["https://fast.test/ 5m", "https://new.test/", "https://down.test/"], 2)
+            now[0] += 10
+            assert [r["url"] for r in daemon.tick()] == ["https://new.test/"]
+            now[0] += 600
+            mined = [r["url"] for r in daemon.tick()]
+            assert "https://slow.test/" not in mined and "https://fast.test/" in mined
+
+        with RunStore(default_db_path(out_dir)) as store:
+            assert store.latest_result("fast.test")["signals"]["headlines_paragraphs"]
+
+
+def test_daemon_retries_urls_when_the_crawl_raises():
+    """A raising crawl is logged; the URLs it did not finish are retried after retry_interval"""
+    from miner.daemon import MinerDaemon
+
+    now = [1000.0]
+    crawler = RaisingCrawler()
+    with tempfile.TemporaryDirectory() as tmp:
+        urls_file = os.path.join(tmp, "url.txt")
+        write_urls(urls_file, ["https://a.test/ 1h", "https://b-boom.test/ 1h", "https://c.test/ 1h"], 1)
+        with MinerDaemon(urls_file, os.path.join(tmp, "output"), retry_interval=120, reload_check=600,
+                         crawler=crawler, clock=lambda: now[0]) as daemon:
+            assert [r["url"] for r in daemon.tick()] == ["https://a.test/"]
+            assert daemon.next_wakeup() == 120
+
+            now[0] += 120
+            assert daemon.tick() == []
+            assert crawler.batches[-1] == ["https://b-boom.test/", "https://c.test/"]
+
+            # once b-boom.test is gone from the allowlist, c.test is mined on its next retry
+            write_urls(urls_file, ["https://a.test/ 1h", "https://c.test/ 1h"], 2)
+            now[0] += 600
+            assert [r["url"] for r in daemon.tick()] == ["https://c.test/"]
@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+import tempfile
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+HN_HTML = """
+<table>
+  <tr><td><span class="titleline"><a href="https://a.example">First story title</a>
+    <span class="sitebit comhead">(<a href="from?site=a.example"><span class="sitestr">a.example</span></a>)</span>
+  </span></td></tr>
+  <tr><td><a class="storylink" href="https://b.example">Legacy markup story</a></td></tr>
+</table>
+"""
+
+
+def generic(html):
+    return {"generic": [html[:5]]}
+
+
+def test_registry_resolves_exact_wildcard_and_default():
+    """Exact hosts win, wildcards cover subdomains, everything else is generic"""
+    from miner.extractors import ExtractorRegistry
+
+    registry = ExtractorRegistry(generic)
+    exact, wildcard = (lambda html: {"exact": []}), (lambda html: {"wild": []})
+    registry.register("shop.example.com", exact)
+    registry.register("*.example.com", wildcard)
+
+    assert registry.resolve("shop.example.com") is exact
+    assert registry.resolve("WWW.shop.example.com:443") is exact
+    assert registry.resolve("blog.eu.example.com") is wildcard
+    assert registry.resolve("example.org") is generic
+    assert "*.example.com" in registry
+
+
+def test_selector_plan_extracts_texts_lists_and_attrs():
+    """Declarative rules support limits, min words, attributes and item lists"""
+    from miner.extractors import SelectorPlan
+
+    plan = SelectorPlan.from_config({
+        "plans": {"select": "div.plan h3", "limit": 2},
+        "features": {"select": "ul.features", "items": "li"},
+        "links": {"select": "a.cta", "attr": "href"},
+        "long": {"select": "p", "min_words": 3},
+    })
+    html = """
+    <div class="plan"><h3>Starter</h3></div><div class="plan"><h3>Pro</h3></div><div class="plan"><h3>Team</h3></div>
+    <ul class="features"><li>SSO</li><li></li><li>Audit log</li></ul>
+    <a class="cta" href="/signup">Sign up</a>
+    <p>Too short</p><p>This one is long enough</p>
+    """
+    out = plan(html)
+    assert out["plans"] == ["Starter", "Pro"]
+    assert out["features"] == [["SSO", "Audit log"]]
+    assert out["links"] == ["/signup"]
+    assert out["long"] == ["This one is long enough"]
+
+
+def test_builtin_hackernews_config_skips_site_links():
+    """Only story links are titles, not the (site) domain links"""
+    import signal_miner
+
+    assert signal_miner.extract_hackernews(HN_HTML) == {
+        "hn_titles": ["First story title", "Legacy markup story"]
+    }
+
+
+def test_extra_config_overrides_builtin():
+    """Config files added at startup register new sites without code changes"""
+    from miner.extractors import build_registry
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "sites.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"*.competitor.io": {"headlines": {"select": "h1"}}}, f)
+        registry = build_registry(generic, [path])
+
+    assert registry.resolve("pricing.competitor.io")("<h1>Plans</h1>") == {"headlines": ["Plans"]}
+    assert registry.resolve("news.ycombinator.com") is not generic
@@ -0,0 +1,90 @@
+import os
+import sys
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+PRICING_HTML = """
+<h1>Simple pricing for every team</h1>
+<table>
+  <tr><th>Starter</th><td>$0</td></tr>
+  <tr><th>Pro</th><td><span>$1,299.99</span> per year</td></tr>
+  <tr><th>Team</th><td>€12 /mo per seat</td></tr>
+</table>
+<ul><li>Enterprise: C$5k per month</li><li>Add-on: £9.50 a user</li></ul>
+"""
+
+
+def test_extract_prices_structured_records():
+    """Amounts, currencies, periods, units and plans are parsed from table and list text"""
+    from bs4 import BeautifulSoup
+    from miner.prices import extract_prices
+
+    records = extract_prices(BeautifulSoup(PRICING_HTML, "html.parser").get_text(" "))
+    by_plan = {r["plan"]: r for r in records}
+
+    assert [r["plan"] for r in records[:4]] == ["Starter", "Pro", "Team", "Enterprise"]
+    assert by_plan["Starter"]["amount"] == 0.0
+    assert by_plan["Pro"]["amount"] == 1299.99 and by_plan["Pro"]["period"] == "year"
+    assert by_plan["Team"] == {"raw": "€12 /mo per seat", "amount": 12.0, "currency": "EUR",
+                               "period": "month", "unit": "seat", "plan": "Team"}
+    assert records[3]["currency"] == "CAD" and records[3]["amount"] == 5000.0
+    assert records[-1]["currency"] == "GBP" and records[-1]["unit"] == "user"
+
+
+def test_extract_prices_does_not_overmatch_digit_runs():
+    """The old character class swallowed any digits and commas after the first group"""
+    from miner.prices import extract_prices
+
+    records = extract_prices("Raised $16.7M, then $2,5000 and $1,250,000 USD in 2024")
+
+    assert [(r["amount"], r["currency"]) for r in records] == [
+        (16_700_000.0, "USD"), (2.0, "USD"), (1_250_000.0, "USD"),
+    ]
+    assert extract_prices("no prices here, just 2024 and 1,000 users") == []
+
+
+def test_extract_prices_reads_european_formats():
+    """Decimal commas, "." or space thousands separators and a symbol after the amount"""
+    from miner.prices import extract_prices
+
+    records = extract_prices("Pro €1.299,00 per year. Team: 1 299 € / mo. Add-on: 12,50 € a user, $2,50")
+
+    assert [(r["raw"], r["amount"], r["currency"], r["period"], r["unit"], r["plan"]) for r in records] == [
+        ("€1.299,00 per year", 1299.0, "EUR", "year", None, "Pro"),
+        ("1 299 € / mo", 1299.0, "EUR", "month", None, "Team"),
+        ("12,50 € a user", 12.5, "EUR", None, "user", None),
+        ("$2,50", 2.5, "USD", None, None, None),
+    ]
+
+
+def test_extract_prices_dedupes_repeated_offers():
+    """The same offer shown twice (e.g. a sticky header) is reported once"""
+    from miner.prices import extract_prices, format_price
+
+    records = extract_prices("Pro $29/mo. Compare plans. Pro $29/mo. Business $99/mo")
+
+    assert [format_price(r) for r in records] == ["Pro: $29/mo", "Business: $99/mo"]
+
+
+def test_plan_name_labels_only_the_next_price_in_its_block():
+    """A plan name is not carried past the price it labels or across a blank line"""
+    from miner.prices import extract_prices
+
+    records = extract_prices("Pro $29/mo, plus $5 per extra seat and €4 a user\nTeam\n  $49/mo\n"
+                             "Enterprise \n \n \n Keychain raises $30M")
+
+    assert [(r["plan"], r["amount"]) for r in records] == [
+        ("Pro", 29.0), (None, 5.0), (None, 4.0), ("Team", 49.0), (None, 30_000_000.0),
+    ]
+
+
+def test_extract_generic_reports_prices_from_lists():
+    """Prices outside headlines and paragraphs are now found"""
+    from signal_miner import extract_generic
+
+    signals = extract_generic(PRICING_HTML)
+
+    assert "Team: €12 /mo per seat" in signals["prices"]
+    assert len(signals["price_records"]) == len(signals["prices"]) == 5
+    assert signals["lists"] == [["Enterprise: C$5k per month", "Add-on: £9.50 a user"]]
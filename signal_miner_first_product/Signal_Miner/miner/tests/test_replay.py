@@ -0,0 +1,73 @@
+import gzip
+import os
+import sys
+import tempfile
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+PAGE = "<h1>Our new pricing for every growing team</h1><ul><li>Pro plan</li><li>Team plan</li></ul>"
+
+
+def write_snapshot(snapshots, name, html, compress=False):
+    path = os.path.join(snapshots, name + (".gz" if compress else ""))
+    with (gzip.open(path, "wt", encoding="utf-8") if compress else open(path, "w", encoding="utf-8")) as f:
+        f.write(html)
+    return path
+
+
+def test_replay_rewrites_runs_in_range():
+    """Snapshots in the date range are re-extracted into their runs; new snapshots become runs"""
+    from miner.replay import find_snapshots, replay
+    from store.run_store import RunStore, default_db_path
+    from store.serialization import dump, load
+
+    with tempfile.TemporaryDirectory() as out:
+        snapshots = os.path.join(out, "snapshots")
+        os.makedirs(snapshots)
+        old = write_snapshot(snapshots, "acme.test_20250102T060000Z.html", PAGE)
+        write_snapshot(snapshots, "acme.test_20250301T060000Z.html", PAGE, compress=True)
+        write_snapshot(snapshots, "acme.test_20241231T235959Z.html", PAGE)
+        per_site = os.path.join(out, "acme.test.json")
+        result = {"url": "https://www.acme.test/", "domain": "acme.test", "timestamp": "2025-01-02T06:00:00+00:00",
+                  "error": None, "snapshot": old, "signals": {"headlines_paragraphs": ["stale extractor output"]}}
+        dump(result, per_site)
+        with RunStore(default_db_path(out)) as store:
+            store.record_run(result, per_site)
+
+        assert [s.stamp for s in find_snapshots(snapshots, since="2025-01-01")] == ["20250102T060000Z",
+                                                                                   "20250301T060000Z"]
+        stats = replay(out, since="2025-01-01", until="2025-03-01", workers=1)
+        assert stats == {"replayed": 2, "changed": 1, "added": 1, "failed": 0}
+
+        with RunStore(default_db_path(out)) as store:
+            assert store.conn.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 2
+            rewritten = store.load_result(store.conn.execute(
+                "SELECT id FROM runs WHERE timestamp = ?", (result["timestamp"],)).fetchone()["id"])
+            latest = store.latest_result("acme.test")
+        assert rewritten["signals"]["headlines_paragraphs"] == ["Our new pricing for every growing team"]
+        assert rewritten["signals"]["lists"] == [["Pro plan", "Team plan"]] and rewritten["replayed_at"]
+        assert latest["timestamp"] == "2025-03-01T06:00:00+00:00" and latest["signals"] == rewritten["signals"]
+        assert load(per_site)["signals"] == rewritten["signals"]
+
+        # a second pass finds nothing to rewrite
+        assert replay(out, since="2025-01-01", until="2025-03-01", workers=1) == {
+            "replayed": 2, "changed": 0, "added": 0, "failed": 0}
+
+
+def test_replay_in_worker_processes():
+    """Worker processes return the same signals and report unreadable snapshots as failed"""
+    from miner.replay import replay
+    from store.run_store import RunStore, default_db_path
+
+    with tempfile.TemporaryDirectory() as out:
+        snapshots = os.path.join(out, "snapshots")
+        os.makedirs(snapshots)
+        for day in range(1, 5):
+            write_snapshot(snapshots, f"site{day}.test_2025010{day}T060000Z.html", PAGE, compress=day % 2 == 0)
+        with open(os.path.join(snapshots, "broken.test_20250105T060000Z.html.gz"), "wb") as f:
+            f.write(b"not gzip")
+        assert replay(out, workers=2) == {"replayed": 4, "changed": 0, "added": 4, "failed": 1}
+        with RunStore(default_db_path(out)) as store:
+            results = [store.latest_result(f"site{day}.test") for day in range(1, 5)]
+        assert all(r["signals"]["lists"] == [["Pro plan", "Team plan"]] for r in results)
@@ -0,0 +1,53 @@
+import os
+import sys
+import tempfile
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def site(domain, headlines, error=None):
+    return {"url": f"https://{domain}/", "domain": domain, "timestamp": "2025-03-01T06:00:00+00:00",
+            "error": error, "signals": {} if error else {"headlines_paragraphs": headlines, "lists": [["a", "b"]],
+                                                         "prices": []}}
+
+
+def test_report_reuses_unchanged_sections():
+    """Only domains whose shown items changed are re-rendered; the report text is the same either way"""
+    from miner.report import write_report
+
+    results = [site("a.test", ["Alpha launch"] + [f"item {i}" for i in range(10)]),
+               site("b.test", ["Beta pricing"]), site("c.test", [], error="timeout")]
+    with tempfile.TemporaryDirectory() as tmp:
+        md_path = os.path.join(tmp, "signals.md")
+        assert write_report(results, md_path) == {"rendered": 3, "reused": 0}
+        with open(md_path, encoding="utf-8") as f:
+            first = f.read()
+        assert "## a.test" in first and "### headlines_paragraphs" in first and "- **Error:** timeout" in first
+        assert "item 5" not in first and "### prices" not in first and "1. a; b" in first
+
+        # an item past the shown ones does not count as a change
+        results[0]["signals"]["headlines_paragraphs"].append("item 99")
+        results[1]["signals"]["headlines_paragraphs"] = ["Beta pricing v2"]
+        assert write_report(results, md_path) == {"rendered": 1, "reused": 2}
+        with open(md_path, encoding="utf-8") as f:
+            second = f.read()
+        assert "Beta pricing v2" in second
+        assert second.split("\n", 3)[3] == first.split("\n", 3)[3].replace("Beta pricing", "Beta pricing v2")
+
+
+def test_report_html_is_escaped_and_cached():
+    """The HTML report escapes snippets and is rendered once per changed section"""
+    from miner.report import write_report
+
+    results = [site("a.test", ["<script>alert(1)</script> & more"])]
+    with tempfile.TemporaryDirectory() as tmp:
+        md_path, html_path = os.path.join(tmp, "signals.md"), os.path.join(tmp, "signals.html")
+        write_report(results, md_path)
+        # sections cached without HTML are rendered again when HTML is asked for
+        assert write_report(results, md_path, html_path) == {"rendered": 1, "reused": 0}
+        assert write_report(results, md_path, html_path) == {"rendered": 0, "reused": 1}
+        with open(html_path, encoding="utf-8") as f:
+            page = f.read()
+        assert "&lt;script&gt;alert(1)&lt;/script&gt; &amp; more" in page and "<script>" not in page
+        assert page.rstrip().endswith("</html>")
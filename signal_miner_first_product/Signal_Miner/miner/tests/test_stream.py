@@ -0,0 +1,98 @@
+import io
+import os
+import sys
+import tempfile
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import requests  # noqa: E402
+
+PAGE = """<html><head><meta charset="utf-8"><script>var x = "<p>not text</p>";</script></head><body>
+<h1>Launch week: pricing for every team size</h1>
+<p>Starts at <b>€12</b> per month for the Team plan &amp; more</p>
+<ul><li>Fast setup</li><li>Nested <ul><li>SSO included</li></ul></li><li></li></ul>
+<p>Too short</p>
+<ol><li>Pro $29/mo</li></ol>
+</body></html>"""
+
+
+class EndlessRaw:
+    """File-like body that never ends: a header chunk, then repeated blocks"""
+
+    def __init__(self, head, block):
+        self.buffer = head
+        self.block = block
+        self.served = 0
+
+    def read(self, n=-1, **kwargs):
+        while len(self.buffer) < n:
+            self.buffer += self.block
+        out, self.buffer = self.buffer[:n], self.buffer[n:]
+        self.served += len(out)
+        return out
+
+    def close(self):
+        pass
+
+
+def make_response(raw, content_type="text/html"):
+    r = requests.models.Response()
+    r.status_code = 200
+    r.raw = raw
+    r.headers["Content-Type"] = content_type
+    r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+    return r
+
+
+def test_chunked_parser_matches_extract_signals():
+    """Feeding the page in tiny chunks gives the same signals as the soup-based extractor"""
+    from bs4 import BeautifulSoup
+    from miner.stream import SignalParser
+    from signal_miner import extract_signals
+
+    parser = SignalParser()
+    for i in range(0, len(PAGE), 7):
+        parser.feed(PAGE[i:i + 7])
+
+    assert parser.finish() == extract_signals(BeautifulSoup(PAGE, "html.parser"))
+
+
+def test_stream_page_stops_when_limits_met_and_writes_snapshot():
+    """An endless page is cut off once 40 texts and 10 lists are collected"""
+    from miner.stream import LIMITS_MET, StreamLimits, stream_page
+
+    block = b"<p>one two three four five</p><ul><li>item</li></ul>"
+    raw = EndlessRaw(b"<html><body>", block)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "snap.html")
+        page = stream_page(make_response(raw), path, StreamLimits(chunk_size=256))
+
+        assert page.stopped == LIMITS_MET
+        assert len(page.signals["headlines_paragraphs"]) == 40 and len(page.signals["lists"]) == 10
+        assert page.bytes_read == raw.served < 5 * len(block) * 40
+        with open(path, encoding="utf-8") as f:
+            assert f.read().startswith("<html><body><p>one two")
+
+
+def test_stream_page_enforces_byte_budget():
+    """Pages with nothing to extract stop at the byte budget"""
+    from miner.stream import MAX_BYTES, StreamLimits, stream_page
+
+    raw = EndlessRaw(b"<html><body>", b"<div>" + b"x" * 1000 + b"</div>")
+    page = stream_page(make_response(raw), None, StreamLimits(max_bytes=50_000, chunk_size=4096))
+
+    assert page.stopped == MAX_BYTES
+    assert 50_000 <= page.bytes_read < 50_000 + 4096
+
+
+def test_stream_page_decodes_declared_charset_and_uses_site_extractor():
+    """A meta charset is honoured and site extractors get the whole document"""
+    from miner.stream import stream_page
+
+    html = '<meta charset="iso-8859-1"><p>Café pricing: £9 a seat</p>'.encode("latin-1")
+    page = stream_page(make_response(io.BytesIO(html)), None,
+                       extractor=lambda text: {"raw": [text]})
+
+    assert page.stopped is None
+    assert page.signals == {"raw": [html.decode("latin-1")]}
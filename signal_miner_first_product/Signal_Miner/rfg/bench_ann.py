@@ -0,0 +1,111 @@
+"""Recall vs latency of the FaissStore index types against the exact flat index.
+
+    python -m rfg.bench_ann --snippets output/snippets.db
+    python -m rfg.bench_ann --synthetic 100000 --dim 384
+
+Vectors come from the snippet index (the embeddings stored by the dedup
+filter) or from a synthetic clustered set. Queries are held-out vectors
+with a little noise. Columns:
+  build      seconds to add (and train) all vectors
+  size       serialized index size
+  ms/query   mean single-query latency
+  recall@k   share of the exact top k found
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from rfg.pinecone_helper import FaissStore  # noqa: E402
+
+SWEEPS = {
+    "flat": [{}],
+    "hnsw": [{"ef_search": ef} for ef in (16, 32, 64, 128)],
+    "ivfpq": [{"nprobe": n} for n in (1, 4, 16, 64)],
+}
+
+
+def load_snippet_vectors(path, embed_model=None):
+    conn = sqlite3.connect(path)
+    sql = "SELECT embedding FROM snippets WHERE embedding IS NOT NULL"
+    rows = conn.execute(sql + " AND embed_model = ?", (embed_model,)) if embed_model else conn.execute(sql)
+    vectors = [np.frombuffer(blob, dtype="<f4") for (blob,) in rows]
+    conn.close()
+    if not vectors:
+        raise SystemExit(f"No embeddings in {path}")
+    dim = len(vectors[0])
+    return np.stack([v for v in vectors if len(v) == dim])
+
+
+def synthetic_vectors(n, dim, clusters=200, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype("float32")
+    points = centers[rng.integers(0, clusters, n)] + 0.6 * rng.normal(size=(n, dim)).astype("float32")
+    return points.astype("float32")
+
+
+def build(index_type, dim, data, options):
+    store = FaissStore(dim, index_type=index_type, **options)
+    t0 = time.perf_counter()
+    for start in range(0, len(data), 10_000):
+        batch = data[start:start + 10_000]
+        store.upsert([(str(start + i), vec, {"text": ""}) for i, vec in enumerate(batch)])
+    return store, time.perf_counter() - t0
+
+
+def run_queries(store, queries, k):
+    hits = []
+    t0 = time.perf_counter()
+    for q in queries:
+        hits.append([idx for idx, _ in store._search(q, k)])
+    return hits, (time.perf_counter() - t0) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FaissStore index types")
+    parser.add_argument("--snippets", help="snippet index database with stored embeddings")
+    parser.add_argument("--embed-model", default=None, help="only use embeddings of this model")
+    parser.add_argument("--synthetic", type=int, default=50_000, help="number of synthetic vectors")
+    parser.add_argument("--dim", type=int, default=256, help="synthetic vector dimension")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nlist", type=int, default=256)
+    parser.add_argument("--pq-m", type=int, default=64)
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    args = parser.parse_args()
+
+    data = load_snippet_vectors(args.snippets, args.embed_model) if args.snippets else \
+        synthetic_vectors(args.synthetic, args.dim)
+    rng = np.random.default_rng(1)
+    picks = rng.choice(len(data), size=min(args.queries, len(data)), replace=False)
+    queries = data[picks] + 0.05 * rng.normal(size=(len(picks), data.shape[1])).astype("float32")
+    dim = data.shape[1]
+    print(f"{len(data)} vectors, dim {dim}, {len(queries)} queries, k={args.k}")
+
+    exact = None
+    print(f"{'index':<8} {'setting':<14} {'build':>8} {'size':>10} {'ms/query':>9} {'recall@k':>9}")
+    for index_type, settings in SWEEPS.items():
+        options = {"nlist": args.nlist, "pq_m": args.pq_m} if index_type == "ivfpq" else \
+            {"hnsw_m": args.hnsw_m} if index_type == "hnsw" else {}
+        if index_type == "ivfpq" and len(data) < 39 * args.nlist:
+            print(f"{index_type:<8} skipped: needs {39 * args.nlist} vectors to train {args.nlist} lists")
+            continue
+        store, build_s = build(index_type, dim, data, options)
+        size_mb = len(store.faiss.serialize_index(store.index)) / 1e6
+        for setting in settings:
+            store.tune(**setting)
+            hits, latency = run_queries(store, queries, args.k)
+            if exact is None:
+                exact = [set(h) for h in hits]
+            recall = np.mean([len(exact[i] & set(h)) / args.k for i, h in enumerate(hits)])
+            label = ",".join(f"{key}={value}" for key, value in setting.items()) or "exact"
+            print(f"{index_type:<8} {label:<14} {build_s:>7.2f}s {size_mb:>8.1f}MB {latency * 1e3:>9.3f} {recall:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Near-duplicate snippet filter applied before embedding.
+
+Snippets are compared by the Jaccard similarity of their word unigrams
+and bigrams, estimated with a 64-value MinHash signature. Signatures are
+indexed with LSH (16 bands of 4 values): two snippets become candidates
+when any band matches exactly, which is an indexed equality lookup in
+SQLite, and candidates are confirmed against `threshold`. With these
+bands pairs at Jaccard 0.7 collide with probability ~0.99, pairs below
+0.3 rarely do.
+
+The index is persisted across runs together with each snippet's
+embedding, so a snippet seen before is never sent to the embeddings API
+again and its stored vector can be reused.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+PERMUTATIONS = 64
+BANDS = 16
+ROWS = PERMUTATIONS // BANDS
+THRESHOLD = 0.7
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def _seeds(name: str) -> np.ndarray:
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(f"{name}-{i}".encode(), digest_size=8).digest(), "little")
+         for i in range(PERMUTATIONS)],
+        dtype=np.uint64,
+    )
+
+
+# multiply-shift hash family; fixed seeds keep signatures comparable across runs
+_MUL = _seeds("mul") | np.uint64(1)
+_ADD = _seeds("add")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snippets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    embed_model TEXT NOT NULL,
+    domain TEXT,
+    text TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    embedding BLOB,
+    first_seen TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bands (
+    embed_model TEXT NOT NULL,
+    band INTEGER NOT NULL,
+    value BLOB NOT NULL,
+    snippet_id INTEGER NOT NULL REFERENCES snippets (id) ON DELETE CASCADE,
+    PRIMARY KEY (embed_model, band, value, snippet_id)
+) WITHOUT ROWID;
+"""
+
+
+def default_index_path(output_dir: str) -> str:
+    return os.path.join(output_dir, "snippets.db")
+
+
+def features(text: str) -> set:
+    tokens = TOKEN_RE.findall(text.lower())
+    return set(tokens) | {f"{a} {b}" for a, b in zip(tokens, tokens[1:])}
+
+
+def minhash(text: str) -> np.ndarray:
+    """64 uint32 minimums, one per hash function, over the snippet's features"""
+    feats = features(text) or {""}
+    digests = b"".join(hashlib.blake2b(f.encode("utf-8"), digest_size=4).digest() for f in feats)
+    x = np.frombuffer(digests, dtype="<u4").astype(np.uint64)
+    with np.errstate(over="ignore"):
+        hashed = (_MUL[:, None] * x[None, :] + _ADD[:, None]) >> np.uint64(32)
+    return hashed.min(axis=1).astype("<u4")
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(a == b)) / PERMUTATIONS
+
+
+def _bands(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+    return [(band, signature[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+
+class SnippetIndex:
+    """Persistent MinHash LSH index of embedded snippets, one namespace per embedding model"""
+
+    def __init__(self, db_path: str, threshold: float = THRESHOLD):
+        self.db_path = db_path
+        self.threshold = threshold
+        parent = os.path.dirname(db_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def nearest(self, signature: np.ndarray, embed_model: str) -> Optional[Tuple[float, str, Optional[List[float]]]]:
+        """(similarity, text, embedding) of the most similar stored snippet at or above `threshold`"""
+        # one equality probe per band, each served by the primary key
+        probe = "SELECT snippet_id FROM bands WHERE embed_model = ? AND band = ? AND value = ?"
+        bands = _bands(signature)
+        rows = self.conn.execute(
+            f"""
+            SELECT s.id, s.text, s.signature, s.embedding FROM snippets s
+            WHERE s.id IN ({" UNION ".join([probe] * len(bands))})
+            """,  # nosec B608
+            [v for band, value in bands for v in (embed_model, band, value)],
+        ).fetchall()
+        best = None
+        for _, text, stored, blob in rows:
+            score = similarity(signature, np.frombuffer(stored, dtype="<u4"))
+            if score >= self.threshold and (best is None or score > best[0]):
+                embedding = np.frombuffer(blob, dtype="<f4").tolist() if blob else None
+                best = (score, text, embedding)
+        return best
+
+    def split(self, snippets: Sequence[str], embed_model: str) -> Tuple[List[str], List[Tuple[str, List[float]]], int]:
+        """Partition snippets into (novel, [(known snippet, stored embedding)], dropped count).
+
+        Near duplicates inside `snippets` keep only their first occurrence;
+        a snippet matching one already indexed is returned with the stored
+        embedding instead of being embedded again.
+        """
+        novel: List[str] = []
+        known: List[Tuple[str, List[float]]] = []
+        seen: List[np.ndarray] = []
+        dropped = 0
+        for text in snippets:
+            signature = minhash(text)
+            if any(similarity(signature, other) >= self.threshold for other in seen):
+                dropped += 1
+                continue
+            seen.append(signature)
+            match = self.nearest(signature, embed_model)
+            if match is not None and match[2] is not None:
+                known.append((text, match[2]))
+            else:
+                novel.append(text)
+        return novel, known, dropped
+
+    def add(self, snippets: Sequence[str], embeddings: Sequence[Sequence[float]], embed_model: str,
+            domain: Optional[str] = None) -> int:
+        """Index embedded snippets; near duplicates of stored ones are skipped"""
+        added = 0
+        now = datetime.now(timezone.utc).isoformat()
+        with self.conn:
+            for text, embedding in zip(snippets, embeddings):
+                signature = minhash(text)
+                if self.nearest(signature, embed_model) is not None:
+                    continue
+                cur = self.conn.execute(
+                    """
+                    INSERT INTO snippets (embed_model, domain, text, signature, embedding, first_seen)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (embed_model, domain, text, signature.tobytes(),
+                     np.asarray(embedding, dtype="<f4").tobytes(), now),
+                )
+                self.conn.executemany(
+                    "INSERT INTO bands (embed_model, band, value, snippet_id) VALUES (?, ?, ?, ?)",
+                    [(embed_model, band, value, cur.lastrowid) for band, value in _bands(signature)],
+                )
+                added += 1
+        return added
+
+    def stats(self) -> Dict[str, int]:
+        return {"snippets": self.conn.execute("SELECT COUNT(*) FROM snippets").fetchone()[0]}
@@ -1,11 +1,39 @@
 import argparse
-import json
 import os
 import time
+from contextlib import nullcontext
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
-from .pinecone_helper import get_store
+from store.run_store import RunStore, default_db_path
+from store.serialization import SiteResult, dump, load, loads
+from store.tenants import Workspace, estimate_tokens
+
+from .pinecone_helper import VectorStore, date_value, get_store, metadata_filter, vector_id
+from .salience import SalienceModel, candidate_snippets, default_model_path, typed_candidates
+from .schema import fill_defaults, repair_pack, retry_prompt
+
+OUTPUT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "output"))
+
+# completion tokens reserved against a tenant's budget before the LLM call
+PACK_OUTPUT_TOKENS = 800
+RETRY_OUTPUT_TOKENS = 300
+
+# the OpenAI SDK takes longer to import than the rest of this module; it is
+# loaded on the first client created (tests patch this name)
+OpenAI = None
+
+
+# numpy is only needed once there are embeddings to average (the snippet
+# index in .dedup is built on it too); neither is loaded by `--help`
+np = None
+
+
+def openai_client():
+    global OpenAI
+    if OpenAI is None:
+        from openai import OpenAI
+    return OpenAI()
 
 
 def now_stamp() -> str:
@@ -13,8 +41,7 @@ def now_stamp() -> str:
 
 
 def load_signals(path: str) -> List[Dict[str, Any]]:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = load(path, Union[List[SiteResult], SiteResult])
     # combined file is a list of per-site dicts
     if isinstance(data, list):
         return data
@@ -22,19 +49,20 @@ def load_signals(path: str) -> List[Dict[str, Any]]:
     return [data]
 
 
-def collect_snippets(per_site: Dict[str, Any], k: int = 10) -> Tuple[str, List[str]]:
+def collect_snippets(per_site: Dict[str, Any], k: int = 10,
+                     model: Optional[SalienceModel] = None) -> Tuple[str, List[str]]:
+    """The `k` most salient snippets across all signal types.
+
+    With a persistent `model` the site's snippets are ranked against the
+    corpus of past runs and then added to it (once per run).
+    """
     domain = per_site.get("domain", "unknown")
-    snippets: List[str] = []
-    signals = per_site.get("signals", {})
-    for key, items in signals.items():
-        for it in items:
-            text = "; ".join(it) if isinstance(it, list) else str(it)
-            if text and len(text.split()) >= 4:
-                snippets.append(text)
-            if len(snippets) >= k:
-                break
-        if len(snippets) >= k:
-            break
+    candidates = candidate_snippets(per_site.get("signals", {}))
+    if model is None:
+        with SalienceModel() as local:
+            return domain, local.top(candidates, k)
+    snippets = model.top(candidates, k)
+    model.update(candidates, run_key=f"{domain}@{per_site.get('timestamp', '')}")
     return domain, snippets
 
 
@@ -45,6 +73,69 @@ def make_embeddings(client, texts: List[str], model: str = "text-embedding-3-sma
     return [d.embedding for d in resp.data]
 
 
+def snippet_metadata(site: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Filterable metadata of each candidate snippet of a site: signal type and run date"""
+    run_date = date_value(site["timestamp"]) if site.get("timestamp") else None
+    return {text: {"signal_type": signal_type, "date": run_date}
+            for text, signal_type in typed_candidates(site.get("signals", {}))}
+
+
+def embed_snippets(client, domain: str, snippets: List[str], embed_model: str, index_name: str,
+                   snippet_index: Optional[str] = None, metadata: Optional[Dict[str, Dict[str, Any]]] = None,
+                   workspace: Optional[Workspace] = None) -> Tuple[VectorStore, List[List[float]], Dict[str, Any]]:
+    """Embed and upsert the snippets, skipping near duplicates of ones already embedded.
+
+    Returns the vector store, an embedding for every distinct snippet (new
+    or reused from the snippet index) and dedup stats including `embed_ms`.
+    Reused snippets are upserted too, with their stored embeddings, even
+    to a persistent store (Pinecone): the index may have first seen them
+    on another domain or namespace, where this domain's filtered query
+    would not reach them. Vector ids are content hashes, so upserting a
+    snippet again replaces its vector instead of adding one or
+    overwriting another.
+
+    `metadata` (see `snippet_metadata`) is stored with each vector next to
+    its text and domain so retrieval can filter on it. With a tenant
+    `workspace` the vectors go to its namespace and the embedding call is
+    charged to its API budget first; the charge is refunded if the call
+    fails.
+    """
+    from .dedup import SnippetIndex, default_index_path
+
+    with SnippetIndex(snippet_index or default_index_path(OUTPUT_DIR)) as index:
+        novel, known, dropped = index.split(snippets, embed_model)
+        charge = (workspace.charged("embed", embed_model, sum(estimate_tokens(t) for t in novel))
+                  if workspace is not None and novel else nullcontext())
+        with charge:
+            t0 = time.time()
+            novel_embeds = make_embeddings(client, novel, model=embed_model)
+            embed_ms = int((time.time() - t0) * 1000)
+        index.add(novel, novel_embeds, embed_model, domain)
+
+    embeds = novel_embeds + [emb for _, emb in known]
+    dim = len(embeds[0]) if embeds else 1536  # default for model
+    store = get_store(embed_dim=dim, index_name=index_name)
+    upserts = list(zip(novel, novel_embeds)) + known
+    metadata = metadata or {}
+    vectors = [(vector_id(domain, txt), emb, {"text": txt, "domain": domain, **metadata.get(txt, {})})
+               for txt, emb in upserts]
+    if vectors:
+        store.upsert(vectors, namespace=workspace.namespace if workspace else None)
+    stats = {"snippets": len(snippets), "embedded": len(novel), "reused": len(known),
+             "near_duplicates": dropped, "embed_ms": embed_ms}
+    return store, embeds, stats
+
+
+def centroid(embeds: List[List[float]], dim: int) -> List[float]:
+    """Mean of the snippet embeddings, the retrieval query vector (zeros without embeddings)"""
+    global np
+    if not embeds:
+        return [0.0] * dim
+    if np is None:
+        import numpy as np
+    return np.asarray(embeds, dtype=float).mean(axis=0).tolist()
+
+
 def build_prompt(template_path: str, retrieved_texts: List[str]) -> str:
     with open(template_path, "r", encoding="utf-8") as f:
         tpl = f.read()
@@ -63,11 +154,42 @@ def call_llm_json(client, model: str, prompt: str) -> Dict[str, Any]:
         response_format={"type": "json_object"},
     )
     content = completion.choices[0].message.content
-    return json.loads(content)
+    return loads(content)
+
+
+def validated_pack(client, model: str, pack: Any,
+                   workspace: Optional[Workspace] = None) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+    """Repair the model's pack locally (rfg/schema.py); ask the model again only for fields that stay invalid.
+
+    Returns the pack and a report of fields `repaired`, `retried` and
+    `defaulted` (still invalid after the retry, given placeholder values).
+    """
+    pack, report = repair_pack(pack)
+    retried = report["failed"]
+    if retried:
+        prompt = retry_prompt(pack, retried)
+        if workspace is not None:
+            workspace.charge("chat", model, estimate_tokens(prompt), RETRY_OUTPUT_TOKENS)
+        try:
+            patch = call_llm_json(client, model, prompt)
+        except ValueError:
+            patch = {}
+        patch = patch if isinstance(patch, dict) else {}
+        pack, report = repair_pack(dict(pack, **{k: patch[k] for k in retried if k in patch}), retried)
+        report["repaired"] = [k for k in retried if k not in report["failed"]]
+    return fill_defaults(pack, report["failed"]), {"repaired": report["repaired"], "retried": retried,
+                                                   "defaulted": report["failed"]}
 
 
 def find_latest_output(base_output: str) -> str:
-    # if base_output contains per-run folders, pick latest; else fallback to base_output/signals.json
+    # the run store knows the latest run without touching the filesystem
+    db_path = default_db_path(base_output)
+    if os.path.exists(db_path):
+        with RunStore(db_path) as store:
+            path = store.latest_path()
+        if path and os.path.exists(path):
+            return path
+    # older layouts: per-run folders, pick latest; else fallback to base_output/signals.json
     candidates: List[Tuple[float, str]] = []
     if os.path.isdir(base_output):
         for name in os.listdir(base_output):
@@ -82,46 +204,56 @@ def find_latest_output(base_output: str) -> str:
     return default_path
 
 
-def generate_pack_for_run(run_path: str, model: str = "gpt-4o-mini", embed_model: str = "text-embedding-3-small") -> Dict[str, Any]:
-    """Generate Decision Pack for a specific run file, returns pack + metadata"""
-    from openai import OpenAI
-    if not os.environ.get("OPENAI_API_KEY"):
-        raise RuntimeError("OPENAI_API_KEY env var is required")
-    client = OpenAI()
+def load_run(run_id: int, db_path: Optional[str] = None) -> Dict[str, Any]:
+    """Per-site result for `run_id` from the run store"""
+    with RunStore(db_path or default_db_path(OUTPUT_DIR)) as store:
+        site = store.load_result(run_id)
+    if site is None:
+        raise RuntimeError(f"Run not found: {run_id}")
+    return site
 
-    if not os.path.exists(run_path):
-        raise RuntimeError(f"Run file not found: {run_path}")
 
-    # load single run
-    with open(run_path, "r", encoding="utf-8") as f:
-        site = json.load(f)
+def generate_pack_for_run(run_path: Optional[str] = None, model: str = "gpt-4o-mini",
+                          embed_model: str = "text-embedding-3-small", run_id: Optional[int] = None,
+                          db_path: Optional[str] = None, snippet_index: Optional[str] = None,
+                          salience_db: Optional[str] = None, tenant: Optional[str] = None) -> Dict[str, Any]:
+    """Generate Decision Pack for a run file or a stored run (`run_id`), returns pack + metadata.
 
-    domain, top_snippets = collect_snippets(site, k=10)
-
-    # embed
-    t0 = time.time()
-    embeds = make_embeddings(client, top_snippets, model=embed_model)
-    embed_ms = int((time.time() - t0) * 1000)
-
-    if embeds:
-        dim = len(embeds[0])
+    With a `tenant` the run store, caches and vector namespace default to
+    the tenant's workspace and API calls are charged to its daily budget
+    (QuotaExceeded once it is spent).
+    """
+    if not os.environ.get("OPENAI_API_KEY"):
+        raise RuntimeError("OPENAI_API_KEY env var is required")
+    client = openai_client()
+    workspace = Workspace(tenant) if tenant else None
+    if workspace is not None:
+        db_path = db_path or workspace.db_path
+        snippet_index = snippet_index or workspace.snippet_index
+        salience_db = salience_db or workspace.salience_db
+
+    if run_id is not None:
+        site = load_run(run_id, db_path)
     else:
-        dim = 1536  # default for model
+        if not run_path or not os.path.exists(run_path):
+            raise RuntimeError(f"Run file not found: {run_path}")
+        # load single run
+        site = load(run_path, SiteResult)
 
-    store = get_store(embed_dim=dim, index_name="astra-signals-dev")
-    vectors = [(f"{domain}-{i}", emb, {"text": txt, "domain": domain}) for i, (emb, txt) in enumerate(zip(embeds, top_snippets))]
-    if vectors:
-        store.upsert(vectors)
+    with SalienceModel(salience_db or default_model_path(OUTPUT_DIR)) as salience:
+        domain, top_snippets = collect_snippets(site, k=10, model=salience)
+
+    # embed (near duplicates of snippets embedded before are reused, not re-embedded)
+    store, embeds, dedup = embed_snippets(client, domain, top_snippets, embed_model, "astra-signals-dev",
+                                          snippet_index, metadata=snippet_metadata(site), workspace=workspace)
+    embed_ms = dedup["embed_ms"]
+    dim = len(embeds[0]) if embeds else 1536
 
     # retrieval using centroid of embeddings as query
-    if embeds:
-        import numpy as np
-        q = (sum(embeds) / len(embeds)) if isinstance(embeds, list) else embeds[0]
-        if not isinstance(q, list):
-            q = (np.array(embeds).mean(axis=0)).tolist()
-    else:
-        q = [0.0] * dim
-    results = store.query(q, top_k=8)
+    q = centroid(embeds, dim)
+    # hybrid: exact names and prices in the snippets also match lexically; only this domain's snippets
+    results = store.query_hybrid(q, " ".join(top_snippets), top_k=8, filter=metadata_filter(domain=domain),
+                                 namespace=workspace.namespace if workspace else None)
     retrieved_texts = [r.get("text", "") for r in results]
 
     # prompt
@@ -129,15 +261,9 @@ def generate_pack_for_run(run_path: str, model: str = "gpt-4o-mini", embed_model
     prompt = build_prompt(tpl_path, retrieved_texts)
 
     # llm
-    pack = call_llm_json(client, model, prompt)
-
-    # ensure keys
-    required_keys = [
-        "title", "hypothesis", "expected_lift", "confidence",
-        "confidence_justification", "risks", "assets_needed", "suggested_execution_steps"
-    ]
-    for k in required_keys:
-        pack.setdefault(k, [] if k.endswith("s") or k.endswith("steps") else "")
+    if workspace is not None:
+        workspace.charge("chat", model, estimate_tokens(prompt), PACK_OUTPUT_TOKENS)
+    pack, schema_report = validated_pack(client, model, call_llm_json(client, model, prompt), workspace)
 
     # build citations
     citations = []
@@ -155,21 +281,35 @@ def generate_pack_for_run(run_path: str, model: str = "gpt-4o-mini", embed_model
             "embed_model": embed_model,
             "domain": domain,
             "embed_ms": embed_ms,
+            "dedup": dedup,
             "citations": citations,
-            "run_path": run_path
+            "run_path": run_path,
+            "run_id": run_id,
+            "tenant": tenant,
+            "schema": schema_report
         }
     }
 
 
-def save_pack(pack: Dict[str, Any], domain: str, outdir: str = None) -> str:
-    """Save a Decision Pack to file"""
+def save_pack(pack: Dict[str, Any], domain: str, outdir: str = None, metadata: Optional[Dict[str, Any]] = None,
+              run_id: Optional[int] = None, db_path: Optional[str] = None, tenant: Optional[str] = None) -> str:
+    """Save a Decision Pack to file and record it in the run store.
+
+    With the default `outdir` the pack is recorded in output/runs.db (the
+    tenant's workspace with a `tenant`); a custom `outdir` only records
+    when `db_path` is given.
+    """
     if outdir is None:
-        outdir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "output", "decision_packs"))
+        workspace = Workspace(tenant)
+        outdir = workspace.packs_dir
+        db_path = db_path or workspace.db_path
     os.makedirs(outdir, exist_ok=True)
     stamp = now_stamp()
     outfile = os.path.join(outdir, f"{domain}__{stamp}.json")
-    with open(outfile, "w", encoding="utf-8") as f:
-        json.dump(pack, f, ensure_ascii=False, indent=2)
+    dump(pack, outfile, pretty=True)
+    if db_path:
+        with RunStore(db_path) as store:
+            store.record_pack(domain, pack, path=outfile, metadata=metadata, run_id=run_id)
     return outfile
 
 
@@ -182,46 +322,31 @@ def main():
     parser.add_argument("--index", default="astra-signals-dev")
     args = parser.parse_args()
 
-    from openai import OpenAI
     if not os.environ.get("OPENAI_API_KEY"):
         raise SystemExit("OPENAI_API_KEY env var is required")
-    client = OpenAI()
+    client = openai_client()
 
-    base_output = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "output"))
-    input_path = args.input or find_latest_output(base_output)
+    input_path = args.input or find_latest_output(OUTPUT_DIR)
     if not os.path.exists(input_path):
         raise SystemExit(f"Input not found: {input_path}")
 
     combined = load_signals(input_path)
     # choose first site for MVP; later iterate all
     site = combined[0] if combined else {}
-    domain, top_snippets = collect_snippets(site, k=10)
-
-    # embed
-    t0 = time.time()
-    embeds = make_embeddings(client, top_snippets, model=args.embed_model)
-    embed_ms = int((time.time() - t0) * 1000)
-    print(f"[INFO] Embedded {len(embeds)} snippets in {embed_ms} ms")
-
-    if embeds:
-        dim = len(embeds[0])
-    else:
-        dim = 1536  # default for model
+    with SalienceModel(default_model_path(OUTPUT_DIR)) as salience:
+        domain, top_snippets = collect_snippets(site, k=10, model=salience)
 
-    store = get_store(embed_dim=dim, index_name=args.index)
-    vectors = [(f"{domain}-{i}", emb, {"text": txt, "domain": domain}) for i, (emb, txt) in enumerate(zip(embeds, top_snippets))]
-    if vectors:
-        store.upsert(vectors)
+    # embed (near duplicates of snippets embedded before are reused, not re-embedded)
+    store, embeds, dedup = embed_snippets(client, domain, top_snippets, args.embed_model, args.index,
+                                          metadata=snippet_metadata(site))
+    print(f"[INFO] Embedded {dedup['embedded']} new snippets in {dedup['embed_ms']} ms "
+          f"({dedup['reused']} reused, {dedup['near_duplicates']} near duplicates dropped)")
+    dim = len(embeds[0]) if embeds else 1536
 
     # retrieval using centroid of embeddings as query
-    if embeds:
-        import numpy as np
-        q = (sum(embeds) / len(embeds)) if isinstance(embeds, list) else embeds[0]
-        if not isinstance(q, list):
-            q = (np.array(embeds).mean(axis=0)).tolist()
-    else:
-        q = [0.0] * dim
-    results = store.query(q, top_k=8)
+    q = centroid(embeds, dim)
+    # hybrid: exact names and prices in the snippets also match lexically; only this domain's snippets
+    results = store.query_hybrid(q, " ".join(top_snippets), top_k=8, filter=metadata_filter(domain=domain))
     retrieved_texts = [r.get("text", "") for r in results]
 
     # prompt
@@ -229,27 +354,15 @@ def main():
     prompt = build_prompt(tpl_path, retrieved_texts)
 
     # llm
-    pack = call_llm_json(client, args.model, prompt)
-
-    # ensure keys
-    required_keys = [
-        "title", "hypothesis", "expected_lift", "confidence",
-        "confidence_justification", "risks", "assets_needed", "suggested_execution_steps"
-    ]
-    for k in required_keys:
-        pack.setdefault(k, [] if k.endswith("s") or k.endswith("steps") else "")
+    pack, schema_report = validated_pack(client, args.model, call_llm_json(client, args.model, prompt))
+    if schema_report["retried"]:
+        print(f"[INFO] Re-requested invalid pack fields: {', '.join(schema_report['retried'])}")
 
     # write
-    outdir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "output", "decision_packs"))
-    os.makedirs(outdir, exist_ok=True)
-    stamp = now_stamp()
-    outfile = os.path.join(outdir, f"{domain}__{stamp}.json")
-    with open(outfile, "w", encoding="utf-8") as f:
-        json.dump(pack, f, ensure_ascii=False, indent=2)
+    outfile = save_pack(pack, domain, metadata={"model": args.model, "embed_model": args.embed_model,
+                                                "run_path": input_path})
     print(f"[INFO] Decision Pack written: {outfile}")
 
 
 if __name__ == "__main__":
     main()
-
-
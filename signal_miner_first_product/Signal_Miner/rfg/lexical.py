@@ -0,0 +1,105 @@
+"""In-memory BM25 inverted index and reciprocal rank fusion for hybrid retrieval.
+
+Postings are stdlib `array`s (doc ids and term frequencies) that grow in
+place as documents are added and are read through zero-copy numpy views
+at query time, so an upsert is a few appends and a query only touches
+the postings of its own terms. Scores are accumulated with
+`np.bincount` and the top k picked with `argpartition`. Query terms in
+more than `max_df` of all documents are dropped when rarer terms are
+present; their IDF is small and their postings are the expensive part.
+"""
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .salience import tokenize
+
+K1 = 1.2
+B = 0.75
+MAX_DF = 0.5
+RRF_K = 60
+
+
+class BM25Index:
+    """Append-only BM25 index; document ids are insertion positions"""
+
+    def __init__(self, k1: float = K1, b: float = B, max_df: float = MAX_DF):
+        self.k1 = k1
+        self.b = b
+        self.max_df = max_df
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._lengths = array("f")
+        self._total = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, text: str) -> int:
+        doc_id = len(self._lengths)
+        counts: Dict[str, int] = {}
+        tokens = tokenize(text)
+        for t in tokens:
+            counts[t] = counts.get(t, 0) + 1
+        for t, tf in counts.items():
+            postings = self._postings.get(t)
+            if postings is None:
+                postings = self._postings[t] = (array("q"), array("f"))
+            postings[0].append(doc_id)
+            postings[1].append(tf)
+        self._lengths.append(len(tokens))
+        self._total += len(tokens)
+        return doc_id
+
+    def extend(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            self.add(text)
+
+    def search(self, query: str, top_k: int = 8, rows: Optional[Sequence[int]] = None) -> List[Tuple[int, float]]:
+        """(doc id, BM25 score) of the best `top_k` matches, best first, among `rows` if given (sorted ids)"""
+        n = len(self._lengths)
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t in self._postings]
+        if not n or not terms or top_k <= 0:
+            return []
+        rare = [t for t in terms if len(self._postings[t][0]) <= self.max_df * n]
+        terms = rare or terms
+        import numpy as np  # on the first query, so importing the vector stores does not load it
+
+        lengths = np.frombuffer(self._lengths, dtype=np.float32)
+        avg_len = self._total / n
+        ids_parts, weight_parts = [], []
+        for t in terms:
+            ids_buf, tf_buf = self._postings[t]
+            ids = np.frombuffer(ids_buf, dtype=np.int64)
+            tf = np.frombuffer(tf_buf, dtype=np.float32)
+            idf = np.log(1.0 + (n - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * lengths[ids] / avg_len)
+            ids_parts.append(ids)
+            weight_parts.append(idf * tf * (self.k1 + 1.0) / (tf + norm))
+        ids = np.concatenate(ids_parts)
+        weights = np.concatenate(weight_parts)
+        if rows is not None:
+            # statistics stay corpus-wide; only the postings outside `rows` are dropped
+            keep = np.isin(ids, rows)
+            ids, weights = ids[keep], weights[keep]
+            if not len(ids):
+                return []
+        if len(ids) * 16 < n:
+            # few postings: score only the matching documents
+            docs, inverse = np.unique(ids, return_inverse=True)
+            scores = np.bincount(inverse, weights=weights)
+        else:
+            docs = None
+            scores = np.bincount(ids, weights=weights, minlength=n)
+        k = min(top_k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        best = best[scores[best] > 0]
+        return [(int(docs[i] if docs is not None else i), float(scores[i])) for i in best]
+
+
+def rrf(rankings: Sequence[Sequence[int]], k: int = RRF_K) -> List[Tuple[int, float]]:
+    """Reciprocal rank fusion: sum of 1 / (k + rank) over the rankings each id appears in"""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: -item[1])
@@ -0,0 +1,193 @@
+"""Change-triggered Decision Pack pipeline.
+
+    python -m rfg.orchestrator                 # every domain's latest run
+    python -m rfg.orchestrator --domain a.com --min-change 0.2
+
+Each run's signals are fingerprinted: a hash per candidate snippet
+(whitespace and case normalised) and per structured price record. The
+pipeline (embedding, retrieval, LLM generation, PR preview) only runs
+when the fingerprint differs from the one behind the domain's last
+generated pack by at least `min_change` (Jaccard distance of the hash
+sets), or whenever a price changed. Small changes are compared against
+that same baseline, so drift still triggers once it adds up.
+
+Work is claimed per domain in the run store before it starts, so
+overlapping runs (daemon, UI, cron) never generate for the same domain
+twice at once; a claim older than `stale_after` seconds is taken over.
+
+With `--tenant` the run store, packs and API budget are the tenant's
+workspace (see store/tenants.py); a spent budget fails the domain's
+generation without recording a new baseline, so it is retried later.
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from store.run_store import RunStore
+from store.tenants import Workspace
+
+from .salience import typed_candidates
+
+MIN_CHANGE = 0.1
+STALE_AFTER = 1800.0
+
+GENERATED, UNCHANGED, BELOW_THRESHOLD, IN_PROGRESS, SKIPPED, FAILED = (
+    "generated", "unchanged", "below_threshold", "in_progress", "skipped", "failed")
+
+SPACE_RE = re.compile(r"\s+")
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def snippet_hashes(signals: Dict[str, Any]) -> List[str]:
+    """Sorted hashes of the run's snippets ("s:...") and price records ("p:...")"""
+    hashes = {"s:" + _digest(SPACE_RE.sub(" ", text).strip().lower()) for text, _ in typed_candidates(signals)}
+    for record in signals.get("price_records") or []:
+        if isinstance(record, dict):
+            hashes.add("p:" + _digest(json.dumps(record, sort_keys=True, default=str)))
+    return sorted(hashes)
+
+
+def fingerprint(hashes: List[str]) -> str:
+    return _digest("\n".join(hashes))
+
+
+def change_ratio(before: List[str], after: List[str]) -> float:
+    """Jaccard distance of two hash sets (1.0 when only one side has anything)"""
+    a, b = set(before), set(after)
+    union = a | b
+    return 1.0 - len(a & b) / len(union) if union else 0.0
+
+
+def prices_changed(before: List[str], after: List[str]) -> bool:
+    return {h for h in before if h.startswith("p:")} != {h for h in after if h.startswith("p:")}
+
+
+def landing_page_html(pack: Dict[str, Any]) -> str:
+    """Minimal landing page for unattended previews"""
+    title = html.escape(str(pack.get("title") or "Growth Experiment"))
+    hypothesis = html.escape(str(pack.get("hypothesis") or ""))
+    return (f"<!DOCTYPE html>\n<html lang=\"en\">\n<head><meta charset=\"UTF-8\"><title>{title}</title></head>\n"
+            f"<body>\n  <h1>{title}</h1>\n  <p>{hypothesis}</p>\n  <p><em>Generated by GrowthSignal</em></p>\n"
+            f"</body>\n</html>")
+
+
+class Orchestrator:
+    """Runs the Decision Pack pipeline for runs whose signals moved.
+
+    `generate(run_id)` does the expensive part and returns at least
+    `pack_id`; the default generates, saves and previews the pack.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, min_change: float = MIN_CHANGE,
+                 stale_after: float = STALE_AFTER, preview: bool = True,
+                 generate: Optional[Callable[[int], Dict[str, Any]]] = None, tenant: Optional[str] = None,
+                 **generate_options):
+        self.workspace = Workspace(tenant)
+        self.tenant = self.workspace.tenant
+        self.db_path = db_path or self.workspace.db_path
+        self.min_change = min_change
+        self.stale_after = stale_after
+        self.preview = preview
+        self.generate = generate or self._generate
+        self.generate_options = generate_options
+
+    def decide(self, state: Optional[Dict[str, Any]], hashes: List[str]) -> Tuple[str, float]:
+        """(action, change ratio) for a run with `hashes` given the domain's pipeline state"""
+        before = state["snippet_hashes"] if state and state["fingerprint"] else []
+        change = change_ratio(before, hashes)
+        if state and state["fingerprint"] == fingerprint(hashes):
+            return UNCHANGED, 0.0
+        if before and change < self.min_change and not prices_changed(before, hashes):
+            return BELOW_THRESHOLD, change
+        return GENERATED, change
+
+    def process_run(self, run_id: int, force: bool = False) -> Dict[str, Any]:
+        with RunStore(self.db_path) as store:
+            result = store.load_result(run_id)
+            if result is None:
+                raise ValueError(f"Run {run_id} not found")
+            domain = result["domain"]
+            outcome: Dict[str, Any] = {"domain": domain, "run_id": run_id, "change": None}
+            if result.get("error"):
+                return {**outcome, "action": SKIPPED, "reason": result["error"]}
+            hashes = snippet_hashes(result.get("signals") or {})
+            fp = fingerprint(hashes)
+            state = store.pipeline_state(domain)
+            action, change = (GENERATED, 1.0) if force else self.decide(state, hashes)
+            outcome.update(change=round(change, 3), fingerprint=fp)
+            if action != GENERATED:
+                return {**outcome, "action": action}
+            stale = (datetime.now(timezone.utc) - timedelta(seconds=self.stale_after)).isoformat()
+            if not store.claim_pipeline(domain, fp, stale, force=force):
+                # either another process holds the domain or it just generated this fingerprint
+                state = store.pipeline_state(domain)
+                if not force and state is not None and state["fingerprint"] == fp:
+                    return {**outcome, "change": 0.0, "action": UNCHANGED}
+                return {**outcome, "action": IN_PROGRESS}
+
+        # the claim is held while the slow part runs without a connection open
+        try:
+            generated = self.generate(run_id)
+        except Exception as e:
+            with RunStore(self.db_path) as store:
+                store.finish_pipeline(domain)
+            return {**outcome, "action": FAILED, "reason": str(e)}
+        with RunStore(self.db_path) as store:
+            store.finish_pipeline(domain, fp, hashes, run_id, generated.get("pack_id"))
+        return {**outcome, "action": GENERATED, **generated}
+
+    def process_latest(self, domains: Optional[List[str]] = None, force: bool = False) -> List[Dict[str, Any]]:
+        """Process each domain's latest run (all domains, or just `domains`)"""
+        with RunStore(self.db_path) as store:
+            runs = store.latest_runs()
+        wanted = set(domains) if domains else None
+        return [self.process_run(run["id"], force) for run in runs if wanted is None or run["domain"] in wanted]
+
+    def _generate(self, run_id: int) -> Dict[str, Any]:
+        from .generate_pack import generate_pack_for_run, save_pack
+        out = generate_pack_for_run(run_id=run_id, db_path=self.db_path, tenant=self.tenant, **self.generate_options)
+        domain = out["metadata"]["domain"]
+        pack_path = save_pack(out["pack"], domain, outdir=os.path.join(os.path.dirname(self.db_path), "decision_packs"),
+                              metadata=out["metadata"], run_id=run_id, db_path=self.db_path)
+        with RunStore(self.db_path) as store:
+            pack_id = store.latest_pack(domain)["id"]
+        generated = {"pack_id": pack_id, "pack_path": pack_path}
+        if self.preview:
+            from executor.pr_executor import preview_or_create_pr
+            pr = preview_or_create_pr(pack_path, landing_page_html(out["pack"]), domain, db_path=self.db_path)
+            generated["preview"] = pr.get("url")
+        return generated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate Decision Packs for domains whose signals changed")
+    parser.add_argument("--db", default=None, help="run store database (default: output/runs.db of the workspace)")
+    parser.add_argument("--tenant", help="tenant workspace (default: the single-tenant output/)")
+    parser.add_argument("--domain", action="append", default=[], help="only these domains (repeatable)")
+    parser.add_argument("--min-change", type=float, default=MIN_CHANGE,
+                        help="share of snippets that must differ from the last pack's run (0-1)")
+    parser.add_argument("--force", action="store_true", help="regenerate even if nothing changed")
+    parser.add_argument("--no-preview", action="store_true", help="skip the PR preview step")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--embed_model", default="text-embedding-3-small")
+    args = parser.parse_args()
+
+    orchestrator = Orchestrator(args.db, min_change=args.min_change, preview=not args.no_preview,
+                                tenant=args.tenant, model=args.model, embed_model=args.embed_model)
+    for outcome in orchestrator.process_latest(args.domain or None, force=args.force):
+        change = "" if outcome["change"] is None else f" (change {outcome['change']:.0%})"
+        print(f"[{outcome['action'].upper()}] {outcome['domain']}{change}"
+              + (f": {outcome['pack_path']}" if outcome.get("pack_path") else "")
+              + (f": {outcome['reason']}" if outcome.get("reason") else ""))
+
+
+if __name__ == "__main__":
+    main()
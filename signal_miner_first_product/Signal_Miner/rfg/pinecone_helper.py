@@ -1,74 +1,488 @@
+import hashlib
+import math
 import os
 import time
-from typing import List, Tuple
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .lexical import BM25Index, rrf
+
+# Operators understood in metadata filters (Pinecone's syntax)
+FILTER_OPS = {"$eq", "$ne", "$in", "$nin", "$gt", "$gte", "$lt", "$lte"}
+
+# Pinecone recommends upserts of at most ~100 vectors (and 2 MB) per request
+UPSERT_BATCH = 100
+UPSERT_WORKERS = 4
+
+# numpy is only used by the local FAISS store and is loaded with faiss when
+# the first one is created, so Pinecone users and `--help` never import it
+np = None
+
+
+def vector_id(domain: str, text: str) -> str:
+    """Stable id of a snippet: the same text from the same domain always maps to the same vector"""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+    return f"{domain}-{digest}"
+
+
+def date_value(value: Union[str, date, datetime]) -> int:
+    """Dates are stored as YYYYMMDD integers so range filters also work in Pinecone"""
+    if isinstance(value, (date, datetime)):
+        return value.year * 10000 + value.month * 100 + value.day
+    return int(str(value).replace("-", "")[:8])
+
+
+def metadata_filter(domain: Optional[str] = None, since: Optional[Union[str, date]] = None,
+                    until: Optional[Union[str, date]] = None,
+                    signal_type: Optional[Union[str, List[str]]] = None) -> Optional[Dict[str, Any]]:
+    """Build a filter on the standard snippet metadata; `since`/`until` are inclusive dates"""
+    conditions: Dict[str, Any] = {}
+    if domain:
+        conditions["domain"] = {"$eq": domain}
+    if since or until:
+        conditions["date"] = {}
+        if since:
+            conditions["date"]["$gte"] = date_value(since)
+        if until:
+            conditions["date"]["$lte"] = date_value(until)
+    if signal_type:
+        conditions["signal_type"] = {"$in": [signal_type] if isinstance(signal_type, str) else list(signal_type)}
+    return conditions or None
+
+
+def _conditions(filter: Dict[str, Any]) -> Iterator[Tuple[str, str, Any]]:
+    for field, condition in filter.items():
+        if field == "$and":
+            for sub in condition:
+                yield from _conditions(sub)
+        elif isinstance(condition, dict):
+            for op, value in condition.items():
+                if op not in FILTER_OPS:
+                    raise ValueError(f"Unsupported filter operator {op!r}")
+                yield field, op, value
+        else:
+            yield field, "$eq", condition
 
 
 class VectorStore:
-    def upsert(self, vectors: List[Tuple[str, list, dict]]):
+    # whether vectors upserted in earlier runs are still there to be retrieved
+    persistent = False
+
+    def upsert(self, vectors: List[Tuple[str, list, dict]], namespace: Optional[str] = None):
+        """Insert or replace vectors by id"""
         raise NotImplementedError
 
-    def query(self, vector: list, top_k: int = 8) -> List[dict]:
+    def delete(self, ids: List[str], namespace: Optional[str] = None):
         raise NotImplementedError
 
+    def query(self, vector: list, top_k: int = 8, namespace: Optional[str] = None,
+              filter: Optional[Dict[str, Any]] = None) -> List[dict]:
+        raise NotImplementedError
+
+    def query_hybrid(self, vector: list, text: str, top_k: int = 8, namespace: Optional[str] = None,
+                     filter: Optional[Dict[str, Any]] = None) -> List[dict]:
+        """Dense plus lexical retrieval; stores without a local lexical index fall back to dense"""
+        return self.query(vector, top_k, namespace=namespace, filter=filter)
+
 
 class PineconeStore(VectorStore):
-    def __init__(self, index_name: str):
+    persistent = True
+
+    def __init__(self, index_name: str, batch_size: int = UPSERT_BATCH, workers: int = UPSERT_WORKERS):
         from pinecone import Pinecone
         api_key = os.environ.get("PINECONE_API_KEY")
         if not api_key:
             raise RuntimeError("PINECONE_API_KEY missing")
         self.pc = Pinecone(api_key=api_key)
         self.index = self.pc.Index(index_name)
+        self.batch_size = batch_size
+        self.workers = workers
 
-    def upsert(self, vectors: List[Tuple[str, list, dict]]):
-        # vectors: [(id, embedding, {"text":..., "domain":...})]
+    def upsert(self, vectors: List[Tuple[str, list, dict]], namespace: Optional[str] = None) -> int:
+        """Upsert in chunks of `batch_size`, sending up to `workers` chunks concurrently"""
+        # vectors: [(id, embedding, {"text":..., "domain":...})]; Pinecone rejects null metadata values
         items = [
-            {"id": vid, "values": emb, "metadata": meta}
+            {"id": vid, "values": emb, "metadata": {k: v for k, v in meta.items() if v is not None}}
             for vid, emb, meta in vectors
         ]
-        self.index.upsert(vectors=items)
+        chunks = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+        if len(chunks) <= 1:
+            for chunk in chunks:
+                self.index.upsert(vectors=chunk, namespace=namespace or "")
+            return len(items)
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(chunks)), thread_name_prefix="upsert") as pool:
+            # list() re-raises the first failed chunk; ids are stable, so a retry is idempotent
+            list(pool.map(lambda chunk: self.index.upsert(vectors=chunk, namespace=namespace or ""), chunks))
+        return len(items)
 
-    def query(self, vector: list, top_k: int = 8) -> List[dict]:
+    def delete(self, ids: List[str], namespace: Optional[str] = None):
+        for i in range(0, len(ids), 1000):
+            self.index.delete(ids=ids[i:i + 1000], namespace=namespace or "")
+
+    def query(self, vector: list, top_k: int = 8, namespace: Optional[str] = None,
+              filter: Optional[Dict[str, Any]] = None) -> List[dict]:
         t0 = time.time()
-        res = self.index.query(vector=vector, top_k=top_k, include_metadata=True)
+        res = self.index.query(vector=vector, top_k=top_k, include_metadata=True, namespace=namespace or "",
+                               filter=filter)
         latency_ms = int((time.time() - t0) * 1000)
-        return [{"text": m["metadata"].get("text", ""), "score": m.get("score", 0.0), "latency_ms": latency_ms} for m in res.get("matches", [])]
+        return [{"text": m["metadata"].get("text", ""), "score": m.get("score", 0.0), "latency_ms": latency_ms,
+                 "id": m.get("id"), "metadata": m["metadata"]} for m in res.get("matches", [])]
+
+
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+
+
+def _largest_divisor(n: int, at_most: int) -> int:
+    return next(d for d in range(min(n, at_most), 0, -1) if n % d == 0)
+
+
+class _Partition:
+    """One namespace of a FaissStore: its ANN index plus texts, metadata and filter indexes.
+
+    Positions in the index double as row ids; `rows` maps vector ids to
+    their current row. Re-upserting an id tombstones its old row, and
+    the partition is rebuilt without tombstones once they exceed
+    `compact_ratio` of its rows. String/bool/int metadata values get a
+    posting list of row ids per value, numeric values a column (NaN where
+    missing), so filters resolve to a row-id array without visiting
+    non-matching rows.
+    """
+
+    def __init__(self, store: "FaissStore", index=None):
+        faiss = store.faiss
+        self.index = index if index is not None else \
+            faiss.index_factory(store.dim, store.spec, faiss.METRIC_INNER_PRODUCT)
+        self.staging = None if self.index.is_trained else faiss.IndexFlatIP(store.dim)
+        self.store = store
+        self.ids: List[str] = []
+        self.texts: List[str] = []
+        self.metadata: List[dict] = []
+        self.rows: Dict[str, int] = {}
+        self.dead: set = set()
+        self.lexical = BM25Index()
+        self.values: Dict[str, Dict[Any, array]] = {}
+        self.numbers: Dict[str, array] = {}
+        store.tune_index(self.index)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def searchable(self):
+        return self.staging if self.staging is not None else self.index
+
+    def add_vectors(self, mat) -> None:
+        if self.staging is None:
+            self.index.add(mat)
+            return
+        self.staging.add(mat)
+        if self.staging.ntotal >= self.store.train_size:
+            pending = self.staging.reconstruct_n(0, self.staging.ntotal)
+            self.index.train(pending)
+            self.index.add(pending)
+            self._direct_map()
+            self.staging = None
+
+    def _direct_map(self) -> None:
+        if self.store.index_type == "ivfpq":
+            # lets filtered searches and compaction reconstruct rows by id; kept up to date by later adds
+            self.store.faiss.extract_index_ivf(self.index).make_direct_map()
+
+    def add_row(self, vid: str, meta: dict) -> None:
+        row = len(self.texts)
+        previous = self.rows.get(vid)
+        if previous is not None:
+            self.dead.add(previous)
+        self.rows[vid] = row
+        self.ids.append(vid)
+        self.texts.append(meta.get("text", ""))
+        self.metadata.append(meta)
+        self.lexical.add(self.texts[-1])
+        for key, value in meta.items():
+            if key == "text" or value is None:
+                continue
+            if isinstance(value, (str, bool, int)):
+                self.values.setdefault(key, {}).setdefault(value, array("q")).append(row)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                column = self.numbers.setdefault(key, array("d"))
+                column.extend([math.nan] * (row - len(column)))
+                column.append(float(value))
+
+    def delete(self, vid: str) -> bool:
+        row = self.rows.pop(vid, None)
+        if row is None:
+            return False
+        self.dead.add(row)
+        return True
+
+    def needs_compaction(self) -> bool:
+        return bool(self.dead) and len(self.dead) > self.store.compact_ratio * len(self.texts)
+
+    def compacted(self) -> "_Partition":
+        """A copy holding only the live rows, in their current order"""
+        live = np.array(sorted(self.rows.values()), dtype=np.int64)
+        index = None
+        if self.staging is None and self.store.index_type == "ivfpq":
+            # keep the trained quantizers; re-encoding reconstructed vectors gives back the same codes
+            index = self.store.faiss.clone_index(self.index)
+            index.reset()
+        fresh = _Partition(self.store, index)
+        if index is not None:
+            fresh._direct_map()
+        if len(live):
+            fresh.add_vectors(self.searchable.reconstruct_batch(live))
+            for row in live:
+                fresh.add_row(self.ids[row], self.metadata[row])
+        return fresh
+
+    def live(self, rows=None):
+        """`rows` (or every row when None) without tombstones; None when nothing needs excluding"""
+        if not self.dead:
+            return rows
+        dead = np.fromiter(self.dead, dtype=np.int64, count=len(self.dead))
+        if rows is None:
+            rows = np.arange(len(self.texts), dtype=np.int64)
+        return np.setdiff1d(rows, dead, assume_unique=True)
+
+    def select(self, filter: Dict[str, Any]):
+        """Sorted row ids matching every condition of `filter` (tombstones included)"""
+        n = len(self.texts)
+        selected = None
+        for field, op, value in _conditions(filter):
+            if op in ("$eq", "$ne", "$in", "$nin"):
+                wanted = value if op in ("$in", "$nin") else [value]
+                postings = self.values.get(field, {})
+                parts = [np.frombuffer(postings[v], dtype=np.int64) for v in wanted if v in postings]
+                rows = np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int64)
+                if op in ("$ne", "$nin"):
+                    rows = np.setdiff1d(np.arange(n, dtype=np.int64), rows, assume_unique=True)
+            else:
+                column = self.numbers.get(field)
+                if column is None:
+                    rows = np.zeros(0, dtype=np.int64)
+                else:
+                    values = np.full(n, np.nan)
+                    values[:len(column)] = np.frombuffer(column, dtype=np.float64)
+                    compare = {"$gt": np.greater, "$gte": np.greater_equal, "$lt": np.less, "$lte": np.less_equal}[op]
+                    rows = np.flatnonzero(compare(values, float(value)))
+            selected = rows if selected is None else np.intersect1d(selected, rows, assume_unique=True)
+            if not len(selected):
+                break
+        return selected
+
+    def candidates(self, filter: Optional[Dict[str, Any]]):
+        """Rows a query may return: None for all of them, else a sorted row-id array"""
+        if filter:
+            return self.live(self.select(filter))
+        if len(self.dead) <= self.store.overfetch_limit:
+            # a few tombstones are cheaper to skip in the results than to exclude up front
+            return None
+        return self.live()
+
+    def search(self, q, top_k: int, rows=None) -> List[Tuple[int, float]]:
+        """Top live rows for a normalized (1, dim) query, optionally restricted to `rows`"""
+        faiss = self.store.faiss
+        index = self.searchable
+        if rows is None:
+            D, I = index.search(q, top_k + len(self.dead))
+        elif not len(rows):
+            return []
+        elif self.store.index_type == "flat" or self.staging is not None or len(rows) <= self.store.exact_subset:
+            # small subsets are scored exactly from the stored vectors, touching only those rows
+            vectors = index.reconstruct_batch(rows)
+            scores = vectors @ q[0]
+            k = min(top_k, len(rows))
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            D, I = scores[best][None, :], rows[best][None, :]
+        else:
+            selector = faiss.IDSelectorBatch(rows)
+            if self.store.index_type == "hnsw":
+                params = faiss.SearchParametersHNSW(sel=selector, efSearch=self.store.ef_search)
+            else:
+                params = faiss.SearchParametersIVF(sel=selector, nprobe=self.store.nprobe)
+            D, I = index.search(q, top_k, params=params)
+        hits = [(int(idx), float(score)) for idx, score in zip(I[0], D[0])
+                if 0 <= idx < len(self.texts) and idx not in self.dead]
+        return hits[:top_k]
 
 
 class FaissStore(VectorStore):
-    def __init__(self, dim: int):
+    """In-memory FAISS store with namespaces, metadata filters and a BM25 index per namespace.
+
+    `index_type` picks the recall/latency/memory trade-off:
+      flat   exact inner-product search, O(N) per query, full float32 vectors
+      hnsw   graph search (`hnsw_m` links per node), no training; `ef_search`
+             trades latency for recall
+      ivfpq  `nlist` clusters with product-quantised vectors (`pq_m` codes of
+             `pq_bits` bits), roughly dim*4/pq_m times smaller; `nprobe`
+             clusters are scanned per query
+
+    IVF-PQ needs training: the first `train_size` vectors are kept in an
+    exact staging index (and searched there) until there are enough of
+    them, then the index is trained on them and they are moved over.
+
+    Each namespace is a separate index, so a namespaced query never
+    scans other namespaces. Filters resolve to row ids first; subsets of
+    up to `exact_subset` rows are scored exactly from their stored
+    vectors, larger ones are searched with a FAISS ID selector.
+
+    Upserts replace vectors by id: the old row becomes a tombstone that
+    queries skip, and a namespace is compacted once more than
+    `compact_ratio` of its rows are tombstones.
+    """
+
+    def __init__(self, dim: int, index_type: str = "flat", nlist: int = 256, pq_m: int = 64, pq_bits: int = 8,
+                 hnsw_m: int = 32, nprobe: int = 16, ef_search: int = 64, train_size: Optional[int] = None,
+                 exact_subset: int = 20_000, compact_ratio: float = 0.2, overfetch_limit: int = 256):
+        global np
         import faiss  # type: ignore
+        if np is None:
+            import numpy as np
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"index_type must be one of {INDEX_TYPES}, got {index_type!r}")
         self.faiss = faiss
-        self.index = faiss.IndexFlatIP(dim)
-        self.texts: List[str] = []
+        self.dim = dim
+        self.index_type = index_type
+        if index_type == "hnsw":
+            self.spec = f"HNSW{hnsw_m}"
+        elif index_type == "ivfpq":
+            self.spec = f"IVF{nlist},PQ{_largest_divisor(dim, pq_m)}x{pq_bits}"
+        else:
+            self.spec = "Flat"
+        # faiss warns below ~39 training points per centroid
+        self.train_size = train_size or 39 * max(nlist, 2 ** pq_bits)
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.exact_subset = exact_subset
+        self.compact_ratio = compact_ratio
+        self.overfetch_limit = overfetch_limit
+        self.partitions: Dict[str, _Partition] = {}
+
+    def partition(self, namespace: Optional[str] = None, create: bool = False) -> Optional[_Partition]:
+        namespace = namespace or ""
+        part = self.partitions.get(namespace)
+        if part is None and create:
+            part = self.partitions[namespace] = _Partition(self)
+        return part
+
+    @property
+    def index(self):
+        """ANN index of the default namespace"""
+        return self.partition(create=True).index
+
+    @property
+    def texts(self) -> List[str]:
+        return self.partition(create=True).texts
+
+    @property
+    def ntotal(self) -> int:
+        """Live vectors across all namespaces"""
+        return sum(len(part) for part in self.partitions.values())
 
-    def upsert(self, vectors: List[Tuple[str, list, dict]]):
-        import numpy as np
-        mat = np.array([emb for _, emb, _ in vectors], dtype="float32")
+    def tune_index(self, index) -> None:
+        params = self.faiss.ParameterSpace()
+        if self.index_type == "ivfpq":
+            params.set_index_parameter(index, "nprobe", self.nprobe)
+        elif self.index_type == "hnsw":
+            params.set_index_parameter(index, "efSearch", self.ef_search)
+
+    def tune(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> None:
+        """Set the search-time knobs for every namespace (ignored where they do not apply)"""
+        self.nprobe = nprobe if nprobe is not None else self.nprobe
+        self.ef_search = ef_search if ef_search is not None else self.ef_search
+        for part in self.partitions.values():
+            self.tune_index(part.index)
+
+    def upsert(self, vectors: List[Tuple[str, list, dict]], namespace: Optional[str] = None) -> int:
+        # the last occurrence of an id within the batch wins
+        latest = {vid: (emb, meta) for vid, emb, meta in vectors}
+        if not latest:
+            return 0
+        mat = np.array([emb for emb, _ in latest.values()], dtype="float32")
         # normalize for cosine similarity with inner product
-        faiss = self.faiss
-        faiss.normalize_L2(mat)
-        self.index.add(mat)
-        for _, _, meta in vectors:
-            self.texts.append(meta.get("text", ""))
-
-    def query(self, vector: list, top_k: int = 8) -> List[dict]:
-        import numpy as np
+        self.faiss.normalize_L2(mat)
+        part = self.partition(namespace, create=True)
+        part.add_vectors(mat)
+        for vid, (_, meta) in latest.items():
+            part.add_row(vid, meta)
+        self._maybe_compact(namespace)
+        return len(latest)
+
+    def delete(self, ids: List[str], namespace: Optional[str] = None) -> int:
+        part = self.partition(namespace)
+        if part is None:
+            return 0
+        deleted = sum(part.delete(vid) for vid in ids)
+        self._maybe_compact(namespace)
+        return deleted
+
+    def compact(self, namespace: Optional[str] = None) -> None:
+        """Rebuild a namespace without its tombstones"""
+        part = self.partition(namespace)
+        if part is not None and part.dead:
+            self.partitions[namespace or ""] = part.compacted()
+
+    def _maybe_compact(self, namespace: Optional[str]) -> None:
+        if self.partition(namespace).needs_compaction():
+            self.compact(namespace)
+
+    def _query_vector(self, vector: list):
         q = np.array([vector], dtype="float32")
         self.faiss.normalize_L2(q)
+        return q
+
+    def _search(self, vector: list, top_k: int, namespace: Optional[str] = None,
+                filter: Optional[Dict[str, Any]] = None) -> List[Tuple[int, float]]:
+        part = self.partition(namespace)
+        if part is None or not len(part):
+            return []
+        return part.search(self._query_vector(vector), top_k, part.candidates(filter))
+
+    def _result(self, part: _Partition, row: int, score: float, latency_ms: int) -> dict:
+        return {"text": part.texts[row], "score": score, "latency_ms": latency_ms, "id": part.ids[row],
+                "metadata": part.metadata[row]}
+
+    def query(self, vector: list, top_k: int = 8, namespace: Optional[str] = None,
+              filter: Optional[Dict[str, Any]] = None) -> List[dict]:
+        t0 = time.time()
+        hits = self._search(vector, top_k, namespace, filter)
+        latency_ms = int((time.time() - t0) * 1000)
+        part = self.partition(namespace)
+        return [self._result(part, row, score, latency_ms) for row, score in hits]
+
+    def query_hybrid(self, vector: list, text: str, top_k: int = 8, namespace: Optional[str] = None,
+                     filter: Optional[Dict[str, Any]] = None, depth: int = 50) -> List[dict]:
+        """Fuse the dense and BM25 rankings (top `depth` of each) with reciprocal rank fusion"""
         t0 = time.time()
-        D, I = self.index.search(q, top_k)
+        part = self.partition(namespace)
+        if part is None or not len(part):
+            return []
+        depth = max(depth, top_k)
+        rows = part.candidates(filter)
+        dense = [row for row, _ in part.search(self._query_vector(vector), depth, rows)]
+        lexical_rows = rows if rows is not None else part.live()
+        lexical = [row for row, _ in part.lexical.search(text, depth, rows=lexical_rows)]
+        fused = rrf([dense, lexical])[:top_k]
         latency_ms = int((time.time() - t0) * 1000)
-        results = []
-        for idx, score in zip(I[0], D[0]):
-            if 0 <= idx < len(self.texts):
-                results.append({"text": self.texts[idx], "score": float(score), "latency_ms": latency_ms})
-        return results
+        return [self._result(part, row, score, latency_ms) for row, score in fused]
+
+
+def faiss_options_from_env() -> dict:
+    """FaissStore settings for this deployment (FAISS_INDEX_TYPE, FAISS_NLIST, FAISS_NPROBE, ...)"""
+    options = {}
+    if os.environ.get("FAISS_INDEX_TYPE"):
+        options["index_type"] = os.environ["FAISS_INDEX_TYPE"].lower()
+    for name in ("nlist", "pq_m", "pq_bits", "hnsw_m", "nprobe", "ef_search", "train_size", "exact_subset"):
+        value = os.environ.get(f"FAISS_{name.upper()}")
+        if value:
+            options[name] = int(value)
+    return options
 
 
 def get_store(embed_dim: int, index_name: str = "astra-signals-dev") -> VectorStore:
     if os.environ.get("PINECONE_API_KEY"):
         return PineconeStore(index_name=index_name)
-    return FaissStore(dim=embed_dim)
-
-
+    return FaissStore(dim=embed_dim, **faiss_options_from_env())
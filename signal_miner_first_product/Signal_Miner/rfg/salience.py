@@ -0,0 +1,177 @@
+"""Salience ranking of candidate snippets across all signal types.
+
+Every snippet is scored with BM25 term weights against itself: terms
+that are rare in the corpus of past runs (high IDF) and frequent in the
+snippet count most, and length normalisation keeps long paragraphs from
+winning on size alone. Boilerplate seen on many sites and runs gets a low
+IDF and sinks.
+
+Document frequencies are kept in SQLite and updated once per run, so
+the model is fitted incrementally as runs are processed. Without a
+database the corpus is just the snippets being ranked.
+"""
+import os
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# numpy is loaded by the first `scores` call: the vector stores import
+# `tokenize` from here and should not pay for it
+np = None
+
+TOKEN_RE = re.compile(r"\w+")
+
+K1 = 1.2
+B = 0.75
+MIN_WORDS = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS terms (
+    term TEXT PRIMARY KEY,
+    df INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS corpus (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    docs INTEGER NOT NULL,
+    tokens INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fitted_runs (
+    run_key TEXT PRIMARY KEY
+) WITHOUT ROWID;
+"""
+
+
+def default_model_path(output_dir: str) -> str:
+    return os.path.join(output_dir, "salience.db")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def typed_candidates(signals: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(snippet, signal type) for every usable snippet, in signal order, without exact repeats.
+
+    List items are joined with "; ", and a page's prices are joined into a
+    single snippet since each one alone is too short to rank.
+    """
+    snippets: Dict[str, str] = {}
+    for key, items in signals.items():
+        if not isinstance(items, list):
+            continue
+        if key == "prices":
+            prices = [str(p) for p in items if isinstance(p, str)]
+            if prices:
+                snippets.setdefault("Prices: " + "; ".join(prices), key)
+            continue
+        for it in items:
+            if isinstance(it, list):
+                text = "; ".join(map(str, it))
+            elif isinstance(it, str):
+                text = it
+            else:  # structured records such as price_records
+                continue
+            if len(text.split()) >= MIN_WORDS:
+                snippets.setdefault(text, key)
+    return list(snippets.items())
+
+
+def candidate_snippets(signals: Dict[str, Any]) -> List[str]:
+    """Every usable snippet from every signal type (see `typed_candidates`)"""
+    return [text for text, _ in typed_candidates(signals)]
+
+
+class SalienceModel:
+    """BM25 salience with corpus statistics in SQLite (in memory when `db_path` is None)"""
+
+    def __init__(self, db_path: Optional[str] = None, k1: float = K1, b: float = B):
+        self.k1 = k1
+        self.b = b
+        if db_path:
+            parent = os.path.dirname(db_path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+        self.conn = sqlite3.connect(db_path or ":memory:", timeout=30)
+        if db_path:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _corpus(self):
+        row = self.conn.execute("SELECT docs, tokens FROM corpus WHERE id = 1").fetchone()
+        return row if row else (0, 0)
+
+    def _dfs(self, vocab: Sequence[str]) -> "np.ndarray":
+        found: Dict[str, int] = {}
+        for i in range(0, len(vocab), 500):
+            chunk = vocab[i:i + 500]
+            rows = self.conn.execute(
+                f"SELECT term, df FROM terms WHERE term IN ({','.join('?' * len(chunk))})", chunk  # nosec B608
+            ).fetchall()
+            found.update(rows)
+        return np.array([found.get(t, 0) for t in vocab], dtype=np.float64)
+
+    def scores(self, snippets: Sequence[str]) -> "np.ndarray":
+        """Salience of each snippet; the snippets themselves count as part of the corpus"""
+        global np
+        if np is None:
+            import numpy as np
+        if not snippets:
+            return np.zeros(0)
+        docs = [tokenize(s) for s in snippets]
+        vocab = sorted({t for doc in docs for t in doc})
+        index = {t: i for i, t in enumerate(vocab)}
+        tf = np.zeros((len(docs), len(vocab)))
+        for row, doc in enumerate(docs):
+            for t in doc:
+                tf[row, index[t]] += 1
+        lengths = tf.sum(axis=1)
+
+        corpus_docs, corpus_tokens = self._corpus()
+        n = corpus_docs + len(docs)
+        df = self._dfs(vocab) + (tf > 0).sum(axis=0)
+        idf = np.log(1.0 + (n - df + 0.5) / (df + 0.5))
+        avg_len = (corpus_tokens + lengths.sum()) / n
+        norm = self.k1 * (1.0 - self.b + self.b * lengths / avg_len)
+        weights = tf * (self.k1 + 1.0) / (tf + norm[:, None]) * idf
+        unique = np.maximum((tf > 0).sum(axis=1), 1)
+        return weights.sum(axis=1) / np.sqrt(unique)
+
+    def top(self, snippets: Sequence[str], k: int) -> List[str]:
+        """The `k` most salient snippets, best first (ties keep input order)"""
+        scores = self.scores(snippets)
+        order = np.argsort(-scores, kind="stable")[:k]
+        return [snippets[i] for i in order]
+
+    def update(self, snippets: Sequence[str], run_key: Optional[str] = None) -> bool:
+        """Add one run's snippets to the corpus statistics; a `run_key` is only counted once"""
+        with self.conn:
+            if run_key is not None:
+                cur = self.conn.execute("INSERT OR IGNORE INTO fitted_runs (run_key) VALUES (?)", (run_key,))
+                if cur.rowcount == 0:
+                    return False
+            docs = [tokenize(s) for s in snippets]
+            counts: Dict[str, int] = {}
+            for doc in docs:
+                for t in set(doc):
+                    counts[t] = counts.get(t, 0) + 1
+            self.conn.executemany(
+                "INSERT INTO terms (term, df) VALUES (?, ?) ON CONFLICT (term) DO UPDATE SET df = df + excluded.df",
+                counts.items(),
+            )
+            self.conn.execute(
+                """
+                INSERT INTO corpus (id, docs, tokens) VALUES (1, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET docs = docs + excluded.docs, tokens = tokens + excluded.tokens
+                """,
+                (len(docs), sum(map(len, docs))),
+            )
+        return True
@@ -0,0 +1,197 @@
+"""Decision Pack schema, with local repair of common LLM output defects.
+
+The pack the model returns is checked against `DecisionPack` (compiled
+once by store/serialization.py). Before anything goes back to the model,
+defects with one obvious fix are repaired here, deterministically:
+
+- a bullet or numbered string where a list is expected is split into items
+- a list where a string is expected is joined
+- `confidence` is mapped onto "Low"/"Medium"/"High" (case, "med",
+  numbers such as 0.8 or 80)
+- `expected_lift` gets a lowercase level; a bare string becomes
+  {"level", "metric"} when it names a level
+- strings and lists are clamped to `TEXT_LIMITS`/`LIST_LIMITS`
+
+Only fields that are missing, empty or beyond repair are listed as
+failed; `retry_prompt()` asks the model for just those fields, and
+`fill_defaults()` gives any still failing the old placeholder values so
+the UI and executor always receive a valid pack.
+"""
+import copy
+import re
+from typing import Any, Dict, List, Literal, Optional, Required, Tuple, TypedDict
+
+from store.serialization import dumps, validate
+
+Level = Literal["low", "medium", "high"]
+Confidence = Literal["Low", "Medium", "High"]
+
+
+class ExpectedLift(TypedDict, total=False):
+    level: Required[Level]
+    metric: Required[str]
+    range: str
+    timeframe: str
+
+
+class DecisionPack(TypedDict):
+    title: str
+    hypothesis: str
+    expected_lift: ExpectedLift
+    confidence: Confidence
+    confidence_justification: List[str]
+    risks: List[str]
+    assets_needed: List[str]
+    suggested_execution_steps: List[str]
+
+
+REQUIRED_KEYS = list(DecisionPack.__annotations__)
+LIST_KEYS = [k for k in REQUIRED_KEYS if DecisionPack.__annotations__[k] == List[str]]
+
+# what the prompt template asks for, sent again when a field is retried
+FIELD_SPECS = {
+    "title": "title (short, specific)",
+    "hypothesis": "hypothesis (2-4 sentences)",
+    "expected_lift": 'expected_lift (object: {"level": "low|medium|high", "metric": "what metric"})',
+    "confidence": 'confidence ("Low"|"Medium"|"High")',
+    "confidence_justification": "confidence_justification (array of 2-4 short bullets)",
+    "risks": "risks (array of 2-4 short bullets)",
+    "assets_needed": 'assets_needed (array like ["LP snippet", "3-email sequence", "LinkedIn copy"])',
+    "suggested_execution_steps": "suggested_execution_steps (array of 3-6 numbered-like steps)",
+}
+
+TEXT_LIMITS = {"title": 120, "hypothesis": 1000, "metric": 120, "item": 300}
+LIST_LIMITS = {"confidence_justification": 4, "risks": 4, "assets_needed": 6, "suggested_execution_steps": 6}
+
+DEFAULTS = {"title": "", "hypothesis": "", "expected_lift": {"level": "medium", "metric": ""},
+            "confidence": "Medium", "confidence_justification": [], "risks": [], "assets_needed": [],
+            "suggested_execution_steps": []}
+
+BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+LEVEL_WORDS = {"low": "low", "med": "medium", "medium": "medium", "moderate": "medium", "high": "high"}
+LEVEL_RE = re.compile(r"\b(low|medium|med|moderate|high)\b", re.IGNORECASE)
+
+
+class Unrepairable(ValueError):
+    """A field value with no deterministic fix"""
+
+
+def clamp(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[:limit - 3]
+    return (cut.rsplit(" ", 1)[0] if " " in cut else cut) + "..."
+
+
+def _text(value: Any, limit: int) -> str:
+    if isinstance(value, list) and all(isinstance(v, (str, int, float)) for v in value):
+        value = " ".join(str(v).strip() for v in value)
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        value = str(value)
+    if not isinstance(value, str) or not value.strip():
+        raise Unrepairable("expected text")
+    return clamp(" ".join(value.split()), limit)
+
+
+def _items(value: Any, limit: int) -> List[str]:
+    if isinstance(value, str):
+        lines = [line for line in value.splitlines() if line.strip()]
+        if len(lines) == 1 and ";" in lines[0]:
+            lines = lines[0].split(";")
+        value = [BULLET_RE.sub("", line) for line in lines]
+    if not isinstance(value, list):
+        raise Unrepairable("expected a list")
+    items: List[str] = []
+    for item in value:
+        if isinstance(item, dict) and len(item) == 1:
+            item = next(iter(item.values()))  # {"step": "..."}
+        try:
+            text = _text(item, TEXT_LIMITS["item"])
+        except Unrepairable:
+            continue
+        if text not in items:
+            items.append(text)
+    if not items:
+        raise Unrepairable("no usable items")
+    return items[:limit]
+
+
+def _level(value: Any) -> str:
+    match = LEVEL_RE.search(value) if isinstance(value, str) else None
+    if not match:
+        raise Unrepairable("expected low, medium or high")
+    return LEVEL_WORDS[match.group(1).lower()]
+
+
+def _confidence(value: Any) -> str:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        score = value / 100 if value > 1 else value
+        if not 0 <= score <= 1:
+            raise Unrepairable("confidence score out of range")
+        return "High" if score >= 0.7 else "Medium" if score >= 0.4 else "Low"
+    return _level(value).capitalize()
+
+
+def _expected_lift(value: Any) -> Dict[str, Any]:
+    if isinstance(value, str):
+        return {"level": _level(value), "metric": _text(value, TEXT_LIMITS["metric"])}
+    if not isinstance(value, dict):
+        raise Unrepairable("expected an object")
+    lift = dict(value)
+    lift["level"] = _level(value.get("level"))
+    lift["metric"] = _text(value.get("metric"), TEXT_LIMITS["metric"]) if value.get("metric") else ""
+    for key in ("range", "timeframe"):
+        if key in lift:
+            try:
+                lift[key] = _text(lift[key], TEXT_LIMITS["metric"])
+            except Unrepairable:
+                del lift[key]
+    return lift
+
+
+REPAIRS = {
+    "title": lambda v: _text(v, TEXT_LIMITS["title"]),
+    "hypothesis": lambda v: _text(v, TEXT_LIMITS["hypothesis"]),
+    "expected_lift": _expected_lift,
+    "confidence": _confidence,
+    **{k: (lambda v, k=k: _items(v, LIST_LIMITS[k])) for k in LIST_KEYS},
+}
+
+
+def repair_pack(pack: Dict[str, Any], fields: Optional[List[str]] = None) -> Tuple[Dict[str, Any], Dict[str, List[str]]]:
+    """Repaired copy of `pack` and a report: fields `repaired` (changed) and `failed` (missing or unrepairable).
+
+    Only `fields` (default: every required field) are looked at; other keys are kept as they are.
+    """
+    fixed = dict(pack) if isinstance(pack, dict) else {}
+    report: Dict[str, List[str]] = {"repaired": [], "failed": []}
+    for key in fields or REQUIRED_KEYS:
+        if key not in fixed:
+            report["failed"].append(key)
+            continue
+        try:
+            value = REPAIRS[key](fixed[key])
+        except Unrepairable:
+            report["failed"].append(key)
+            continue
+        if value != fixed[key]:
+            report["repaired"].append(key)
+        fixed[key] = value
+    return fixed, report
+
+
+def retry_prompt(pack: Dict[str, Any], fields: List[str]) -> str:
+    """Prompt asking the model for `fields` only, with the pack's valid fields as context"""
+    context = {k: v for k, v in pack.items() if k in REQUIRED_KEYS and k not in fields}
+    lines = "\n".join(f"- {FIELD_SPECS[k]}" for k in fields)
+    return (f"This Decision Pack is missing valid values for some fields:\n{dumps(context)}\n\n"
+            f"Output a single JSON object only with these fields:\n{lines}\n\n"
+            "Do not include any markdown or commentary, only JSON.")
+
+
+def fill_defaults(pack: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """`pack` with placeholder values for `fields`, checked against DecisionPack (SchemaError if still invalid)"""
+    filled = dict(pack)
+    for key in fields:
+        filled[key] = copy.deepcopy(DEFAULTS[key])
+    return validate(filled, DecisionPack)
@@ -7,6 +7,9 @@ import os
 import sys
 from pathlib import Path
 
+# pinecone_helper is part of the rfg package, so import it from Signal_Miner/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
 def test_openai():
     """Test OpenAI API connection"""
     print("🔍 Testing OpenAI connection...")
@@ -51,7 +54,7 @@ def test_faiss():
     """Test FAISS fallback"""
     print("🔍 Testing FAISS fallback...")
     try:
-        from pinecone_helper import get_store
+        from rfg.pinecone_helper import get_store
         
         # This should use FAISS if Pinecone is not available
         store = get_store(embed_dim=1536)
@@ -0,0 +1,132 @@
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+BOILERPLATE = "Start your free trial today and get full access to every feature for fourteen days"
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.inputs = []
+
+    def create(self, model, input):
+        self.inputs.extend(input)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(t)), 1.0, 0.5]) for t in input])
+
+
+def test_minhash_similarity_tracks_jaccard():
+    """One changed word stays above the threshold, unrelated text does not"""
+    from rfg.dedup import THRESHOLD, minhash, similarity
+
+    near = BOILERPLATE.replace("Start", "Begin")
+    assert similarity(minhash(BOILERPLATE), minhash(BOILERPLATE.upper() + "!")) == 1.0
+    assert similarity(minhash(BOILERPLATE), minhash(near)) >= THRESHOLD
+    assert similarity(minhash(BOILERPLATE), minhash("Pricing plans for enterprise security teams")) < THRESHOLD
+
+
+def test_index_persists_snippets_and_embeddings():
+    """Known snippets come back with their stored embedding in a later session"""
+    from rfg.dedup import SnippetIndex
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "snippets.db")
+        with SnippetIndex(path) as index:
+            novel, known, dropped = index.split([BOILERPLATE, BOILERPLATE + ".", "Other text about pricing"], "m")
+            assert novel == [BOILERPLATE, "Other text about pricing"] and known == [] and dropped == 1
+            assert index.add(novel, [[1.0, 0.0], [0.0, 1.0]], "m", "a.com") == 2
+
+        with SnippetIndex(path) as index:
+            novel, known, dropped = index.split(["Other text about pricing", "Brand new snippet"], "m")
+            assert novel == ["Brand new snippet"]
+            assert known == [("Other text about pricing", [0.0, 1.0])]
+            # another embedding model is a separate namespace
+            novel, known, _ = index.split(["Other text about pricing"], "other-model")
+            assert novel == ["Other text about pricing"] and known == []
+
+
+def test_embed_snippets_only_embeds_novel():
+    """A second run over the same snippets makes no embedding calls"""
+    from rfg.generate_pack import embed_snippets
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        embeddings = CountingEmbeddings()
+        client = SimpleNamespace(embeddings=embeddings)
+        path = os.path.join(temp_dir, "snippets.db")
+        snippets = [BOILERPLATE, BOILERPLATE, "Plans start at $29 per month for small teams"]
+
+        store, embeds, stats = embed_snippets(client, "a.com", snippets, "m", "unused", path)
+        assert embeddings.inputs == [BOILERPLATE, snippets[2]]
+        assert len(embeds) == 2 and stats["near_duplicates"] == 1
+
+        store, embeds, stats = embed_snippets(client, "b.com", snippets, "m", "unused", path)
+        assert len(embeddings.inputs) == 2
+        assert stats["embedded"] == 0 and stats["reused"] == 2
+        # the in-memory store still gets every distinct snippet for retrieval
+        assert len(store.query([1.0, 1.0, 1.0], top_k=5)) == 2
+
+
+def test_failed_embedding_call_refunds_the_workspace_charge():
+    """The embed charge is released when the call raises, so a retry is not billed twice against the budget"""
+    import pytest
+    from rfg.generate_pack import embed_snippets
+    from store.run_store import RunStore
+    from store.tenants import Workspace
+
+    class FailingEmbeddings:
+        def create(self, model, input):
+            raise ConnectionError("embeddings endpoint unreachable")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workspace = Workspace("acme", base_dir=temp_dir).create()
+        path = os.path.join(temp_dir, "snippets.db")
+        snippets = [BOILERPLATE, "Plans start at $29 per month for small teams"]
+
+        with pytest.raises(ConnectionError):
+            embed_snippets(SimpleNamespace(embeddings=FailingEmbeddings()), "a.com", snippets, "m", "unused", path,
+                           workspace=workspace)
+        with RunStore(workspace.db_path) as store:
+            assert store.spend_on() == 0
+
+        embed_snippets(SimpleNamespace(embeddings=CountingEmbeddings()), "a.com", snippets, "m", "unused", path,
+                       workspace=workspace)
+        with RunStore(workspace.db_path) as store:
+            assert store.spend_on() > 0
+
+
+def test_reused_snippets_are_retrievable_per_domain():
+    """A snippet first embedded for one domain is upserted for the next, so its filtered query finds it"""
+    from unittest.mock import patch
+    from rfg.generate_pack import embed_snippets
+    from rfg.pinecone_helper import VectorStore, metadata_filter
+
+    class PersistentStore(VectorStore):
+        persistent = True
+
+        def __init__(self):
+            self.vectors = {}
+
+        def upsert(self, vectors, namespace=None):
+            for vid, emb, meta in vectors:
+                self.vectors[(namespace, vid)] = (emb, meta)
+
+        def query(self, vector, top_k=8, namespace=None, filter=None):
+            domain = filter["domain"]["$eq"] if filter else None
+            return [dict(meta, id=vid) for (ns, vid), (_, meta) in self.vectors.items()
+                    if ns == namespace and (domain is None or meta["domain"] == domain)][:top_k]
+
+    store = PersistentStore()
+    with tempfile.TemporaryDirectory() as temp_dir, patch("rfg.generate_pack.get_store", return_value=store):
+        embeddings = CountingEmbeddings()
+        client = SimpleNamespace(embeddings=embeddings)
+        path = os.path.join(temp_dir, "snippets.db")
+        embed_snippets(client, "a.com", [BOILERPLATE], "m", "unused", path)
+        _, _, stats = embed_snippets(client, "b.com", [BOILERPLATE, "Teams save 20% on annual plans"],
+                                     "m", "unused", path)
+
+    assert stats["reused"] == 1 and embeddings.inputs == [BOILERPLATE, "Teams save 20% on annual plans"]
+    found = store.query([1.0, 1.0, 1.0], filter=metadata_filter(domain="b.com"))
+    assert sorted(r["text"] for r in found) == [BOILERPLATE, "Teams save 20% on annual plans"]
@@ -0,0 +1,125 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def vectors(n, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(n, dim)).astype("float32")
+
+
+def test_hnsw_finds_exact_neighbour():
+    """HNSW answers like the flat index on a small set and accepts efSearch"""
+    from rfg.pinecone_helper import FaissStore
+
+    data = vectors(500)
+    store = FaissStore(16, index_type="hnsw", ef_search=64)
+    store.upsert([(str(i), v.tolist(), {"text": f"doc {i}"}) for i, v in enumerate(data)])
+    store.tune(ef_search=128)
+    assert store.query(data[42].tolist(), top_k=1)[0]["text"] == "doc 42"
+
+
+def test_ivfpq_trains_on_first_fill():
+    """Vectors are searched exactly until enough arrive to train IVF-PQ"""
+    from rfg.pinecone_helper import FaissStore
+
+    data = vectors(400)
+    store = FaissStore(16, index_type="ivfpq", nlist=4, pq_m=4, pq_bits=4, nprobe=4, train_size=300)
+    store.upsert([(str(i), v.tolist(), {"text": f"doc {i}"}) for i, v in enumerate(data[:200])])
+    assert not store.index.is_trained and store.ntotal == 200
+    assert store.query(data[7].tolist(), top_k=1)[0]["text"] == "doc 7"
+
+    store.upsert([(str(i), v.tolist(), {"text": f"doc {i}"}) for i, v in enumerate(data[200:], start=200)])
+    assert store.index.is_trained and store.index.ntotal == 400
+    hits = [r["text"] for r in store.query(data[250].tolist(), top_k=5)]
+    assert "doc 250" in hits
+
+
+def test_index_type_from_env(monkeypatch):
+    """Deployments pick the index through FAISS_* variables"""
+    from rfg.pinecone_helper import FaissStore, get_store
+
+    monkeypatch.delenv("PINECONE_API_KEY", raising=False)
+    monkeypatch.setenv("FAISS_INDEX_TYPE", "HNSW")
+    monkeypatch.setenv("FAISS_EF_SEARCH", "32")
+    store = get_store(embed_dim=8)
+    assert store.index_type == "hnsw"
+    with pytest.raises(ValueError):
+        FaissStore(8, index_type="ivf")
+
+
+def test_filters_and_namespaces_restrict_results():
+    """Filters and namespaces only return matching vectors, for exact and ANN indexes"""
+    from rfg.pinecone_helper import FaissStore, metadata_filter
+
+    data = vectors(600)
+    for index_type, options in (("flat", {}), ("hnsw", {"exact_subset": 10})):
+        store = FaissStore(16, index_type=index_type, **options)
+        store.upsert([(str(i), v.tolist(), {"text": f"doc {i}", "domain": f"site{i % 3}.com",
+                                            "signal_type": "pricing" if i % 2 else "features",
+                                            "date": 20250101 + i % 30}) for i, v in enumerate(data)])
+        store.upsert([("other", data[5].tolist(), {"text": "tenant b", "domain": "site2.com"})], namespace="b")
+
+        flt = metadata_filter(domain="site2.com", since="2025-01-10", signal_type="pricing")
+        hits = store.query(data[17].tolist(), top_k=20, filter=flt)
+        assert hits and hits[0]["text"] == "doc 17"
+        for hit in hits:
+            meta = hit["metadata"]
+            assert meta["domain"] == "site2.com" and meta["signal_type"] == "pricing" and meta["date"] >= 20250110
+        assert all(h["metadata"]["domain"] != "site0.com"
+                   for h in store.query(data[0].tolist(), top_k=50, filter={"domain": {"$ne": "site0.com"}}))
+        assert store.query(data[5].tolist(), top_k=5, filter={"domain": "nowhere"}) == []
+
+        assert [h["id"] for h in store.query(data[5].tolist(), top_k=5, namespace="b")] == ["other"]
+        assert store.query(data[5].tolist(), top_k=5, namespace="missing") == []
+        hybrid = store.query_hybrid(data[7].tolist(), "doc 7", top_k=5, filter={"domain": "site1.com"})
+        assert hybrid[0]["text"] == "doc 7" and {h["metadata"]["domain"] for h in hybrid} == {"site1.com"}
+
+
+def test_upsert_replaces_by_id_and_compacts():
+    """Re-upserted ids replace their vector, tombstones are skipped and compacted away"""
+    from rfg.pinecone_helper import FaissStore, vector_id
+
+    assert vector_id("a.com", "Pro plan") == vector_id("a.com", "Pro plan") != vector_id("b.com", "Pro plan")
+    data = vectors(400)
+    for index_type, options in (("flat", {}), ("ivfpq", {"nlist": 4, "pq_m": 4, "pq_bits": 4, "nprobe": 4,
+                                                          "train_size": 100, "exact_subset": 10})):
+        store = FaissStore(16, index_type=index_type, compact_ratio=0.5, **options)
+        store.upsert([(str(i), v.tolist(), {"text": f"doc {i}", "kind": "old"}) for i, v in enumerate(data[:200])])
+        store.upsert([(str(i), v.tolist(), {"text": f"doc {i}", "kind": "old"}) for i, v in enumerate(data[:200])])
+        assert store.ntotal == 200
+
+        # doc 3 now holds doc 300's vector
+        store.upsert([("3", data[300].tolist(), {"text": "doc 3 v2", "kind": "new"})])
+        # more than half the rows were tombstones, so the namespace was rebuilt
+        assert len(store.partition().texts) == 200 and not store.partition().dead
+        assert store.query(data[300].tolist(), top_k=1)[0]["text"] == "doc 3 v2"
+        assert "doc 3" not in [h["text"] for h in store.query(data[3].tolist(), top_k=5)]
+        assert [h["text"] for h in store.query(data[300].tolist(), top_k=3, filter={"kind": "new"})] == ["doc 3 v2"]
+
+        assert store.delete(["3", "4", "missing"]) == 2
+        assert store.ntotal == 198 and len(store.partition().dead) == 2
+        assert "doc 3 v2" not in [h["text"] for h in store.query_hybrid(data[300].tolist(), "doc 3 v2", top_k=5)]
+        store.compact()
+        assert len(store.partition().texts) == 198 and not store.partition().dead
+        assert store.query(data[10].tolist(), top_k=1)[0]["text"] == "doc 10"
+
+
+def test_pinecone_upsert_is_chunked():
+    """Large upserts are split into batches and nothing is lost"""
+    from unittest.mock import MagicMock
+
+    from rfg.pinecone_helper import PineconeStore
+
+    store = PineconeStore.__new__(PineconeStore)
+    store.index, store.batch_size, store.workers = MagicMock(), 100, 4
+    assert store.upsert([(str(i), [0.1], {"text": "t", "date": None}) for i in range(250)], namespace="acme") == 250
+    calls = store.index.upsert.call_args_list
+    assert sorted(len(c.kwargs["vectors"]) for c in calls) == [50, 100, 100]
+    assert {c.kwargs["namespace"] for c in calls} == {"acme"}
+    assert "date" not in calls[0].kwargs["vectors"][0]["metadata"]
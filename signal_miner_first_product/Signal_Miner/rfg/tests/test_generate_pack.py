@@ -63,7 +63,9 @@ def test_generate_pack_for_run():
                 temp_file = f.name
             
             try:
-                result = generate_pack_for_run(temp_file)
+                with tempfile.TemporaryDirectory() as tmp:
+                    result = generate_pack_for_run(temp_file, snippet_index=os.path.join(tmp, "snippets.db"),
+                                                   salience_db=os.path.join(tmp, "salience.db"))
                 
                 # Check structure
                 assert "pack" in result
@@ -215,9 +217,48 @@ def test_error_handling():
                 assert "not found" in str(e)
 
 
+def test_save_pack_records_in_run_store():
+    """Saved packs are indexed in the run store and the latest run path is found there"""
+    from rfg.generate_pack import find_latest_output, save_pack
+    from store.run_store import RunStore
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "runs.db")
+        run_path = os.path.join(temp_dir, "test.com.json")
+        with open(run_path, "w") as f:
+            json.dump({"domain": "test.com", "signals": {}}, f)
+        with RunStore(db_path) as store:
+            store.record_run({"domain": "test.com", "timestamp": "2024-01-01T00:00:00+00:00", "signals": {}},
+                             run_path)
+        assert find_latest_output(temp_dir) == run_path
+
+        outfile = save_pack({"title": "Test"}, "test.com", os.path.join(temp_dir, "packs"), db_path=db_path)
+        with RunStore(db_path) as store:
+            pack = store.latest_pack("test.com")
+        assert pack["path"] == outfile and pack["pack"] == {"title": "Test"}
+
+
+def test_collect_snippets_ranks_across_signal_types():
+    """Lists and prices compete with headlines instead of being cut off after the first k"""
+    from rfg.generate_pack import collect_snippets
+
+    site = {
+        "domain": "test.com",
+        "signals": {
+            "headlines_paragraphs": [f"Welcome to our website and thanks for visiting us {i}" for i in range(12)],
+            "lists": [["SOC 2 audit logs", "SAML single sign-on", "Dedicated support engineer"]],
+            "prices": ["$29/month", "$99/month"],
+            "price_records": [{"raw": "$29/month", "amount": 29.0}],
+        },
+    }
+
+    _, snippets = collect_snippets(site, k=3)
+    assert len(snippets) == 3
+    assert "SOC 2 audit logs; SAML single sign-on; Dedicated support engineer" in snippets
+    assert "Prices: $29/month; $99/month" in snippets
+
+
 if __name__ == "__main__":
     # Run tests
     import pytest
     pytest.main([__file__, "-v"])
-
-
@@ -0,0 +1,48 @@
+import os
+import sys
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def test_bm25_ranks_exact_terms_and_updates_incrementally():
+    """Rare exact terms win, and documents added later are searchable"""
+    from rfg.lexical import BM25Index
+
+    index = BM25Index()
+    index.extend([
+        "Pro plan includes analytics dashboards",
+        "Enterprise plan includes SSO and audit logs",
+        "Starter plan for small teams",
+    ])
+    assert index.search("audit logs", top_k=2)[0][0] == 1
+    assert index.search("nothing matches", top_k=2) == []
+
+    doc_id = index.add("Acme Turbo X200 router at $149")
+    hits = index.search("X200", top_k=3)
+    assert [d for d, _ in hits] == [doc_id]
+    assert [d for d, _ in index.search("plan", top_k=10)] and len(index.search("plan", top_k=2)) == 2
+
+
+def test_rrf_rewards_agreement():
+    """Ids ranked by both lists beat ids that top only one"""
+    from rfg.lexical import rrf
+
+    fused = rrf([[1, 2, 3], [3, 4, 1]])
+    assert [doc_id for doc_id, _ in fused][:2] == [1, 3]
+
+
+def test_faiss_hybrid_query_finds_lexical_match():
+    """A snippet the dense query misses is surfaced by its exact terms"""
+    from rfg.pinecone_helper import FaissStore
+
+    store = FaissStore(dim=2)
+    store.upsert([
+        ("a", [1.0, 0.0], {"text": "Fast onboarding for growing teams"}),
+        ("b", [0.9, 0.1], {"text": "Loved by thousands of companies"}),
+        ("c", [0.0, 1.0], {"text": "Acme Turbo X200 costs $149"}),
+    ])
+    dense = [r["text"] for r in store.query([1.0, 0.0], top_k=2)]
+    assert "Acme Turbo X200 costs $149" not in dense
+    hybrid = [r["text"] for r in store.query_hybrid([1.0, 0.0], "Turbo X200", top_k=2, depth=2)]
+    assert "Acme Turbo X200 costs $149" in hybrid
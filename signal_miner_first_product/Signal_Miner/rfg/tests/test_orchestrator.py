@@ -0,0 +1,119 @@
+import os
+import sys
+import tempfile
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+HEADLINES = [f"Headline number {i} about the product launch plans" for i in range(20)]
+
+
+def site(timestamp, headlines=HEADLINES, prices=None, error=None):
+    return {"url": "https://a.test/", "domain": "a.test", "timestamp": timestamp, "error": error, "snapshot": None,
+            "signals": {"headlines_paragraphs": list(headlines), "lists": [],
+                        "price_records": prices or [{"amount": 49.0, "currency": "USD", "period": "month"}]}}
+
+
+def test_pipeline_runs_only_when_signals_move():
+    """Unchanged and slightly changed runs cost nothing; big or price changes regenerate once"""
+    from rfg.orchestrator import Orchestrator
+    from store.run_store import RunStore
+
+    calls = []
+
+    def generate(run_id):
+        calls.append(run_id)
+        return {"pack_id": None}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "runs.db")
+        orch = Orchestrator(db, min_change=0.2, generate=generate)
+        with RunStore(db) as store:
+            first = store.record_run(site("2025-01-01T00:00:00"))
+            same = store.record_run(site("2025-01-02T00:00:00", [h.upper() + "  " for h in HEADLINES]))
+            drift = store.record_run(site("2025-01-03T00:00:00", HEADLINES[1:] + ["A brand new headline about pricing"]))
+            price = store.record_run(site("2025-01-04T00:00:00", prices=[{"amount": 59.0, "currency": "USD"}]))
+            failed = store.record_run(site("2025-01-05T00:00:00", error="HTTP 503"))
+
+        assert orch.process_run(first)["action"] == "generated"
+        assert orch.process_run(same)["action"] == "unchanged"
+        outcome = orch.process_run(drift)
+        assert outcome["action"] == "below_threshold" and 0 < outcome["change"] < 0.2
+        assert orch.process_run(price)["action"] == "generated"
+        assert orch.process_run(failed)["action"] == "skipped"
+        assert calls == [first, price]
+
+        # the baseline is the last generated run, so drift accumulates
+        with RunStore(db) as store:
+            moved = store.record_run(site("2025-01-06T00:00:00", HEADLINES[8:],
+                                          prices=[{"amount": 59.0, "currency": "USD"}]))
+        assert orch.process_latest(["a.test"])[0]["action"] == "generated" and calls[-1] == moved
+        assert orch.process_run(moved, force=True)["action"] == "generated" and len(calls) == 4
+
+
+def test_overlapping_runs_are_claimed_once():
+    """A domain being regenerated is not picked up again; failures and stale claims release it"""
+    from rfg.orchestrator import Orchestrator
+    from store.run_store import RunStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "runs.db")
+        with RunStore(db) as store:
+            run_id = store.record_run(site("2025-01-01T00:00:00"))
+            other = store.record_run(site("2025-01-02T00:00:00", HEADLINES[:5]))
+
+        nested = []
+
+        def generate(rid):
+            # an overlapping run arrives while this one is still generating
+            nested.append(Orchestrator(db, generate=generate).process_run(other)["action"])
+            return {"pack_id": None}
+
+        assert Orchestrator(db, generate=generate).process_run(run_id)["action"] == "generated"
+        assert nested == ["in_progress"]
+
+        def boom(rid):
+            raise RuntimeError("LLM unavailable")
+
+        outcome = Orchestrator(db, generate=boom).process_run(other)
+        assert outcome["action"] == "failed" and "LLM" in outcome["reason"]
+        with RunStore(db) as store:
+            assert store.pipeline_state("a.test")["pending"] is None
+            assert store.claim_pipeline("a.test", "fp", stale_before="2000-01-01")
+            assert not store.claim_pipeline("a.test", "fp2", stale_before="2000-01-01")
+            assert store.claim_pipeline("a.test", "fp2", stale_before="2100-01-01")
+
+
+def test_claim_after_another_process_generated_the_same_fingerprint():
+    """A process that decided before a concurrent one finished does not generate the same signals again"""
+    from rfg.orchestrator import Orchestrator
+    from store.run_store import RunStore
+
+    calls = []
+
+    def generate(run_id):
+        calls.append(run_id)
+        return {"pack_id": None}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "runs.db")
+        with RunStore(db) as store:
+            run_id = store.record_run(site("2025-01-01T00:00:00"))
+        raced = []
+
+        class Racing(Orchestrator):
+            def decide(self, state, hashes):
+                decided = super().decide(state, hashes)
+                if not raced:
+                    # between this process's decision and its claim, another one generates the run
+                    raced.append(Orchestrator(db, generate=generate).process_run(run_id)["action"])
+                return decided
+
+        outcome = Racing(db, generate=generate).process_run(run_id)
+        assert raced == ["generated"] and outcome["action"] == "unchanged" and calls == [run_id]
+
+        with RunStore(db) as store:
+            fp = store.pipeline_state("a.test")["fingerprint"]
+            assert store.pipeline_state("a.test")["pending"] is None
+            assert not store.claim_pipeline("a.test", fp, stale_before="2000-01-01")
+            assert store.claim_pipeline("a.test", fp, stale_before="2000-01-01", force=True)
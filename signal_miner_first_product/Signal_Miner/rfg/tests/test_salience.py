@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+BOILERPLATE = "Sign up for our newsletter to get the latest news"
+
+
+def test_corpus_statistics_demote_boilerplate():
+    """Text seen across past runs ranks below site-specific text"""
+    from rfg.salience import SalienceModel
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "salience.db")
+        with SalienceModel(path) as model:
+            for i in range(20):
+                assert model.update([BOILERPLATE, f"Site {i} sells shoes and boots online"], run_key=f"s{i}")
+            # the same run is only counted once
+            assert not model.update([BOILERPLATE], run_key="s0")
+
+        specific = "Kubernetes cost monitoring with per-namespace budgets"
+        with SalienceModel(path) as model:
+            assert model.top([BOILERPLATE, specific], k=1) == [specific]
+            scores = model.scores([BOILERPLATE, specific])
+            assert scores[1] > scores[0]
+
+
+def test_candidate_snippets_skip_records_and_repeats():
+    """Structured records are skipped, repeats kept once, prices joined"""
+    from rfg.salience import candidate_snippets
+
+    signals = {
+        "headlines_paragraphs": ["One two three four", "One two three four", "too short"],
+        "prices": ["$5/mo"],
+        "price_records": [{"raw": "$5/mo"}],
+    }
+    assert candidate_snippets(signals) == ["One two three four", "Prices: $5/mo"]
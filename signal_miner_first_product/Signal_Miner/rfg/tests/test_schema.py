@@ -0,0 +1,75 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+class ScriptedChat:
+    """Chat client returning queued JSON payloads and recording the prompts it was sent"""
+
+    def __init__(self, *payloads):
+        self.payloads = list(payloads)
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, model, messages, temperature, response_format):
+        self.prompts.append(messages[-1]["content"])
+        content = json.dumps(self.payloads.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def test_repair_pack_fixes_common_defects_locally():
+    """Strings become lists, confidence and lift levels are normalised and lengths clamped without the LLM"""
+    from rfg.generate_pack import validated_pack
+
+    raw = {
+        "title": ["Enterprise", "pricing tier"],
+        "hypothesis": "An enterprise tier   captures larger teams. " * 40,
+        "expected_lift": "High lift on demo requests",
+        "confidence": 0.82,
+        "confidence_justification": "- Competitors added one\n- Sales asks for SSO",
+        "risks": "Longer sales cycle; support load",
+        "assets_needed": ["LP snippet", "LP snippet", {"asset": "Sales deck"}, None],
+        "suggested_execution_steps": [f"{i}. Step {i}" for i in range(1, 9)],
+        "notes": "kept",
+    }
+    client = ScriptedChat()
+    pack, report = validated_pack(client, "gpt-4o-mini", raw)
+
+    assert client.prompts == [] and report["retried"] == [] and report["defaulted"] == []
+    assert pack["title"] == "Enterprise pricing tier"
+    assert len(pack["hypothesis"]) <= 1000 and pack["hypothesis"].endswith("...")
+    assert pack["expected_lift"] == {"level": "high", "metric": "High lift on demo requests"}
+    assert pack["confidence"] == "High"
+    assert pack["confidence_justification"] == ["Competitors added one", "Sales asks for SSO"]
+    assert pack["risks"] == ["Longer sales cycle", "support load"]
+    assert pack["assets_needed"] == ["LP snippet", "Sales deck"]
+    assert pack["suggested_execution_steps"] == [f"{i}. Step {i}" for i in range(1, 7)]
+    assert pack["notes"] == "kept" and "notes" not in report["repaired"]
+
+
+def test_only_unrepairable_fields_are_retried():
+    """The retry prompt asks for just the failing fields; anything still invalid falls back to defaults"""
+    from rfg.generate_pack import validated_pack
+    from rfg.schema import DecisionPack
+    from store.serialization import validate
+
+    raw = {"title": "Usage-based pricing", "hypothesis": "Metered plans convert trial teams.",
+           "expected_lift": {"level": "huge", "metric": "conversion"}, "confidence": "Medium",
+           "confidence_justification": ["j1", "j2"], "assets_needed": ["LP snippet"],
+           "suggested_execution_steps": ["s1", "s2", "s3"]}
+    client = ScriptedChat({"risks": ["Bill shock", "Revenue variance"], "expected_lift": {"metric": "x"},
+                           "title": "ignored"})
+    pack, report = validated_pack(client, "gpt-4o-mini", raw)
+
+    assert report == {"repaired": ["risks"], "retried": ["expected_lift", "risks"], "defaulted": ["expected_lift"]}
+    assert len(client.prompts) == 1
+    prompt = client.prompts[0]
+    assert "- expected_lift (" in prompt and "- risks (" in prompt and "- title (" not in prompt
+    assert "Usage-based pricing" in prompt
+    assert pack["title"] == "Usage-based pricing" and pack["risks"] == ["Bill shock", "Revenue variance"]
+    assert pack["expected_lift"] == {"level": "medium", "metric": ""}
+    validate(pack, DecisionPack)
@@ -61,28 +61,28 @@ def main():
     # Unit tests
     success &= run_command([
         sys.executable, "-m", "pytest", 
-        "rfg/tests/", "executor/tests/",
-        "-v", "--tb=short", "--cov=rfg", "--cov=executor",
+        "rfg/tests/", "executor/tests/", "store/tests/", "miner/tests/",
+        "-v", "--tb=short", "--cov=rfg", "--cov=executor", "--cov=store", "--cov=miner",
         "--cov-report=term-missing"
     ], "Unit Tests with Coverage")
     
     # Linting
     success &= run_command([
         sys.executable, "-m", "flake8",
-        "rfg/", "executor/",
+        "rfg/", "executor/", "store/", "miner/",
         "--count", "--select=E9,F63,F7,F82", "--show-source", "--statistics"
     ], "Linting (Critical Errors)")
     
     success &= run_command([
         sys.executable, "-m", "flake8",
-        "rfg/", "executor/",
+        "rfg/", "executor/", "store/", "miner/",
         "--count", "--exit-zero", "--max-complexity=10", "--max-line-length=127", "--statistics"
     ], "Linting (Style Warnings)")
     
     # Security checks
     success &= run_command([
         sys.executable, "-m", "bandit",
-        "-r", "rfg/", "executor/",
+        "-r", "rfg/", "executor/", "store/", "miner/",
         "-f", "txt"
     ], "Security Checks")
     
@@ -1,13 +1,15 @@
 # signal_miner.py
 import argparse
-import json
 import os
 import re
+import sys
 from datetime import datetime, timezone
 from urllib.parse import urlparse
 
-import requests
-from bs4 import BeautifulSoup
+from miner.prices import extract_prices, format_price
+from miner.stream import StreamedPage, StreamLimits, stream_page
+from store.run_store import RunStore, default_db_path
+from store.serialization import dump
 
 DEFAULT_HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -16,22 +18,28 @@ DEFAULT_HEADERS = {
     "Accept-Language": "en-US,en;q=0.9",
 }
 
-PRICE_RE = re.compile(r'(\$\s?\d{1,3}(?:[,\d{3}])*(?:\.\d{2})?)')
-
 def now_utc_iso():
     return datetime.now(timezone.utc).isoformat()
 
 def now_utc_stamp():
     return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
 
-def safe_request(url, headers=None, timeout=12):
-    headers = headers or DEFAULT_HEADERS
-    try:
-        r = requests.get(url, headers=headers, timeout=timeout)
-        r.raise_for_status()
-        return r.text
-    except Exception as e:
-        return {"error": str(e)}
+# requests, bs4 and the site registry are loaded on first fetch/parse, so `--help`
+# and the dashboard importing this module do not pay for them
+BeautifulSoup = None
+CRAWLER = None
+EXTRACTORS = None
+
+def shared_crawler():
+    """Shared so per-host pacing and cached robots.txt rules carry across calls in one process"""
+    global CRAWLER
+    if CRAWLER is None:
+        from miner.crawl import CrawlScheduler
+        CRAWLER = CrawlScheduler(DEFAULT_HEADERS)
+    return CRAWLER
+
+def safe_request(url, crawler=None):
+    return (crawler or shared_crawler()).fetch(url)
 
 def domain_from_url(url):
     try:
@@ -40,44 +48,70 @@ def domain_from_url(url):
         return "unknown"
 
 def extract_generic(html):
-    soup = BeautifulSoup(html, "html.parser")
+    global BeautifulSoup
+    if BeautifulSoup is None:
+        from bs4 import BeautifulSoup
+    return extract_signals(BeautifulSoup(html, "html.parser"))
+
+TEXT_TAGS = {"h1", "h2", "h3", "p"}
+LIST_TAGS = {"ul", "ol"}
+
+def extract_signals(soup):
+    # one walk over the tree instead of a find_all per tag group
+    text_tags, list_tags = [], []
+    for el in soup.descendants:
+        if el.name in TEXT_TAGS:
+            text_tags.append(el)
+        elif el.name in LIST_TAGS:
+            list_tags.append(el)
     texts = []
-    for tag in soup.find_all(["h1", "h2", "h3", "p"]):
+    for tag in text_tags:
         t = tag.get_text(strip=True)
         if t and len(t.split()) > 3:
             texts.append(t)
         if len(texts) >= 40:
             break
     lists = []
-    for ul in soup.find_all(["ul","ol"]):
-        items = [li.get_text(strip=True) for li in ul.find_all("li") if li.get_text(strip=True)]
+    for ul in list_tags:
+        items = [t for t in (li.get_text(strip=True) for li in ul.find_all("li")) if t]
         if items:
             lists.append(items)
         if len(lists) >= 10:
             break
-    prices = sorted({m.strip() for m in PRICE_RE.findall(" ".join(texts))})
+    # prices come from the whole document text (tables and lists included), see miner/prices.py
+    price_records = extract_prices(soup.get_text(" "))
     return {
         "headlines_paragraphs": texts[:40],
         "lists": lists[:10],
-        "prices": prices
+        "prices": [format_price(r) for r in price_records],
+        "price_records": price_records,
     }
 
+def site_extractors(paths=None):
+    """Site-specific extractors keyed by domain pattern; see miner/sites.json.
+
+    Extra config files can be listed in SIGNAL_MINER_SITES (os.pathsep-separated);
+    passing `paths` replaces the shared registry with one built from them.
+    """
+    global EXTRACTORS
+    if EXTRACTORS is None or paths:
+        from miner.extractors import build_registry
+        EXTRACTORS = build_registry(
+            extract_generic,
+            paths or [p for p in os.environ.get("SIGNAL_MINER_SITES", "").split(os.pathsep) if p],
+        )
+    return EXTRACTORS
+
 def extract_hackernews(html):
-    soup = BeautifulSoup(html, "html.parser")
-    items = []
-    for a in soup.select("a.storylink, a.titlelink, span.titleline a"):
-        t = a.get_text(strip=True)
-        if t:
-            items.append(t)
-        if len(items) >= 20:
-            break
-    return {"hn_titles": items}
+    return site_extractors().resolve("news.ycombinator.com")(html)
 
-def snapshot_save(out_dir, domain, html):
+def snapshot_path(out_dir, domain):
     snapshots_dir = os.path.join(out_dir, "snapshots")
     os.makedirs(snapshots_dir, exist_ok=True)
-    fname = f"{domain}_{now_utc_stamp()}.html"
-    path = os.path.join(snapshots_dir, fname)
+    return os.path.join(snapshots_dir, f"{domain}_{now_utc_stamp()}.html")
+
+def snapshot_save(out_dir, domain, html):
+    path = snapshot_path(out_dir, domain)
     try:
         with open(path, "w", encoding="utf-8") as f:
             f.write(html)
@@ -85,7 +119,20 @@ def snapshot_save(out_dir, domain, html):
     except Exception:
         return None
 
-def mine_site(url, limit):
+def stream_reader(out_dir="output", limits=None):
+    """Crawl reader that parses while downloading and streams the snapshot to disk"""
+    def read(url, response):
+        extractors = site_extractors()
+        extractor = extractors.resolve(urlparse(url).netloc)
+        return stream_page(response, snapshot_path(out_dir, domain_from_url(url)), limits,
+                           None if extractor is extractors.default else extractor)
+    return read
+
+def mine_site(url, limit, out_dir="output"):
+    return site_result(url, safe_request(url), limit, out_dir)
+
+def site_result(url, res, limit, out_dir="output"):
+    """Build the per-site result from a fetch result (page text or {"error": ...})"""
     domain = domain_from_url(url)
     result = {
         "url": url,
@@ -96,18 +143,18 @@ def mine_site(url, limit):
         "signals": {}
     }
 
-    res = safe_request(url)
     if isinstance(res, dict) and res.get("error"):
         result["error"] = res["error"]
         return result
 
-    html = res
-    result["snapshot"] = snapshot_save("output", domain, html)
-
-    if "news.ycombinator.com" in urlparse(url).netloc:
-        parsed = extract_hackernews(html)
+    if isinstance(res, StreamedPage):
+        result["snapshot"] = res.snapshot
+        result["stream"] = {"bytes": res.bytes_read, "stopped": res.stopped}
+        parsed = res.signals
     else:
-        parsed = extract_generic(html)
+        html = res
+        result["snapshot"] = snapshot_save(out_dir, domain, html)
+        parsed = site_extractors().resolve(urlparse(url).netloc)(html)
 
     for k, v in parsed.items():
         if isinstance(v, list):
@@ -116,75 +163,170 @@ def mine_site(url, limit):
     result["signals"] = parsed
     return result
 
-def pretty_markdown_report(all_results, md_path):
-    lines = []
-    lines.append("# Signals Report\n")
-    lines.append(f"_Generated: {now_utc_iso()}_\n")
-    for r in all_results:
-        lines.append(f"## {r['domain']}\n")
-        lines.append(f"- URL: {r['url']}\n")
-        lines.append(f"- Timestamp: {r['timestamp']}\n")
-        if r.get("error"):
-            lines.append(f"- **Error:** {r['error']}\n")
-            lines.append("\n---\n")
-            continue
-
-        signals = r.get("signals", {})
-        for key, items in signals.items():
-            if not items:
-                continue
-            lines.append(f"### {key}\n")
-            for i, it in enumerate(items[:6], 1):
-                # handle lists (e.g. UL/OL groups)
-                if isinstance(it, list):
-                    snippet = "; ".join(it)
-                else:
-                    snippet = str(it)
-                snippet = snippet.replace("\n", " ")
-                if len(snippet) > 220:
-                    snippet = snippet[:217] + "..."
-                lines.append(f"{i}. {snippet}\n")
-        lines.append("\n---\n")
-
-    with open(md_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(lines))
+def write_site_result(r, out_dir="output", run_index=None):
+    domain = r.get("domain") or "site"
+    safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', domain)
+    per_path = os.path.join(out_dir, f"{safe_name}.json")
+    dump(r, per_path)
+    if run_index is not None:
+        run_index.record_run(r, os.path.abspath(per_path))
+    return per_path
+
+def mine_and_record(url, limit=5, out_dir="output"):
+    """Mine one URL, write its per-site JSON and record it in the run index"""
+    os.makedirs(out_dir, exist_ok=True)
+    r = mine_site(url, limit=limit, out_dir=out_dir)
+    with RunStore(default_db_path(out_dir)) as run_index:
+        per_path = write_site_result(r, out_dir, run_index)
+    return {"domain": r["domain"], "error": r["error"], "path": os.path.abspath(per_path)}
+
+def pretty_markdown_report(all_results, md_path, html_path=None):
+    """Write signals.md (and signals.html with `html_path`); unchanged domains reuse their cached sections"""
+    from miner.report import write_report
+    return write_report(all_results, md_path, html_path=html_path)
 
 def main():
     parser = argparse.ArgumentParser(description="Signal Miner - extract signals from URLs")
-    parser.add_argument("urls_file", nargs="?", default="url.txt", help="file with newline-separated urls")
+    parser.add_argument("urls_file", nargs="?", default=None,
+                        help="file with newline-separated urls (default: url.txt, or the tenant's allowlist)")
     parser.add_argument("--limit", type=int, default=5, help="max items per signal type")
-    parser.add_argument("--out", default="output/signals.json", help="output combined json")
+    parser.add_argument("--out", default=None, help="output combined json (default: output/signals.json)")
+    parser.add_argument("--sites", action="append", default=[], help="extra site extractor config (JSON), repeatable")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="max requests in flight across all hosts (default: 8, or the tenant's quota)")
+    parser.add_argument("--rate", type=float, default=1.0, help="max requests per second to any one host")
+    parser.add_argument("--ignore-robots", action="store_true", help="skip robots.txt checks (own sites only)")
+    parser.add_argument("--stream", action="store_true",
+                        help="parse while downloading; stop once extraction limits or budgets are reached")
+    parser.add_argument("--max-bytes", type=int, default=5_000_000, help="per-page download budget with --stream")
+    parser.add_argument("--max-seconds", type=float, default=20.0, help="per-page read time budget with --stream")
+    parser.add_argument("--warehouse", help="also append each run's signals to this Parquet dataset (needs pyarrow)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep running and re-crawl each URL on its interval; urls_file is reloaded when it changes")
+    parser.add_argument("--interval", default="1h",
+                        help="default re-crawl interval in daemon mode (e.g. 900, 15m, 6h, 1d)")
+    parser.add_argument("--orchestrate", action="store_true",
+                        help="regenerate Decision Packs (and PR previews) for domains whose signals changed")
+    parser.add_argument("--replay", action="store_true",
+                        help="re-extract signals from stored snapshots (no network) and rewrite their runs")
+    parser.add_argument("--since", help="with --replay: first snapshot day (YYYY-MM-DD)")
+    parser.add_argument("--until", help="with --replay: last snapshot day (YYYY-MM-DD), inclusive")
+    parser.add_argument("--domain", help="with --replay: only this domain's snapshots")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="with --replay: parser processes (default: one per CPU)")
+    parser.add_argument("--html", action="store_true", help="also write the report as signals.html")
+    parser.add_argument("--tenant", help="work in this tenant's workspace: its allowlist, output root and quotas")
     args = parser.parse_args()
 
+    out_dir, concurrency = "output", 8
+    if args.tenant:
+        from store.tenants import Workspace
+        workspace = Workspace(args.tenant)
+        args.urls_file = args.urls_file or workspace.urls_file
+        out_dir, concurrency = workspace.output_dir, workspace.quota["concurrency"]
+    args.urls_file = args.urls_file or "url.txt"
+    args.out = args.out or os.path.join(out_dir, "signals.json")
+    args.concurrency = args.concurrency or concurrency
+
+    if args.sites:
+        site_extractors(args.sites)
+
+    if args.replay:
+        from miner.replay import replay
+        rewritten = set()
+
+        def on_replayed(r, status):
+            if status in ("changed", "added"):
+                rewritten.add(r["domain"])
+            if status != "unchanged":
+                print(f"[REPLAY] {r['domain']} {r.get('timestamp') or r['snapshot']}: "
+                      + (r["error"] if status == "failed" else status))
+        stats = replay(out_dir, since=args.since, until=args.until, domain=args.domain, limit=args.limit,
+                       workers=args.workers, sites=args.sites, on_result=on_replayed)
+        print(f"\n[INFO] Replayed {stats['replayed']} snapshots: {stats['changed']} runs changed, "
+              f"{stats['added']} added, {stats['failed']} failed")
+        if args.orchestrate and rewritten:
+            # packs only regenerate where a domain's latest signals actually changed
+            from rfg.orchestrator import Orchestrator
+            for outcome in Orchestrator(default_db_path(out_dir), tenant=args.tenant).process_latest(sorted(rewritten)):
+                print(f"[PACK] {outcome['domain']}: {outcome['action']}")
+        return
+
     if not os.path.exists(args.urls_file):
         print(f"[ERROR] URLs file '{args.urls_file}' not found.")
         return
 
-    with open(args.urls_file, "r", encoding="utf-8") as f:
-        urls = [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+    from miner.daemon import MinerDaemon, load_allowlist, parse_interval
+    # lines are "URL [interval]"; the interval only matters in daemon mode. A
+    # repeated URL is kept once (first line wins), so it is mined once
+    urls = list(load_allowlist(args.urls_file))
+
+    warehouse = None
+    if args.warehouse:
+        from store.warehouse import SignalWarehouse
+        warehouse = SignalWarehouse(args.warehouse)
+
+    from miner.crawl import CrawlScheduler
+    crawler = CrawlScheduler(DEFAULT_HEADERS, rate=args.rate, max_workers=args.concurrency,
+                             respect_robots=not args.ignore_robots)
+    os.makedirs(out_dir, exist_ok=True)
+    # fetches run concurrently under per-host limits; results arrive as they finish
+    reader = stream_reader(out_dir, StreamLimits(args.max_bytes, args.max_seconds)) if args.stream else None
+
+    orchestrator = None
+    if args.orchestrate:
+        from rfg.orchestrator import Orchestrator
+        orchestrator = Orchestrator(default_db_path(out_dir), tenant=args.tenant)
+
+    def orchestrate(domains):
+        for outcome in orchestrator.process_latest(domains):
+            print(f"[PACK] {outcome['domain']}: {outcome['action']}"
+                  + (f" -> {outcome['pack_path']}" if outcome.get("pack_path") else ""))
+
+    if args.daemon:
+        def on_result(r):
+            print(f"[{now_utc_iso()}] Mined: {r['url']}" + (f" ({r['error']})" if r["error"] else ""))
+            if orchestrator is not None and not r["error"]:
+                orchestrate([r["domain"]])
+
+        with MinerDaemon(args.urls_file, out_dir, limit=args.limit, default_interval=parse_interval(args.interval),
+                         crawler=crawler, reader=reader, warehouse=warehouse) as daemon:
+            print(f"[INFO] Daemon watching {args.urls_file} ({len(urls)} URLs, default interval {args.interval}); "
+                  f"Ctrl+C to stop")
+            daemon.run(on_result=on_result)
+        return
 
-    os.makedirs("output", exist_ok=True)
-    results = []
-    for i, url in enumerate(urls, 1):
-        print(f"[{i}/{len(urls)}] Mining: {url}")
-        r = mine_site(url, limit=args.limit)
-        results.append(r)
-        domain = r.get("domain", f"site{i}")
-        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', domain)
-        per_path = os.path.join("output", f"{safe_name}.json")
-        with open(per_path, "w", encoding="utf-8") as f:
-            json.dump(r, f, ensure_ascii=False, indent=2)
+    run_index = RunStore(default_db_path(out_dir))
+    results = {}
+    for i, (url, res) in enumerate(crawler.crawl(urls, reader), 1):
+        print(f"[{i}/{len(urls)}] Mined: {url}")
+        r = site_result(url, res, limit=args.limit, out_dir=out_dir)
+        results[url] = r
+        write_site_result(r, out_dir, run_index)
+        if warehouse is not None:
+            warehouse.append_run(r)
+    run_index.close()
+    results = [results[url] for url in urls]
+    if orchestrator is not None:
+        orchestrate(list(dict.fromkeys(r["domain"] for r in results if not r["error"])))
 
-    with open(args.out, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    dump(results, args.out)
 
-    md_path = os.path.join("output", "signals.md")
-    pretty_markdown_report(results, md_path)
+    md_path = os.path.join(out_dir, "signals.md")
+    html_path = os.path.join(out_dir, "signals.html") if args.html else None
+    report = pretty_markdown_report(results, md_path, html_path)
 
     print(f"\n[INFO] Done. Combined JSON: {args.out}")
-    print(f"[INFO] Per-site JSONs saved to: output/*.json")
-    print(f"[INFO] Markdown report: {md_path}")
-    print(f"[INFO] Raw HTML snapshots: output/snapshots/")
+    print(f"[INFO] Per-site JSONs saved to: {os.path.join(out_dir, '*.json')}")
+    print(f"[INFO] Markdown report: {md_path} ({report['rendered']} sections rendered, {report['reused']} reused)")
+    if html_path:
+        print(f"[INFO] HTML report: {html_path}")
+    print(f"[INFO] Run index: {default_db_path(out_dir)}")
+    print(f"[INFO] Raw HTML snapshots: {os.path.join(out_dir, 'snapshots')}/")
+    if args.warehouse:
+        print(f"[INFO] Signal warehouse: {args.warehouse}")
 
 if __name__ == "__main__":
+    # modules importing signal_miner (miner.daemon) share this instance's crawler and extractors
+    sys.modules.setdefault("signal_miner", sys.modules[__name__])
     main()
@@ -0,0 +1,107 @@
+"""Memory and time to load and scan run history: result dicts vs the compact model.
+
+    python -m store.bench_history --db output/runs.db
+    python -m store.bench_history --domains 20 --days 365
+
+History comes from a run store or from a synthetic one: `--domains`
+sites mined daily for `--days` days, where each run keeps most of the
+previous run's snippets (like a real site) and replaces `--churn` of
+them. Columns:
+  load       seconds to load every run
+  peak MB    peak traced allocation while loading (tracemalloc)
+  held MB    allocation still held by the loaded history
+  scan       seconds to walk every text snippet once
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from store.run_store import RunStore  # noqa: E402
+
+WORDS = ("pricing plan team growth launch feature customers product update annual monthly free trial "
+         "enterprise security api integration analytics dashboard workflow faster new save").split()
+
+
+def sentence(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 16))).capitalize() + "."
+
+
+def synthetic_store(path, domains, days, churn, rng):
+    with RunStore(path) as store:
+        for d in range(domains):
+            headlines = [sentence(rng) for _ in range(40)]
+            lists = [[sentence(rng) for _ in range(5)] for _ in range(10)]
+            for day in range(days):
+                headlines = [sentence(rng) if rng.random() < churn else h for h in headlines]
+                store.record_run({
+                    "url": f"https://site{d}.test/", "domain": f"site{d}.test",
+                    "timestamp": f"{date(2025, 1, 1) + timedelta(days=day)}T06:00:00+00:00",
+                    "error": None, "snapshot": None,
+                    "signals": {"headlines_paragraphs": headlines, "lists": lists,
+                                "prices": [f"${rng.randint(9, 99)}"],
+                                "price_records": [{"amount": 49.0, "currency": "USD", "period": "month"}]},
+                })
+
+
+def load_dicts(store):
+    ids = [row[0] for row in store.conn.execute("SELECT id FROM runs ORDER BY timestamp, id")]
+    return [store.load_result(run_id) for run_id in ids]
+
+
+def scan_dicts(results):
+    n = 0
+    for result in results:
+        for items in result["signals"].values():
+            n += sum(len(item) for item in items if isinstance(item, str))
+    return n
+
+
+def scan_compact(history):
+    return sum(len(text) for _, text in history.texts())
+
+
+def measure(load, scan):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    loaded = load()
+    load_s = time.perf_counter() - t0
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    t0 = time.perf_counter()
+    chars = scan(loaded)
+    return load_s, peak / 1e6, held / 1e6, time.perf_counter() - t0, chars, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark loading run history as dicts vs the compact model")
+    parser.add_argument("--db", help="run store to load (default: a synthetic one)")
+    parser.add_argument("--domains", type=int, default=10)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--churn", type=float, default=0.05, help="share of snippets replaced per run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.db
+        if not path:
+            path = os.path.join(tmp, "runs.db")
+            synthetic_store(path, args.domains, args.days, args.churn, random.Random(1))
+        with RunStore(path) as store:
+            rows = [("dicts", lambda: load_dicts(store), scan_dicts),
+                    ("compact", lambda: store.load_history(), scan_compact)]
+            print(f"{'model':<8} {'runs':>7} {'load':>8} {'peak MB':>9} {'held MB':>9} {'scan':>8}")
+            for name, load, scan in rows:
+                load_s, peak, held, scan_s, chars, loaded = measure(load, scan)
+                print(f"{name:<8} {len(loaded):>7} {load_s:>8.2f} {peak:>9.1f} {held:>9.1f} {scan_s:>8.3f}")
+                del loaded
+            print(f"{chars} characters of text per scan")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Encode/decode time and size of our JSON files: stdlib `json` vs store/serialization.py.
+
+    python -m store.bench_serialization "output/*.json" "output/decision_packs/*.json"
+    python -m store.bench_serialization "../../output/*.json" --repeat 200
+
+Every file is decoded and re-encoded `--repeat` times, in memory. Rows:
+  stdlib pretty   json.loads / json.dumps(indent=2), the previous writers
+  stdlib compact  json.loads / json.dumps with compact separators
+  fast compact    serialization.loads / dumps (orjson when installed)
+  fast pretty     serialization.dumps(pretty=True), used for packs and previews
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from store import serialization  # noqa: E402
+
+CODECS = {
+    "stdlib pretty": (json.loads, lambda obj: json.dumps(obj, ensure_ascii=False, indent=2)),
+    "stdlib compact": (json.loads, lambda obj: json.dumps(obj, ensure_ascii=False, separators=(",", ":"))),
+    "fast compact": (serialization.loads, serialization.dumps),
+    "fast pretty": (serialization.loads, lambda obj: serialization.dumps(obj, pretty=True)),
+}
+
+
+def time_codec(blobs, decode, encode, repeat):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        values = [decode(blob) for blob in blobs]
+    decode_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        encoded = [encode(value) for value in values]
+    encode_s = time.perf_counter() - t0
+    size = sum(len(text.encode("utf-8")) for text in encoded)
+    return decode_s, encode_s, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON encode/decode over stored files")
+    parser.add_argument("patterns", nargs="*", default=[os.path.join("output", "*.json")],
+                        help="glob patterns of JSON files (default: output/*.json)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    paths = sorted({p for pattern in args.patterns for p in glob.glob(pattern)})
+    blobs = []
+    for path in paths:
+        with open(path, "rb") as f:
+            blobs.append(f.read())
+    if not blobs:
+        raise SystemExit(f"No JSON files match {' '.join(args.patterns)}")
+    on_disk = sum(len(b) for b in blobs)
+    print(f"{len(blobs)} files, {on_disk / 1e3:.1f} kB on disk, "
+          f"orjson {'on' if serialization.orjson is not None else 'not installed'}")
+
+    print(f"{'codec':<16} {'decode ms':>10} {'encode ms':>10} {'size kB':>9}")
+    for name, (decode, encode) in CODECS.items():
+        decode_s, encode_s, size = time_codec(blobs, decode, encode, args.repeat)
+        print(f"{name:<16} {decode_s * 1000 / args.repeat:>10.2f} {encode_s * 1000 / args.repeat:>10.2f} "
+              f"{size / 1e3:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Compact in-memory runs for loading and scanning signal history.
+
+A per-site result as a dict costs a dict, a list and a string object per
+snippet, for every run, even though most snippets of a site repeat from
+one run to the next. Here every distinct snippet is stored once in a
+`StringTable` shared by all runs, and each signal type of a run is an
+array of 4-byte string ids. Run fields are slotted dataclasses with
+interned domain, URL and signal-type strings, so a year of daily runs
+costs roughly the distinct text plus a few bytes per snippet occurrence.
+
+    with RunStore(db_path) as store:
+        history = store.load_history(since="2025-01-01")
+    for run, text in history.texts("headlines_paragraphs"):
+        ...
+
+Non-string items (list groups, price records) are kept as their compact
+JSON text and decoded on access.
+"""
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from store.serialization import dumps, loads
+
+
+class StringTable:
+    """Distinct strings stored once, addressed by a dense integer id"""
+
+    __slots__ = ("strings", "ids")
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def add(self, text: str) -> int:
+        sid = self.ids.get(text)
+        if sid is None:
+            sid = self.ids[text] = len(self.strings)
+            self.strings.append(text)
+        return sid
+
+    def get(self, sid: int) -> str:
+        return self.strings[sid]
+
+
+@dataclass(slots=True)
+class SignalColumn:
+    """One signal type of a run: string ids in item order (`encoded` items are JSON text)"""
+    signal_type: str
+    ids: array
+    encoded: bool = False
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+@dataclass(slots=True)
+class Run:
+    id: Optional[int]
+    domain: str
+    url: Optional[str]
+    timestamp: str
+    error: Optional[str]
+    columns: Tuple[SignalColumn, ...]
+
+    @property
+    def signal_count(self) -> int:
+        return sum(len(c) for c in self.columns)
+
+    def column(self, signal_type: str) -> Optional[SignalColumn]:
+        for c in self.columns:
+            if c.signal_type == signal_type:
+                return c
+        return None
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class History:
+    """Runs in load order plus the string table their signals point into"""
+
+    def __init__(self):
+        self.table = StringTable()
+        self.runs: List[Run] = []
+
+    def __len__(self) -> int:
+        return len(self.runs)
+
+    def __iter__(self) -> Iterator[Run]:
+        return iter(self.runs)
+
+    def column(self, signal_type: str, items: List[Any]) -> SignalColumn:
+        encoded = not all(isinstance(item, str) for item in items)
+        ids = array("I", map(self.table.add, map(dumps, items) if encoded else items))
+        return SignalColumn(sys.intern(signal_type), ids, encoded)
+
+    def add_run(self, domain: str, timestamp: str, signals: Iterable[Tuple[str, List[Any]]],
+                url: Optional[str] = None, error: Optional[str] = None, run_id: Optional[int] = None) -> Run:
+        columns = tuple(self.column(k, v) for k, v in signals if isinstance(v, list))
+        run = Run(run_id, _intern(domain), _intern(url), timestamp, error, columns)
+        self.runs.append(run)
+        return run
+
+    def add(self, result: Dict[str, Any], run_id: Optional[int] = None) -> Run:
+        """Add a per-site result dict as the miner writes it"""
+        return self.add_run(result.get("domain", "unknown"), result.get("timestamp", ""),
+                            (result.get("signals") or {}).items(), url=result.get("url"),
+                            error=result.get("error"), run_id=run_id)
+
+    def items(self, run: Run, signal_type: str) -> List[Any]:
+        column = run.column(signal_type)
+        if column is None:
+            return []
+        get = self.table.get
+        return [loads(get(i)) for i in column.ids] if column.encoded else [get(i) for i in column.ids]
+
+    def result(self, run: Run) -> Dict[str, Any]:
+        """The run as a per-site result dict (materialised on demand)"""
+        return {"url": run.url, "domain": run.domain, "timestamp": run.timestamp, "error": run.error,
+                "signals": {c.signal_type: self.items(run, c.signal_type) for c in run.columns}}
+
+    def texts(self, signal_type: Optional[str] = None) -> Iterator[Tuple[Run, str]]:
+        """(run, text) for every plain-text item, optionally of one signal type; nothing is copied"""
+        strings = self.table.strings
+        for run in self.runs:
+            for column in run.columns:
+                if column.encoded or (signal_type is not None and column.signal_type != signal_type):
+                    continue
+                for sid in column.ids:
+                    yield run, strings[sid]
+
+    def domains(self) -> List[str]:
+        return sorted({run.domain for run in self.runs})
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the runs and the string table"""
+        total = sys.getsizeof(self.runs) + sys.getsizeof(self.table.strings) + sys.getsizeof(self.table.ids)
+        total += sum(sys.getsizeof(s) for s in self.table.strings)
+        for run in self.runs:
+            total += sys.getsizeof(run) + sys.getsizeof(run.columns) + sys.getsizeof(run.timestamp)
+            total += sum(sys.getsizeof(c) + c.ids.buffer_info()[1] * c.ids.itemsize for c in run.columns)
+        return total
@@ -0,0 +1,216 @@
+import os
+import sqlite3
+import threading
+import traceback
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from store.serialization import dumps, loads
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    tenant TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    params TEXT NOT NULL DEFAULT '{}',
+    result TEXT,
+    error TEXT,
+    owner_pid INTEGER,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+"""
+
+# Created after columns are migrated, so older job tables get them too
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_jobs_kind_key ON jobs (kind, key, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_tenant ON jobs (tenant, created_at);
+"""
+
+# Columns added to `jobs` after the first release
+JOB_COLUMNS = {"tenant": "TEXT NOT NULL DEFAULT ''"}
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+ACTIVE = (QUEUED, RUNNING)
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid or os.name == "nt":
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobRunner:
+    """Local background job queue backed by a persisted SQLite job table.
+
+    Jobs are identified by `kind` (which handler runs them) and `key`
+    (usually the domain). Submitting a job while one with the same kind and
+    key is still queued or running returns the existing job instead of
+    starting a duplicate. Handlers run on a thread pool and must return a
+    JSON-serialisable result.
+
+    Jobs may belong to a `tenant` (handlers then get it as `tenant=`).
+    Queued jobs are dispatched round-robin across tenants, and a tenant
+    never has more than `tenant_limit(tenant)` jobs running, so one
+    tenant's backlog cannot hold every worker while others wait. Jobs
+    without a tenant share the "" slot and its limit.
+    """
+
+    def __init__(self, db_path: str, handlers: Dict[str, Callable[..., Any]], max_workers: int = 4,
+                 tenant_limit: Optional[Callable[[str], int]] = None):
+        self.db_path = db_path
+        self.handlers = handlers
+        self.max_workers = max_workers
+        self.tenant_limit = tenant_limit or (lambda tenant: max_workers)
+        # tenant -> queued (job_id, kind, params); the order is the round-robin order
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()
+        self._running: Dict[str, int] = {}
+        parent = os.path.dirname(db_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self._interrupt_orphans()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+
+    def _migrate(self) -> None:
+        existing = {row["name"] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+        with self.conn:
+            for column, kind in JOB_COLUMNS.items():
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self.conn.executescript(INDEXES)
+
+    def _interrupt_orphans(self) -> None:
+        """Fail jobs left active by a process that is no longer running"""
+        with self._lock, self.conn:
+            rows = self.conn.execute(
+                "SELECT id, owner_pid FROM jobs WHERE status IN (?, ?)", ACTIVE
+            ).fetchall()
+            for row in rows:
+                if row["owner_pid"] != os.getpid() and not _pid_alive(row["owner_pid"]):
+                    self.conn.execute(
+                        "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+                        (FAILED, "interrupted (runner restarted)", now_iso(), row["id"]),
+                    )
+
+    def submit(self, kind: str, key: str, tenant: Optional[str] = None, **params) -> str:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        tenant = tenant or ""
+        with self._lock:
+            with self.conn:
+                active = self.conn.execute(
+                    "SELECT id FROM jobs WHERE kind = ? AND key = ? AND tenant = ? AND status IN (?, ?)",
+                    (kind, key, tenant) + ACTIVE,
+                ).fetchone()
+                if active:
+                    return active["id"]
+                job_id = uuid.uuid4().hex
+                self.conn.execute(
+                    "INSERT INTO jobs (id, kind, key, tenant, status, params, owner_pid, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, kind, key, tenant, QUEUED, dumps(params), os.getpid(), now_iso()),
+                )
+            self._queues.setdefault(tenant, deque()).append((job_id, kind, params))
+            self._dispatch()
+        return job_id
+
+    def _dispatch(self) -> None:
+        """Start queued jobs while workers are free, one tenant at a time in turn (lock held)"""
+        while sum(self._running.values()) < self.max_workers:
+            tenant = next((t for t, queue in self._queues.items()
+                           if queue and self._running.get(t, 0) < max(1, self.tenant_limit(t))), None)
+            if tenant is None:
+                return
+            job_id, kind, params = self._queues[tenant].popleft()
+            # the tenant goes to the back of the line behind everyone else with queued work
+            self._queues.move_to_end(tenant)
+            self._running[tenant] = self._running.get(tenant, 0) + 1
+            self.pool.submit(self._run, job_id, kind, params, tenant)
+
+    def queued(self, tenant: Optional[str] = None) -> int:
+        """Jobs waiting for a worker (for one tenant, or all)"""
+        with self._lock:
+            if tenant is not None:
+                return len(self._queues.get(tenant, ()))
+            return sum(len(queue) for queue in self._queues.values())
+
+    def _update(self, job_id: str, **fields) -> None:
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock, self.conn:
+            self.conn.execute(f"UPDATE jobs SET {cols} WHERE id = ?", (*fields.values(), job_id))  # nosec B608
+
+    def _run(self, job_id: str, kind: str, params: Dict[str, Any], tenant: str = "") -> None:
+        self._update(job_id, status=RUNNING, started_at=now_iso())
+        try:
+            result = self.handlers[kind](**params, **({"tenant": tenant} if tenant else {}))
+            self._update(job_id, status=DONE, result=dumps(result), finished_at=now_iso())
+        except Exception as e:
+            traceback.print_exc()
+            self._update(job_id, status=FAILED, error=str(e), finished_at=now_iso())
+        finally:
+            with self._lock:
+                self._running[tenant] -= 1
+                self._dispatch()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def latest(self, kind: str, key: str, tenant: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        jobs = self.list_jobs(kind=kind, key=key, tenant=tenant, limit=1)
+        return jobs[0] if jobs else None
+
+    def list_jobs(self, kind: Optional[str] = None, key: Optional[str] = None, tenant: Optional[str] = None,
+                  limit: int = 20) -> List[Dict[str, Any]]:
+        """Newest jobs first; `tenant` ("" for jobs without one) narrows to one tenant's jobs"""
+        clauses, args = [], []
+        if kind:
+            clauses.append("kind = ?")
+            args.append(kind)
+        if key:
+            clauses.append("key = ?")
+            args.append(key)
+        if tenant is not None:
+            clauses.append("tenant = ?")
+            args.append(tenant)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ?", (*args, limit)  # nosec B608
+            ).fetchall()
+        return [self._row(r) for r in rows]
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.pool.shutdown(wait=wait)
+        self.conn.close()
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["params"] = loads(job.get("params") or "{}")
+        job["result"] = loads(job["result"]) if job.get("result") else None
+        return job
@@ -0,0 +1,505 @@
+import os
+import sqlite3
+from datetime import datetime, timezone
+from itertools import groupby
+from typing import Any, Dict, List, Optional, Tuple
+
+from store.compact import History
+from store.serialization import dumps, load, loads
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    domain TEXT NOT NULL,
+    url TEXT,
+    timestamp TEXT NOT NULL,
+    error TEXT,
+    signal_count INTEGER NOT NULL DEFAULT 0,
+    signal_counts TEXT NOT NULL DEFAULT '{}',
+    path TEXT,
+    snapshot TEXT,
+    extra TEXT,
+    UNIQUE (domain, timestamp)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs (timestamp);
+CREATE TABLE IF NOT EXISTS latest_runs (
+    domain TEXT PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id)
+);
+CREATE TABLE IF NOT EXISTS signals (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    signal_type TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    items TEXT NOT NULL,
+    PRIMARY KEY (run_id, signal_type)
+);
+CREATE TABLE IF NOT EXISTS decision_packs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    domain TEXT NOT NULL,
+    run_id INTEGER REFERENCES runs (id),
+    created_at TEXT NOT NULL,
+    path TEXT,
+    pack TEXT NOT NULL,
+    metadata TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS idx_packs_domain ON decision_packs (domain, created_at);
+CREATE TABLE IF NOT EXISTS pr_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    domain TEXT NOT NULL,
+    pack_id INTEGER REFERENCES decision_packs (id),
+    created_at TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    mode TEXT,
+    message TEXT,
+    url TEXT,
+    branch TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_pr_results_domain ON pr_results (domain, created_at);
+CREATE TABLE IF NOT EXISTS pipeline_state (
+    domain TEXT PRIMARY KEY,
+    fingerprint TEXT,
+    snippet_hashes TEXT NOT NULL DEFAULT '[]',
+    run_id INTEGER REFERENCES runs (id),
+    pack_id INTEGER REFERENCES decision_packs (id),
+    updated_at TEXT,
+    pending TEXT,
+    pending_since TEXT
+);
+CREATE TABLE IF NOT EXISTS api_spend (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    day TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    model TEXT,
+    usd REAL NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_api_spend_day ON api_spend (day);
+"""
+
+# Columns added to `runs` after the first release, created on open for older databases
+RUN_COLUMNS = {"extra": "TEXT"}
+
+# Top-level result keys stored in their own `runs` columns or the `signals` table
+RUN_KEYS = ("url", "domain", "timestamp", "error", "snapshot", "signals")
+
+# Files in the output directory that are not per-site results
+NON_RUN_FILES = {"signals.json", "telemetry.json", "api_keys.json"}
+
+
+def default_db_path(output_dir: str) -> str:
+    return os.path.join(output_dir, "runs.db")
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def signal_counts(signals: Dict[str, Any]) -> Dict[str, int]:
+    return {k: len(v) for k, v in (signals or {}).items() if isinstance(v, list)}
+
+
+class RunStore:
+    """SQLite store for mining runs, their signals, decision packs and PR results.
+
+    The miner records every per-site result here as it is written, and the
+    `latest_runs` table keeps one pointer per domain, so "latest run for a
+    domain" is an indexed lookup and dashboard queries touch one row per
+    domain instead of re-reading every result file. Signals are stored one
+    row per signal type, so a full result can be rebuilt without the JSON
+    file. Decision packs and PR results are indexed by domain and time.
+    The JSON files the miner writes remain the export format.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        parent = os.path.dirname(db_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        existing = {row["name"] for row in self.conn.execute("PRAGMA table_info(runs)")}
+        with self.conn:
+            for column, kind in RUN_COLUMNS.items():
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {kind}")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def record_run(self, result: Dict[str, Any], path: Optional[str] = None) -> int:
+        """Insert or refresh one per-site result and advance the domain's latest pointer"""
+        signals = result.get("signals") or {}
+        counts = signal_counts(signals)
+        domain = result.get("domain", "unknown")
+        timestamp = result.get("timestamp", "")
+        extra = {k: v for k, v in result.items() if k not in RUN_KEYS}
+        with self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO runs (domain, url, timestamp, error, signal_count, signal_counts, path, snapshot, extra)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (domain, timestamp) DO UPDATE SET
+                    url = excluded.url, error = excluded.error,
+                    signal_count = excluded.signal_count, signal_counts = excluded.signal_counts,
+                    path = excluded.path, snapshot = excluded.snapshot, extra = excluded.extra
+                """,
+                (domain, result.get("url"), timestamp, result.get("error"), sum(counts.values()),
+                 dumps(counts), path, result.get("snapshot"), dumps(extra) if extra else None),
+            )
+            run_id = self.conn.execute(
+                "SELECT id FROM runs WHERE domain = ? AND timestamp = ?", (domain, timestamp)
+            ).fetchone()["id"]
+            self.conn.execute("DELETE FROM signals WHERE run_id = ?", (run_id,))
+            self.conn.executemany(
+                "INSERT INTO signals (run_id, signal_type, position, items) VALUES (?, ?, ?, ?)",
+                [(run_id, k, i, dumps(v)) for i, (k, v) in enumerate(signals.items())],
+            )
+            self.conn.execute(
+                """
+                INSERT INTO latest_runs (domain, run_id) VALUES (?, ?)
+                ON CONFLICT (domain) DO UPDATE SET run_id = excluded.run_id
+                WHERE (SELECT timestamp FROM runs WHERE id = latest_runs.run_id) <= ?
+                """,
+                (domain, run_id, timestamp),
+            )
+        return run_id
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM runs LIMIT 1").fetchone() is None
+
+    def summary(self) -> Dict[str, Any]:
+        """Dashboard headline numbers: last run time and signals across latest runs"""
+        last_run = self.conn.execute("SELECT MAX(timestamp) FROM runs").fetchone()[0]
+        row = self.conn.execute(
+            """
+            SELECT COUNT(*) AS domains, COALESCE(SUM(r.signal_count), 0) AS signals_count
+            FROM latest_runs l JOIN runs r ON r.id = l.run_id
+            """
+        ).fetchone()
+        return {"last_run": last_run, "domains": row["domains"], "signals_count": row["signals_count"]}
+
+    def latest_runs(self) -> List[Dict[str, Any]]:
+        rows = self.conn.execute(
+            """
+            SELECT r.* FROM latest_runs l JOIN runs r ON r.id = l.run_id
+            ORDER BY r.timestamp DESC
+            """
+        ).fetchall()
+        return [self._row(r) for r in rows]
+
+    def latest_run(self, domain: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT r.* FROM latest_runs l JOIN runs r ON r.id = l.run_id WHERE l.domain = ?",
+            (domain,),
+        ).fetchone()
+        return self._row(row) if row else None
+
+    def load_result(self, run_id: int) -> Optional[Dict[str, Any]]:
+        """Rebuild the per-site result dict the miner wrote for `run_id`.
+
+        Runs indexed before signals were stored in the database are read
+        back from their result file instead.
+        """
+        row = self.conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if row is None:
+            return None
+        stored = self.conn.execute(
+            "SELECT signal_type, items FROM signals WHERE run_id = ? ORDER BY position", (run_id,)
+        ).fetchall()
+        if not stored and row["signal_count"] and row["path"]:
+            for item in _load_json_list(row["path"]):
+                if isinstance(item, dict) and item.get("timestamp") == row["timestamp"]:
+                    return item
+        result = {"url": row["url"], "domain": row["domain"], "timestamp": row["timestamp"],
+                  "error": row["error"], "snapshot": row["snapshot"],
+                  "signals": {r["signal_type"]: loads(r["items"]) for r in stored}}
+        result.update(loads(row["extra"] or "{}"))
+        return result
+
+    def latest_result(self, domain: str) -> Optional[Dict[str, Any]]:
+        run = self.latest_run(domain)
+        return self.load_result(run["id"]) if run else None
+
+    def load_history(self, domain: Optional[str] = None, since: Optional[str] = None,
+                     until: Optional[str] = None, history: Optional[History] = None) -> History:
+        """Runs (oldest first) in the compact form of store/compact.py.
+
+        `since`/`until` are inclusive ISO dates or timestamps. Signal rows
+        are streamed from SQLite straight into the shared string table, so
+        no per-run result dicts are built along the way.
+        """
+        history = history if history is not None else History()
+        clauses, args = [], []
+        if domain:
+            clauses.append("r.domain = ?")
+            args.append(domain)
+        if since:
+            clauses.append("r.timestamp >= ?")
+            args.append(since)
+        if until:
+            clauses.append("r.timestamp < ?")
+            # a bare date includes that whole day
+            args.append(until + "\uffff" if len(until) == 10 else until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        runs = self.conn.execute(
+            f"""
+            SELECT r.id, r.domain, r.url, r.timestamp, r.error, r.signal_count, r.path, s.signal_type, s.items
+            FROM runs r LEFT JOIN signals s ON s.run_id = r.id
+            {where} ORDER BY r.timestamp, r.id, s.position
+            """,  # nosec B608
+            args,
+        )
+        for _, rows in groupby(runs, key=lambda row: row["id"]):
+            rows = list(rows)
+            first = rows[0]
+            if first["signal_type"] is None and first["signal_count"] and first["path"]:
+                # indexed before signals were stored in the database
+                result = self.load_result(first["id"])
+                if result is not None:
+                    history.add(result, run_id=first["id"])
+                continue
+            signals = [(row["signal_type"], loads(row["items"])) for row in rows if row["signal_type"] is not None]
+            history.add_run(first["domain"], first["timestamp"], signals, url=first["url"],
+                            error=first["error"], run_id=first["id"])
+        return history
+
+    def latest_path(self) -> Optional[str]:
+        """Result file of the most recent run that has one"""
+        row = self.conn.execute(
+            "SELECT path FROM runs WHERE path IS NOT NULL ORDER BY timestamp DESC, id DESC LIMIT 1"
+        ).fetchone()
+        return row["path"] if row else None
+
+    def record_pack(self, domain: str, pack: Dict[str, Any], path: Optional[str] = None,
+                    metadata: Optional[Dict[str, Any]] = None, run_id: Optional[int] = None) -> int:
+        """Store a decision pack; without `run_id` it is linked to the domain's latest run"""
+        if run_id is None:
+            run = self.latest_run(domain)
+            run_id = run["id"] if run else None
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO decision_packs (domain, run_id, created_at, path, pack, metadata) VALUES (?, ?, ?, ?, ?, ?)",
+                (domain, run_id, now_iso(), path, dumps(pack),
+                 dumps(metadata or {})),
+            )
+        return cur.lastrowid
+
+    def packs(self, domain: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Decision packs, newest first"""
+        where, args = ("WHERE domain = ?", [domain]) if domain else ("", [])
+        rows = self.conn.execute(
+            f"SELECT * FROM decision_packs {where} ORDER BY created_at DESC, id DESC LIMIT ?",  # nosec B608
+            (*args, limit),
+        ).fetchall()
+        return [self._pack(r) for r in rows]
+
+    def latest_pack(self, domain: str) -> Optional[Dict[str, Any]]:
+        packs = self.packs(domain, limit=1)
+        return packs[0] if packs else None
+
+    def record_pr_result(self, domain: str, result: Dict[str, Any], pack_id: Optional[int] = None,
+                         pack_path: Optional[str] = None) -> int:
+        """Store a preview/PR outcome, linked to its pack by id or by the pack's file path"""
+        if pack_id is None and pack_path:
+            row = self.conn.execute(
+                "SELECT id FROM decision_packs WHERE path = ? ORDER BY id DESC LIMIT 1", (pack_path,)
+            ).fetchone()
+            pack_id = row["id"] if row else None
+        with self.conn:
+            cur = self.conn.execute(
+                """
+                INSERT INTO pr_results (domain, pack_id, created_at, success, mode, message, url, branch)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (domain, pack_id, now_iso(), int(bool(result.get("success"))), result.get("mode"),
+                 result.get("message"), result.get("url"), result.get("branch")),
+            )
+        return cur.lastrowid
+
+    def pr_results(self, domain: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """PR and preview outcomes, newest first"""
+        where, args = ("WHERE domain = ?", [domain]) if domain else ("", [])
+        rows = self.conn.execute(
+            f"SELECT * FROM pr_results {where} ORDER BY created_at DESC, id DESC LIMIT ?",  # nosec B608
+            (*args, limit),
+        ).fetchall()
+        return [{**dict(r), "success": bool(r["success"])} for r in rows]
+
+    def pipeline_state(self, domain: str) -> Optional[Dict[str, Any]]:
+        """Fingerprint of the signals behind the domain's last generated pack, and any claim in progress"""
+        row = self.conn.execute("SELECT * FROM pipeline_state WHERE domain = ?", (domain,)).fetchone()
+        if row is None:
+            return None
+        item = dict(row)
+        item["snippet_hashes"] = loads(item["snippet_hashes"])
+        return item
+
+    def claim_pipeline(self, domain: str, fingerprint: str, stale_before: str, force: bool = False) -> bool:
+        """Mark the domain as being regenerated for `fingerprint`.
+
+        Fails while another claim is in progress, unless that claim was
+        made before `stale_before` (its process presumably died). Also
+        fails when `fingerprint` is already the domain's baseline (another
+        process generated it since the caller read the state), unless
+        `force`.
+        """
+        with self.conn:
+            cur = self.conn.execute(
+                """
+                INSERT INTO pipeline_state (domain, pending, pending_since) VALUES (?, ?, ?)
+                ON CONFLICT (domain) DO UPDATE SET pending = excluded.pending, pending_since = excluded.pending_since
+                WHERE (pipeline_state.pending IS NULL OR pipeline_state.pending_since < ?)
+                    AND (? OR pipeline_state.fingerprint IS NOT excluded.pending)
+                """,
+                (domain, fingerprint, now_iso(), stale_before, force),
+            )
+        return cur.rowcount == 1
+
+    def finish_pipeline(self, domain: str, fingerprint: Optional[str] = None,
+                        snippet_hashes: Optional[List[str]] = None, run_id: Optional[int] = None,
+                        pack_id: Optional[int] = None) -> None:
+        """Release the domain's claim; with a `fingerprint` it also becomes the new baseline"""
+        with self.conn:
+            if fingerprint is None:
+                self.conn.execute(
+                    "UPDATE pipeline_state SET pending = NULL, pending_since = NULL WHERE domain = ?", (domain,)
+                )
+                return
+            self.conn.execute(
+                """
+                UPDATE pipeline_state SET fingerprint = ?, snippet_hashes = ?, run_id = ?, pack_id = ?,
+                    updated_at = ?, pending = NULL, pending_since = NULL
+                WHERE domain = ?
+                """,
+                (fingerprint, dumps(snippet_hashes or []), run_id, pack_id, now_iso(), domain),
+            )
+
+    def reserve_spend(self, kind: str, usd: float, model: Optional[str] = None,
+                      budget: Optional[float] = None, day: Optional[str] = None) -> Optional[int]:
+        """Record an API call's estimated cost unless it would take the day's total past `budget`.
+
+        The check and the insert are one statement, so concurrent callers
+        cannot both squeeze under the budget. No `budget` always records.
+        Returns the spend id (for `release_spend`), or None when refused.
+        """
+        day = day or now_iso()[:10]
+        with self.conn:
+            cur = self.conn.execute(
+                """
+                INSERT INTO api_spend (day, kind, model, usd, created_at)
+                SELECT ?, ?, ?, ?, ?
+                WHERE ? IS NULL OR (SELECT COALESCE(SUM(usd), 0) FROM api_spend WHERE day = ?) + ? <= ?
+                """,
+                (day, kind, model, usd, now_iso(), budget, day, usd, budget),
+            )
+        return cur.lastrowid if cur.rowcount == 1 else None
+
+    def release_spend(self, spend_id: int) -> None:
+        """Drop a reserved cost whose API call failed before anything was billed"""
+        with self.conn:
+            self.conn.execute("DELETE FROM api_spend WHERE id = ?", (spend_id,))
+
+    def spend_on(self, day: Optional[str] = None) -> float:
+        """Total recorded API spend (USD) for `day` (YYYY-MM-DD, default today, UTC)"""
+        row = self.conn.execute(
+            "SELECT COALESCE(SUM(usd), 0) AS usd FROM api_spend WHERE day = ?", (day or now_iso()[:10],)
+        ).fetchone()
+        return row["usd"]
+
+    def query_runs(self, search: Optional[str] = None, status: Optional[str] = None,
+                   latest_only: bool = True, offset: int = 0, limit: int = 20) -> Tuple[List[Dict[str, Any]], int]:
+        """One page of runs, newest first, plus the total number of matches.
+
+        `search` matches domain or URL substrings, `status` is "ok" or
+        "error", and `latest_only` restricts to each domain's latest run.
+        """
+        source = "latest_runs l JOIN runs r ON r.id = l.run_id" if latest_only else "runs r"
+        clauses, args = [], []
+        if search:
+            pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            clauses.append("(r.domain LIKE ? ESCAPE '\\' OR r.url LIKE ? ESCAPE '\\')")
+            args += [pattern, pattern]
+        if status == "ok":
+            clauses.append("r.error IS NULL")
+        elif status == "error":
+            clauses.append("r.error IS NOT NULL")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        total = self.conn.execute(f"SELECT COUNT(*) FROM {source} {where}", args).fetchone()[0]  # nosec B608
+        rows = self.conn.execute(
+            f"SELECT r.* FROM {source} {where} ORDER BY r.timestamp DESC, r.id DESC LIMIT ? OFFSET ?",  # nosec B608
+            (*args, limit, offset),
+        ).fetchall()
+        return [self._row(r) for r in rows], total
+
+    def backfill(self, output_dir: str) -> int:
+        """Index results already on disk (combined signals.json and per-site files)"""
+        if not os.path.isdir(output_dir):
+            return 0
+        recorded = 0
+        combined_path = os.path.join(output_dir, "signals.json")
+        if os.path.exists(combined_path):
+            for item in _load_json_list(combined_path):
+                recorded += self._backfill_one(item, None, output_dir)
+        for fname in sorted(os.listdir(output_dir)):
+            if not fname.endswith(".json") or fname in NON_RUN_FILES:
+                continue
+            path = os.path.join(output_dir, fname)
+            for item in _load_json_list(path):
+                recorded += self._backfill_one(item, path, output_dir)
+        return recorded
+
+    def _backfill_one(self, item: Any, path: Optional[str], output_dir: str) -> int:
+        if not isinstance(item, dict) or "domain" not in item or "signals" not in item:
+            return 0
+        if path is None:
+            candidate = os.path.join(output_dir, f"{item['domain'].replace('/', '_')}.json")
+            path = candidate if os.path.exists(candidate) else None
+        self.record_run(item, path)
+        return 1
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        item = dict(row)
+        item["signal_counts"] = loads(item.get("signal_counts") or "{}")
+        item.pop("extra", None)
+        return item
+
+    @staticmethod
+    def _pack(row: sqlite3.Row) -> Dict[str, Any]:
+        item = dict(row)
+        item["pack"] = loads(item["pack"])
+        item["metadata"] = loads(item["metadata"] or "{}")
+        return item
+
+
+def _load_json_list(path: str) -> List[Any]:
+    try:
+        data = load(path)
+    except (OSError, ValueError):
+        return []
+    return data if isinstance(data, list) else [data]
+
+
+def db_version(db_path: str) -> tuple:
+    """Cheap change token for cache invalidation (WAL writes land in the -wal file)"""
+    version = []
+    for p in (db_path, db_path + "-wal"):
+        try:
+            st = os.stat(p)
+            version.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            version.append(None)
+    return tuple(version)
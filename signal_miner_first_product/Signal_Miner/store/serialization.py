@@ -0,0 +1,178 @@
+"""JSON encode/decode for every file and column the pipeline writes.
+
+orjson (`pip install orjson`) parses and serialises several times faster
+than the stdlib `json` module; without it everything falls back to
+`json` with the same results. Text is UTF-8 (no `\\uXXXX` escapes).
+
+Machine files (per-site results, combined signals.json, telemetry,
+database columns) are written compact; files people read or review
+(Decision Packs, PR previews) use `pretty=True`, indented by two spaces.
+
+    dump(result, path)                      # compact
+    dump(pack, path, pretty=True)
+    sites = load(path, schema=List[SiteResult])
+
+A `schema` is a type built from TypedDict, List, Dict, Optional/Union,
+Literal, Any and str/int/float/bool; it is compiled into a checker once
+and applied right after decoding, so malformed files fail with the path
+of the offending field (SchemaError) instead of deep inside the caller.
+Keys a TypedDict does not declare are allowed.
+"""
+import json
+from functools import lru_cache
+from typing import (Any, Callable, Dict, List, Literal, Optional, Required, TypedDict, Union, get_args,
+                    get_origin, get_type_hints, is_typeddict)
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+class SchemaError(ValueError):
+    """Decoded JSON does not match the expected schema"""
+
+
+def dumps(obj: Any, pretty: bool = False) -> str:
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        try:
+            return orjson.dumps(obj, option=option).decode("utf-8")
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib encoder handles them
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _decode(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except ValueError:
+            pass  # NaN/Infinity written by the stdlib encoder
+    return json.loads(data)
+
+
+def loads(data: Union[str, bytes], schema: Any = None) -> Any:
+    value = _decode(data)
+    return validate(value, schema) if schema is not None else value
+
+
+def dump(obj: Any, path: str, pretty: bool = False) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(dumps(obj, pretty))
+    return path
+
+
+def load(path: str, schema: Any = None) -> Any:
+    with open(path, "rb") as f:
+        return loads(f.read(), schema)
+
+
+def validate(value: Any, schema: Any) -> Any:
+    """`value` unchanged if it matches `schema`, else SchemaError"""
+    _checker(schema)(value, "$")
+    return value
+
+
+def _fail(path: str, expected: str, value: Any):
+    raise SchemaError(f"{path}: expected {expected}, got {type(value).__name__}")
+
+
+@lru_cache(maxsize=None)
+def _checker(schema: Any) -> Callable[[Any, str], None]:
+    """Compile `schema` into a function (value, path) that raises SchemaError"""
+    origin, args = get_origin(schema), get_args(schema)
+    if schema is Any:
+        return lambda value, path: None
+    if schema is None or schema is type(None):
+        def check_none(value, path):
+            if value is not None:
+                _fail(path, "null", value)
+        return check_none
+    if schema in (str, bool, int, float):
+        # JSON has no int/bool distinction to preserve, but a bool is never a number here
+        accepted = (int, float) if schema is float else schema
+
+        def check_scalar(value, path):
+            if not isinstance(value, accepted) or (schema is not bool and isinstance(value, bool)):
+                _fail(path, schema.__name__, value)
+        return check_scalar
+    if origin is Literal:
+        def check_literal(value, path):
+            if value not in args:
+                raise SchemaError(f"{path}: expected one of {list(args)}, got {value!r}")
+        return check_literal
+    if origin is Union:
+        options = [_checker(a) for a in args]
+        names = " or ".join(getattr(a, "__name__", str(a)) for a in args)
+
+        def check_union(value, path):
+            for check in options:
+                try:
+                    check(value, path)
+                    return
+                except SchemaError:
+                    continue
+            _fail(path, names, value)
+        return check_union
+    if origin in (list, List):
+        check_item = _checker(args[0] if args else Any)
+
+        def check_list(value, path):
+            if not isinstance(value, list):
+                _fail(path, "list", value)
+            for i, item in enumerate(value):
+                check_item(item, f"{path}[{i}]")
+        return check_list
+    if origin in (dict, Dict) or schema is dict:
+        check_value = _checker(args[1] if args else Any)
+
+        def check_dict(value, path):
+            if not isinstance(value, dict):
+                _fail(path, "object", value)
+            for key, item in value.items():
+                check_value(item, f"{path}.{key}")
+        return check_dict
+    if is_typeddict(schema):
+        fields = {key: _checker(tp) for key, tp in get_type_hints(schema).items()}
+        required = schema.__required_keys__
+
+        def check_typeddict(value, path):
+            if not isinstance(value, dict):
+                _fail(path, schema.__name__, value)
+            for key in required:
+                if key not in value:
+                    raise SchemaError(f"{path}: missing required field {key!r}")
+            for key, check in fields.items():
+                if key in value:
+                    check(value[key], f"{path}.{key}")
+        return check_typeddict
+    raise TypeError(f"Unsupported schema type: {schema!r}")
+
+
+class SiteResult(TypedDict, total=False):
+    """Per-site result the miner writes (output/<domain>.json and signals.json entries)"""
+    url: str
+    domain: Required[str]
+    timestamp: Required[str]
+    error: Optional[str]
+    snapshot: Optional[str]
+    signals: Dict[str, List[Any]]
+
+
+class TelemetryEvent(TypedDict, total=False):
+    action: Required[str]
+    timestamp: str
+    run_id: str
+    user_email: str
+
+
+class PrPreview(TypedDict, total=False):
+    branch_name: Required[str]
+    title: Required[str]
+    commit_message: str
+    files: Dict[str, str]
+    diffs: Dict[str, str]
+    metadata: Dict[str, Any]
@@ -0,0 +1,147 @@
+import atexit
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl  # type: ignore
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt  # type: ignore
+
+from store.serialization import TelemetryEvent, dumps, load, loads
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+@contextmanager
+def locked(f):
+    """Hold an exclusive advisory lock on an open file"""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield f
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        # msvcrt locks a byte range from the current position; lock the first byte
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            f.seek(0, os.SEEK_END)
+            yield f
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class TelemetryLog:
+    """Append-only JSONL event sink with buffered, lock-protected writes.
+
+    Events are kept in memory until `buffer_size` events are pending, then
+    appended to the file in a single locked write. A background timer
+    started by the first buffered event flushes whatever is pending
+    `flush_interval` seconds later, so a quiet session does not hold events
+    back; `events()` and process exit flush too. Cost per event does not
+    depend on how much history the file already holds.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 20, flush_interval: float = 2.0):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._buffer: List[str] = []
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def log(self, event: Dict[str, Any]) -> None:
+        """Buffer `event`, stamped with the current time unless it has a timestamp (the caller's dict is not changed)"""
+        if "timestamp" not in event:
+            event = dict(event, timestamp=now_iso())
+        line = dumps(event)
+        with self._lock:
+            self._buffer.append(line)
+            full = len(self._buffer) >= self.buffer_size
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._buffer:
+                return
+            payload = "\n".join(self._buffer) + "\n"
+            self._buffer = []
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            with locked(f):
+                f.write(payload)
+                f.flush()
+
+    def events(self, **filters) -> Iterator[Dict[str, Any]]:
+        """Flush pending events, then stream matching events from disk"""
+        self.flush()
+        return read_events(self.path, **filters)
+
+
+def read_events(path: str, action: Optional[str] = None, run_id: Optional[str] = None,
+                since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream events from a telemetry JSONL file, skipping malformed lines"""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = loads(line, TelemetryEvent)
+            except ValueError:  # includes SchemaError
+                continue
+            if action and event.get("action") != action:
+                continue
+            if run_id and event.get("run_id") != run_id:
+                continue
+            ts = event.get("timestamp", "")
+            if since and ts < since:
+                continue
+            if until and ts >= until:
+                continue
+            yield event
+
+
+def count_by_action(path: str, **filters) -> Dict[str, int]:
+    """Aggregate event counts per action for dashboards"""
+    counts: Dict[str, int] = {}
+    for event in read_events(path, **filters):
+        action = event.get("action", "unknown")
+        counts[action] = counts.get(action, 0) + 1
+    return counts
+
+
+def migrate_legacy_json(legacy_path: str, log: TelemetryLog) -> int:
+    """Move events from the old telemetry.json array into the JSONL log"""
+    if not os.path.exists(legacy_path):
+        return 0
+    try:
+        events = load(legacy_path) or []
+    except ValueError:
+        events = []
+    for event in events:
+        log.log(event)
+    log.flush()
+    os.replace(legacy_path, legacy_path + ".migrated")
+    return len(events)
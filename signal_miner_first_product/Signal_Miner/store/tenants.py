@@ -0,0 +1,151 @@
+"""Tenant workspaces: an isolated allowlist, output root and quota per customer.
+
+    workspaces/<tenant>/
+        url.txt        allowlist ("URL [interval]" per line)
+        tenant.json    quota overrides, e.g. {"max_jobs": 1, "daily_budget_usd": 2.5}
+        output/        runs.db, snippets.db, salience.db, telemetry.jsonl, decision_packs/
+
+Everything a tenant's work reads or writes (runs, packs, the embedding
+and salience caches, telemetry, API spend) lives under its output root,
+and its vectors go to a Pinecone namespace named after the tenant. No
+tenant (None) is the single-tenant layout: Signal_Miner/url.txt and
+Signal_Miner/output with the default namespace.
+
+The workspaces directory defaults to Signal_Miner/workspaces and can be
+moved with ASTRA_WORKSPACES.
+"""
+import os
+import re
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from store.run_store import RunStore, default_db_path
+from store.serialization import dump, load
+
+SIGNAL_MINER_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+TENANT_RE = re.compile(r"^[a-z0-9][a-z0-9_-]{0,62}$")
+
+# max_jobs: background jobs running at once in the shared scheduler
+# daily_budget_usd: estimated OpenAI spend per UTC day (None for no limit)
+# concurrency: crawler requests in flight for the tenant's mining runs
+DEFAULT_QUOTA: Dict[str, Any] = {"max_jobs": 2, "daily_budget_usd": 5.0, "concurrency": 4}
+
+# USD per million tokens: (input, output)
+PRICES = {
+    "text-embedding-3-small": (0.02, 0.0),
+    "text-embedding-3-large": (0.13, 0.0),
+    "text-embedding-ada-002": (0.10, 0.0),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+}
+UNKNOWN_PRICE = (5.00, 15.00)  # priced high so unknown models are not under-counted
+
+
+class QuotaExceeded(RuntimeError):
+    """A tenant's API budget for the day would be exceeded"""
+
+
+def workspaces_dir() -> str:
+    return os.environ.get("ASTRA_WORKSPACES") or os.path.join(SIGNAL_MINER_DIR, "workspaces")
+
+
+def validate_tenant(tenant: str) -> str:
+    if not TENANT_RE.match(tenant or ""):
+        raise ValueError(f"Invalid tenant {tenant!r}: use lowercase letters, digits, '-' and '_'")
+    return tenant
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int = 0) -> float:
+    price_in, price_out = PRICES.get(model, UNKNOWN_PRICE)
+    return (input_tokens * price_in + output_tokens * price_out) / 1_000_000
+
+
+class Workspace:
+    """Paths, vector namespace and quota of one tenant (or of the default layout)"""
+
+    def __init__(self, tenant: Optional[str] = None, base_dir: Optional[str] = None):
+        self.tenant = validate_tenant(tenant) if tenant else None
+        if self.tenant:
+            self.root = os.path.join(base_dir or workspaces_dir(), self.tenant)
+        else:
+            self.root = SIGNAL_MINER_DIR
+        self.urls_file = os.path.join(self.root, "url.txt")
+        self.output_dir = os.path.join(self.root, "output")
+        self.db_path = default_db_path(self.output_dir)
+        self.snippet_index = os.path.join(self.output_dir, "snippets.db")
+        self.salience_db = os.path.join(self.output_dir, "salience.db")
+        self.telemetry_path = os.path.join(self.output_dir, "telemetry.jsonl")
+        self.packs_dir = os.path.join(self.output_dir, "decision_packs")
+        self.namespace = self.tenant or ""
+        self.quota = self.load_quota()
+
+    def __repr__(self) -> str:
+        return f"Workspace({self.tenant!r})"
+
+    def load_quota(self) -> Dict[str, Any]:
+        quota = dict(DEFAULT_QUOTA)
+        path = os.path.join(self.root, "tenant.json")
+        if self.tenant and os.path.exists(path):
+            quota.update({k: v for k, v in load(path, Dict[str, Any]).items() if k in DEFAULT_QUOTA})
+        if not self.tenant:
+            quota["daily_budget_usd"] = None  # the single-tenant layout is not metered
+        return quota
+
+    def create(self, urls: Optional[List[str]] = None, **quota) -> "Workspace":
+        """Create the workspace directories, allowlist and quota file (existing files are kept)"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        if not os.path.exists(self.urls_file):
+            with open(self.urls_file, "w", encoding="utf-8") as f:
+                f.write("".join(f"{url}\n" for url in urls or []))
+        if self.tenant and quota:
+            unknown = set(quota) - set(DEFAULT_QUOTA)
+            if unknown:
+                raise ValueError(f"Unknown quota keys: {', '.join(sorted(unknown))}")
+            dump(quota, os.path.join(self.root, "tenant.json"), pretty=True)
+        self.quota = self.load_quota()
+        return self
+
+    def charge(self, kind: str, model: str, input_tokens: int, output_tokens: int = 0) -> float:
+        """Reserve the estimated cost of an API call against the daily budget.
+
+        Raises QuotaExceeded (before the call is made) when the tenant's
+        spend for the day would go over `daily_budget_usd`.
+        """
+        return self._reserve(kind, model, input_tokens, output_tokens)[1]
+
+    @contextmanager
+    def charged(self, kind: str, model: str, input_tokens: int, output_tokens: int = 0) -> Iterator[float]:
+        """`charge` around an API call: the reservation is released if the call raises"""
+        spend_id, usd = self._reserve(kind, model, input_tokens, output_tokens)
+        try:
+            yield usd
+        except BaseException:
+            with RunStore(self.db_path) as store:
+                store.release_spend(spend_id)
+            raise
+
+    def _reserve(self, kind: str, model: str, input_tokens: int, output_tokens: int) -> Tuple[int, float]:
+        usd = estimate_cost(model, input_tokens, output_tokens)
+        budget = self.quota.get("daily_budget_usd")
+        os.makedirs(self.output_dir, exist_ok=True)
+        with RunStore(self.db_path) as store:
+            spend_id = store.reserve_spend(kind, usd, model=model, budget=budget)
+            if spend_id is None:
+                spent = store.spend_on()
+                raise QuotaExceeded(f"Daily API budget of ${budget:.2f} reached for tenant "
+                                    f"{self.tenant!r} (spent ${spent:.4f}, {kind} needs ${usd:.4f})")
+        return spend_id, usd
+
+
+def list_tenants(base_dir: Optional[str] = None) -> List[str]:
+    base = base_dir or workspaces_dir()
+    if not os.path.isdir(base):
+        return []
+    return sorted(name for name in os.listdir(base)
+                  if TENANT_RE.match(name) and os.path.isdir(os.path.join(base, name)))
@@ -0,0 +1,38 @@
+import os
+import sys
+import tempfile
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def site(domain, day, headlines):
+    return {"url": f"https://{domain}/", "domain": domain, "timestamp": f"2025-01-{day:02d}T06:00:00+00:00",
+            "error": None, "snapshot": None,
+            "signals": {"headlines_paragraphs": headlines, "lists": [["Free", "Pro $49"]],
+                        "price_records": [{"amount": 49.0, "currency": "USD"}]}}
+
+
+def test_history_round_trips_and_shares_strings():
+    """Loaded history rebuilds the stored results while repeated snippets are stored once"""
+    from store.run_store import RunStore
+
+    headlines = [f"Headline {i} about the product" for i in range(10)]
+    with tempfile.TemporaryDirectory() as tmp:
+        with RunStore(os.path.join(tmp, "runs.db")) as store:
+            ids = [store.record_run(site("a.test", day, headlines[day:] + ["Fresh news"])) for day in range(1, 4)]
+            store.record_run(site("b.test", 2, headlines))
+            history = store.load_history()
+            assert [run.id for run in history if run.domain == "a.test"] == ids
+            for run in history:
+                assert history.result(run) == {k: v for k, v in store.load_result(run.id).items() if k != "snapshot"}
+            # 10 headlines + "Fresh news" + one list group + one price record
+            assert len(history.table) == 13
+            assert history.runs[0].domain is history.runs[1].domain
+            assert sum(1 for _ in history.texts("headlines_paragraphs")) == 10 + 9 + 8 + 10
+            assert history.items(history.runs[0], "price_records") == [{"amount": 49.0, "currency": "USD"}]
+
+            assert [run.timestamp[:10] for run in store.load_history("a.test", since="2025-01-02", until="2025-01-02")] \
+                == ["2025-01-02"]
+            assert store.load_history("b.test").domains() == ["b.test"]
+
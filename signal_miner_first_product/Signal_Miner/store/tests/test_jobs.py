@@ -0,0 +1,147 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def wait_for(runner, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = runner.get(job_id)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_submit_runs_handler_and_persists_result():
+    """Handlers run in the background and results land in the job table"""
+    from store.jobs import JobRunner
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        runner = JobRunner(os.path.join(temp_dir, "jobs.db"), {"echo": lambda value: {"value": value}})
+        try:
+            job = wait_for(runner, runner.submit("echo", "a.com", value=42))
+            assert job["status"] == "done"
+            assert job["result"] == {"value": 42}
+            assert job["params"] == {"value": 42}
+            assert runner.latest("echo", "a.com")["id"] == job["id"]
+        finally:
+            runner.shutdown()
+
+
+def test_failed_job_records_error():
+    """Handler exceptions mark the job failed without killing the runner"""
+    from store.jobs import JobRunner
+
+    def boom():
+        raise RuntimeError("OPENAI_API_KEY env var is required")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        runner = JobRunner(os.path.join(temp_dir, "jobs.db"), {"boom": boom})
+        try:
+            job = wait_for(runner, runner.submit("boom", "a.com"))
+            assert job["status"] == "failed"
+            assert "OPENAI_API_KEY" in job["error"]
+        finally:
+            runner.shutdown()
+
+
+def test_active_job_is_deduplicated_and_domains_run_concurrently():
+    """Same kind+key reuses the active job; different keys run side by side"""
+    from store.jobs import JobRunner
+
+    release = threading.Event()
+    started = []
+
+    def slow(domain):
+        started.append(domain)
+        release.wait(5)
+        return domain
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        runner = JobRunner(os.path.join(temp_dir, "jobs.db"), {"mine": slow}, max_workers=2)
+        try:
+            a1 = runner.submit("mine", "a.com", domain="a.com")
+            a2 = runner.submit("mine", "a.com", domain="a.com")
+            b = runner.submit("mine", "b.com", domain="b.com")
+            assert a1 == a2
+            deadline = time.time() + 5
+            while len(started) < 2 and time.time() < deadline:
+                time.sleep(0.01)
+            assert sorted(started) == ["a.com", "b.com"]
+            release.set()
+            assert wait_for(runner, a1)["result"] == "a.com"
+            assert wait_for(runner, b)["result"] == "b.com"
+            assert len(runner.list_jobs(kind="mine")) == 2
+        finally:
+            release.set()
+            runner.shutdown()
+
+
+def test_orphaned_jobs_are_interrupted_on_restart():
+    """Jobs left running by a dead process are failed when a runner starts"""
+    import sqlite3
+    from store.jobs import JobRunner
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "jobs.db")
+        JobRunner(path, {}).shutdown()
+        conn = sqlite3.connect(path)
+        with conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, key, status, owner_pid, created_at) VALUES ('x', 'mine', 'a.com', 'running', 999999999, '2024')"
+            )
+        conn.close()
+
+        runner = JobRunner(path, {"mine": lambda: None})
+        try:
+            job = runner.get("x")
+            assert job["status"] == "failed"
+            assert "interrupted" in job["error"]
+        finally:
+            runner.shutdown()
+
+
+def test_tenants_share_workers_fairly():
+    """A tenant's backlog is capped at its limit and other tenants' jobs take turns with it"""
+    from store.jobs import JobRunner
+
+    release = threading.Event()
+    started = []
+
+    def slow(domain, tenant=None):
+        started.append((tenant, domain))
+        release.wait(5)
+        return tenant
+
+    def started_count(n):
+        deadline = time.time() + 5
+        while len(started) < n and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)  # nothing else may start
+        return len(started)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        limits = {"heavy": 1, "light": 2}
+        runner = JobRunner(os.path.join(temp_dir, "jobs.db"), {"mine": slow}, max_workers=3,
+                           tenant_limit=lambda tenant: limits.get(tenant, 3))
+        try:
+            heavy = [runner.submit("mine", f"h{i}.com", tenant="heavy", domain=f"h{i}.com") for i in range(5)]
+            light = runner.submit("mine", "l.com", tenant="light", domain="l.com")
+            # same key in another tenant is a different job
+            assert runner.submit("mine", "h0.com", tenant="light", domain="h0.com") != heavy[0]
+            assert started_count(3) == 3
+            assert sorted(t for t, _ in started) == ["heavy", "light", "light"]
+            assert runner.queued("heavy") == 4 and runner.queued() == 4
+            release.set()
+            assert wait_for(runner, light)["result"] == "light"
+            assert all(wait_for(runner, job)["result"] == "heavy" for job in heavy)
+            assert len(runner.list_jobs(tenant="heavy")) == 5 and len(runner.list_jobs(tenant="")) == 0
+        finally:
+            release.set()
+            runner.shutdown()
@@ -0,0 +1,190 @@
+import json
+import os
+import sys
+import tempfile
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def make_run(domain, timestamp, error=None, headlines=2, lists=1):
+    return {
+        "url": f"https://{domain}/",
+        "domain": domain,
+        "timestamp": timestamp,
+        "error": error,
+        "snapshot": None,
+        "signals": {} if error else {
+            "headlines_paragraphs": [f"headline {i}" for i in range(headlines)],
+            "lists": [["a", "b"]] * lists,
+        },
+    }
+
+
+def test_record_run_tracks_latest_per_domain():
+    """Latest pointer follows the newest timestamp regardless of insert order"""
+    from store.run_store import RunStore
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with RunStore(os.path.join(temp_dir, "runs.db")) as store:
+            assert store.is_empty()
+            store.record_run(make_run("a.com", "2024-01-02T00:00:00+00:00", headlines=3))
+            store.record_run(make_run("a.com", "2024-01-01T00:00:00+00:00", headlines=9))
+            store.record_run(make_run("b.com", "2024-01-03T00:00:00+00:00", error="timeout"))
+
+            latest = store.latest_run("a.com")
+            assert latest["timestamp"] == "2024-01-02T00:00:00+00:00"
+            assert latest["signal_counts"] == {"headlines_paragraphs": 3, "lists": 1}
+            assert [r["domain"] for r in store.latest_runs()] == ["b.com", "a.com"]
+            assert store.latest_run("missing.com") is None
+
+
+def test_summary_counts_latest_runs_only():
+    """Signal totals come from each domain's latest run, last run from all runs"""
+    from store.run_store import RunStore
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with RunStore(os.path.join(temp_dir, "runs.db")) as store:
+            store.record_run(make_run("a.com", "2024-01-01T00:00:00+00:00", headlines=5))
+            store.record_run(make_run("a.com", "2024-01-02T00:00:00+00:00", headlines=2))
+            store.record_run(make_run("b.com", "2024-01-03T00:00:00+00:00", headlines=1, lists=0))
+            # re-recording the same run refreshes it instead of duplicating
+            store.record_run(make_run("b.com", "2024-01-03T00:00:00+00:00", headlines=4, lists=0))
+
+            summary = store.summary()
+            assert summary["last_run"] == "2024-01-03T00:00:00+00:00"
+            assert summary["domains"] == 2
+            assert summary["signals_count"] == (2 + 1) + 4
+
+
+def test_backfill_from_output_dir():
+    """Existing combined and per-site files are indexed once"""
+    from store.run_store import RunStore
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        a = make_run("a.com", "2024-01-01T00:00:00+00:00")
+        b = make_run("b.com", "2024-01-01T00:00:00+00:00")
+        with open(os.path.join(temp_dir, "signals.json"), "w") as f:
+            json.dump([a, b], f)
+        with open(os.path.join(temp_dir, "a.com.json"), "w") as f:
+            json.dump(a, f)
+        with open(os.path.join(temp_dir, "telemetry.json"), "w") as f:
+            json.dump([{"action": "approve"}], f)
+
+        with RunStore(os.path.join(temp_dir, "runs.db")) as store:
+            store.backfill(temp_dir)
+            runs = {r["domain"]: r for r in store.latest_runs()}
+            assert set(runs) == {"a.com", "b.com"}
+            assert runs["a.com"]["path"].endswith("a.com.json")
+            assert runs["b.com"]["path"] is None
+
+
+def test_db_version_changes_on_write():
+    """Cache token moves when a run is recorded"""
+    from store.run_store import RunStore, db_version
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "runs.db")
+        with RunStore(path) as store:
+            before = db_version(path)
+            store.record_run(make_run("a.com", "2024-01-01T00:00:00+00:00"))
+            assert db_version(path) != before
+
+
+def test_query_runs_paginates_and_filters():
+    """Pages, search and status filters are evaluated in SQLite"""
+    from store.run_store import RunStore
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with RunStore(os.path.join(temp_dir, "runs.db")) as store:
+            for i in range(25):
+                error = "timeout" if i % 5 == 0 else None
+                store.record_run(make_run(f"site{i:02d}.com", f"2024-01-01T00:00:{i:02d}+00:00", error=error))
+            store.record_run(make_run("site24.com", "2023-12-31T00:00:00+00:00"))
+            store.record_run(make_run("100%_off.com", "2023-12-30T00:00:00+00:00"))
+
+            page, total = store.query_runs(offset=0, limit=10)
+            assert total == 26
+            assert [r["domain"] for r in page[:2]] == ["site24.com", "site23.com"]
+            page, _ = store.query_runs(offset=20, limit=10)
+            assert len(page) == 6
+
+            _, total = store.query_runs(latest_only=False, limit=1)
+            assert total == 27
+            errors, total = store.query_runs(status="error", limit=50)
+            assert total == 5 and all(r["error"] for r in errors)
+            _, total = store.query_runs(status="ok", limit=1)
+            assert total == 21
+
+            matches, total = store.query_runs(search="site1", limit=50)
+            assert total == 10
+            matches, total = store.query_runs(search="%_", limit=50)
+            assert [r["domain"] for r in matches] == ["100%_off.com"]
+
+
+def test_load_result_rebuilds_stored_run():
+    """Signals and extra result fields come back from the store without the JSON file"""
+    from store.run_store import RunStore
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        run = make_run("a.com", "2024-01-01T00:00:00+00:00")
+        run["stream"] = {"bytes": 1024, "stopped": "limits"}
+        with RunStore(os.path.join(temp_dir, "runs.db")) as store:
+            run_id = store.record_run(run, os.path.join(temp_dir, "missing.json"))
+            assert store.load_result(run_id) == run
+            assert store.latest_result("a.com") == run
+            assert store.latest_path().endswith("missing.json")
+            assert store.load_result(run_id + 1) is None
+
+
+def test_packs_and_pr_results_by_domain():
+    """Packs link to the latest run, PR results link to packs by file path"""
+    from store.run_store import RunStore
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with RunStore(os.path.join(temp_dir, "runs.db")) as store:
+            run_id = store.record_run(make_run("a.com", "2024-01-01T00:00:00+00:00"))
+            first = store.record_pack("a.com", {"title": "one"}, path="/packs/a1.json")
+            second = store.record_pack("a.com", {"title": "two"}, path="/packs/a2.json", metadata={"model": "m"})
+            store.record_pack("b.com", {"title": "other"})
+
+            latest = store.latest_pack("a.com")
+            assert latest["id"] == second and latest["run_id"] == run_id
+            assert latest["pack"] == {"title": "two"} and latest["metadata"] == {"model": "m"}
+            assert [p["id"] for p in store.packs("a.com")] == [second, first]
+
+            store.record_pr_result("a.com", {"success": True, "mode": "preview", "url": "/previews/x.json",
+                                             "branch": "growth/x", "message": "ok"}, pack_path="/packs/a1.json")
+            results = store.pr_results("a.com")
+            assert len(results) == 1 and results[0]["pack_id"] == first and results[0]["success"] is True
+            assert store.pr_results("b.com") == []
+
+
+def test_opens_database_from_before_signals_table():
+    """Older databases gain the new column and fall back to result files"""
+    import sqlite3
+    from store.run_store import RunStore
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "runs.db")
+        run = make_run("a.com", "2024-01-01T00:00:00+00:00")
+        path = os.path.join(temp_dir, "a.com.json")
+        with open(path, "w") as f:
+            json.dump(run, f)
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            """
+            CREATE TABLE runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, domain TEXT NOT NULL, url TEXT, timestamp TEXT NOT NULL,
+                error TEXT, signal_count INTEGER NOT NULL DEFAULT 0, signal_counts TEXT NOT NULL DEFAULT '{}',
+                path TEXT, snapshot TEXT, UNIQUE (domain, timestamp)
+            )
+            """
+        )
+        conn.execute("INSERT INTO runs (domain, timestamp, signal_count, path) VALUES ('a.com', ?, 3, ?)",
+                     (run["timestamp"], path))
+        conn.commit()
+        conn.close()
+
+        with RunStore(db_path) as store:
+            assert store.load_result(1) == run
@@ -0,0 +1,50 @@
+import os
+import sys
+import tempfile
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def test_serialization_matches_stdlib():
+    """The fast path and the stdlib fallback produce the same values; pretty output is indented"""
+    import json
+
+    from store import serialization
+
+    value = {"text": "Prix: 49 €", "n": [1, 2.5, None, True], "big": 2 ** 70, 3: "int key"}
+    encoded = serialization.dumps(value)
+    assert "€" in encoded and "\n" not in encoded and ", " not in encoded
+    assert serialization.loads(encoded) == json.loads(json.dumps(value))
+    assert serialization.loads(json.dumps({"x": float("nan")}))["x"] != 0
+    assert serialization.loads(encoded.encode("utf-8")) == serialization.loads(encoded)
+    assert serialization.dumps({"a": [1]}, pretty=True) == json.dumps({"a": [1]}, indent=2)
+
+
+def test_schemas_are_checked_at_decode_time():
+    """Files that do not match their schema fail with the path of the bad field"""
+    from typing import List, Literal, Optional, TypedDict
+
+    import pytest
+    from store.serialization import SchemaError, SiteResult, dump, load, loads, validate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = dump([{"domain": "a.test", "timestamp": "t", "signals": {"lists": [["x"]]}}],
+                    os.path.join(tmp, "signals.json"))
+        assert load(path, List[SiteResult])[0]["domain"] == "a.test"
+        dump([{"domain": "a.test", "timestamp": "t", "signals": {"lists": "x"}}], path)
+        with pytest.raises(SchemaError, match=r"\$\[0\]\.signals\.lists: expected list"):
+            load(path, List[SiteResult])
+
+    class Pack(TypedDict, total=False):
+        title: str
+        confidence: Literal["low", "medium", "high"]
+        lift: Optional[float]
+
+    assert validate({"title": "t", "confidence": "high", "lift": 3}, Pack)
+    for bad, message in (({"confidence": "sure"}, "one of"), ({"lift": True}, "float or NoneType"),
+                         ({"title": 1}, "expected str")):
+        with pytest.raises(SchemaError, match=message):
+            validate(bad, Pack)
+    with pytest.raises(SchemaError, match="missing required field 'timestamp'"):
+        loads('{"domain": "a.test"}', SiteResult)
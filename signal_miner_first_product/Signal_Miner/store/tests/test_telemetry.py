@@ -0,0 +1,108 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def test_log_buffers_until_flush():
+    """Events stay in memory until the buffer fills"""
+    from store.telemetry import TelemetryLog
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "telemetry.jsonl")
+        log = TelemetryLog(path, buffer_size=3, flush_interval=60)
+
+        log.log({"action": "approve", "run_id": "a"})
+        log.log({"action": "approve", "run_id": "b"})
+        assert not os.path.exists(path)
+
+        log.log({"action": "create_pr", "run_id": "c"})
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 3
+        assert json.loads(lines[2])["action"] == "create_pr"
+        assert "timestamp" in json.loads(lines[0])
+
+
+def test_pending_events_are_flushed_after_flush_interval():
+    """A partly filled buffer is written by the timer without another log call, and events are copied"""
+    from store.telemetry import TelemetryLog
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "telemetry.jsonl")
+        log = TelemetryLog(path, buffer_size=10, flush_interval=0.1)
+
+        event = {"action": "approve", "run_id": "a"}
+        log.log(event)
+        assert event == {"action": "approve", "run_id": "a"}
+        for _ in range(50):
+            if os.path.exists(path):
+                break
+            time.sleep(0.05)
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 1 and json.loads(lines[0])["run_id"] == "a"
+
+
+def test_concurrent_writers_do_not_lose_events():
+    """Two sinks on the same file append without clobbering each other"""
+    from store.telemetry import TelemetryLog, read_events
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "telemetry.jsonl")
+        sinks = [TelemetryLog(path, buffer_size=5) for _ in range(2)]
+
+        def worker(sink, n):
+            for i in range(n):
+                sink.log({"action": "generate_pack", "run_id": f"{id(sink)}-{i}"})
+            sink.flush()
+
+        threads = [threading.Thread(target=worker, args=(s, 200)) for s in sinks for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(list(read_events(path))) == 800
+
+
+def test_read_events_filters_and_counts():
+    """Query helpers filter by action, run and time window"""
+    from store.telemetry import TelemetryLog, count_by_action, read_events
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "telemetry.jsonl")
+        log = TelemetryLog(path)
+        log.log({"action": "approve", "run_id": "x", "timestamp": "2024-01-01T00:00:00Z"})
+        log.log({"action": "create_pr", "run_id": "x", "timestamp": "2024-01-02T00:00:00Z"})
+        log.log({"action": "approve", "run_id": "y", "timestamp": "2024-01-03T00:00:00Z"})
+        log.flush()
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("{not json\n")
+
+        assert [e["run_id"] for e in read_events(path, action="approve")] == ["x", "y"]
+        assert len(list(read_events(path, run_id="x"))) == 2
+        assert len(list(read_events(path, since="2024-01-02T00:00:00Z"))) == 2
+        assert count_by_action(path) == {"approve": 2, "create_pr": 1}
+        assert list(read_events(os.path.join(temp_dir, "missing.jsonl"))) == []
+
+
+def test_migrate_legacy_json():
+    """Old telemetry.json arrays are moved into the JSONL log once"""
+    from store.telemetry import TelemetryLog, migrate_legacy_json, read_events
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        legacy = os.path.join(temp_dir, "telemetry.json")
+        with open(legacy, "w", encoding="utf-8") as f:
+            json.dump([{"action": "approve", "run_id": "old", "timestamp": "2023-12-01T00:00:00Z"}], f)
+        path = os.path.join(temp_dir, "telemetry.jsonl")
+        log = TelemetryLog(path)
+
+        assert migrate_legacy_json(legacy, log) == 1
+        assert migrate_legacy_json(legacy, log) == 0
+        assert [e["run_id"] for e in read_events(path)] == ["old"]
@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+import threading
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def test_workspaces_are_isolated():
+    """Each tenant gets its own allowlist, output root, namespace and quota"""
+    import pytest
+    from store.tenants import DEFAULT_QUOTA, Workspace, list_tenants
+
+    with tempfile.TemporaryDirectory() as tmp:
+        acme = Workspace("acme", base_dir=tmp).create(["https://acme.test/"], max_jobs=1)
+        beta = Workspace("beta", base_dir=tmp).create()
+        assert list_tenants(tmp) == ["acme", "beta"]
+        assert acme.output_dir != beta.output_dir and acme.db_path.startswith(acme.output_dir)
+        assert acme.namespace == "acme" and Workspace().namespace == ""
+        with open(acme.urls_file, encoding="utf-8") as f:
+            assert f.read() == "https://acme.test/\n"
+        assert Workspace("acme", base_dir=tmp).quota["max_jobs"] == 1
+        assert beta.quota == DEFAULT_QUOTA
+        assert Workspace().quota["daily_budget_usd"] is None
+        for bad in ("../etc", "Acme", ""):
+            with pytest.raises(ValueError):
+                Workspace(bad or "-", base_dir=tmp)
+
+
+def test_daily_budget_is_enforced_atomically():
+    """Concurrent charges never take a tenant past its budget; other tenants are unaffected"""
+    import pytest
+    from store.run_store import RunStore
+    from store.tenants import QuotaExceeded, Workspace, estimate_cost
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # one chat call of 1000 + 800 tokens on gpt-4o costs $0.0105
+        cost = estimate_cost("gpt-4o", 1000, 800)
+        acme = Workspace("acme", base_dir=tmp).create(daily_budget_usd=cost * 10)
+        beta = Workspace("beta", base_dir=tmp).create(daily_budget_usd=cost)
+        allowed, denied = [], []
+
+        def call():
+            try:
+                allowed.append(acme.charge("chat", "gpt-4o", 1000, 800))
+            except QuotaExceeded:
+                denied.append(1)
+
+        threads = [threading.Thread(target=call) for _ in range(25)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(allowed) == 10 and len(denied) == 15
+        with RunStore(acme.db_path) as store:
+            assert store.spend_on() == pytest.approx(cost * 10)
+
+        beta.charge("chat", "gpt-4o", 1000, 800)
+        with pytest.raises(QuotaExceeded, match="beta"):
+            beta.charge("embed", "text-embedding-3-small", 10)
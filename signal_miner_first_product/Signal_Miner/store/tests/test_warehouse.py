@@ -0,0 +1,87 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Add the parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+
+def make_run(domain, timestamp, pro_price):
+    return {
+        "url": f"https://{domain}/pricing",
+        "domain": domain,
+        "timestamp": timestamp,
+        "error": None,
+        "snapshot": None,
+        "signals": {
+            "headlines_paragraphs": ["Pricing that scales with your team"],
+            "lists": [["SSO", "Audit log"]],
+            "prices": [f"Pro: ${pro_price}/mo", "Business: $99/mo"],
+            "price_records": [
+                {"raw": f"${pro_price}/mo", "amount": float(pro_price), "currency": "USD", "period": "month",
+                 "unit": None, "plan": "Pro"},
+                {"raw": "$99/mo", "amount": 99.0, "currency": "USD", "period": "month", "unit": None,
+                 "plan": "Business"},
+            ],
+        },
+    }
+
+
+def test_signal_rows_flatten_results():
+    """Prices come from the structured records; lists are joined into one text"""
+    from store.warehouse import signal_rows
+
+    rows = signal_rows(make_run("a.com", "2025-01-02T10:00:00+00:00", 29))
+
+    assert [(r["signal_type"], r["text"]) for r in rows] == [
+        ("headlines_paragraphs", "Pricing that scales with your team"),
+        ("lists", "SSO; Audit log"),
+        ("prices", "$29/mo"),
+        ("prices", "$99/mo"),
+    ]
+    assert rows[2]["amount"] == 29.0 and rows[2]["plan"] == "Pro" and rows[2]["date"] == "2025-01-02"
+    assert signal_rows({"domain": "a.com", "error": "timeout", "signals": {}}) == []
+    legacy = signal_rows({"domain": "a.com", "timestamp": "2025-01-02", "signals": {"prices": ["$1,200"]}})
+    assert legacy[0]["amount"] == 1200.0 and legacy[0]["currency"] == "USD"
+
+
+def test_append_and_query_with_partition_pruning():
+    """Runs land in domain/date partitions and queries read only what they ask for"""
+    pytest.importorskip("pyarrow")
+    from store.warehouse import SignalWarehouse
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        warehouse = SignalWarehouse(os.path.join(temp_dir, "wh"))
+        warehouse.append_run(make_run("a.com", "2025-01-01T10:00:00+00:00", 29))
+        warehouse.append_run(make_run("a.com", "2025-01-05T10:00:00+00:00", 35))
+        warehouse.append_run(make_run("b.com", "2025-01-05T11:00:00+00:00", 10))
+        # re-ingesting a run replaces its file instead of duplicating rows
+        warehouse.append_run(make_run("a.com", "2025-01-05T10:00:00+00:00", 35))
+
+        assert os.path.isdir(os.path.join(temp_dir, "wh", "domain=a.com", "date=2025-01-05"))
+        table = warehouse.query(columns=["run_ts", "amount"], domain="a.com", since="2025-01-02",
+                                signal_type="prices")
+        assert table.column_names == ["run_ts", "amount"]
+        assert sorted(table.column("amount").to_pylist()) == [35.0, 99.0]
+        assert warehouse.query(domain="c.com").num_rows == 0
+
+
+def test_price_history_reports_changes():
+    """Plan price changes across runs are picked out of the history"""
+    pytest.importorskip("pyarrow")
+    from datetime import datetime, timedelta, timezone
+    from store.warehouse import SignalWarehouse, price_changes
+
+    today = datetime.now(timezone.utc)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        warehouse = SignalWarehouse(os.path.join(temp_dir, "wh"))
+        for days_ago, price in ((120, 19), (30, 29), (1, 35)):
+            warehouse.append_run(make_run("a.com", (today - timedelta(days=days_ago)).isoformat(), price))
+
+        history = warehouse.price_history("a.com", days=90)
+        changes = price_changes(history)
+
+    assert [r["amount"] for r in history if r["plan"] == "Pro"] == [29.0, 35.0]
+    assert [(c["plan"], c["previous"], c["amounts"]) for c in changes] == [("Pro", [29.0], [35.0])]
@@ -0,0 +1,179 @@
+"""Columnar signal history: one row per signal item, partitioned by domain and date.
+
+    python -m store.warehouse --warehouse output/warehouse ingest output/
+    python -m store.warehouse prices example.com --days 90
+
+Needs pyarrow (`pip install pyarrow`); nothing else in the miner does.
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from miner.prices import extract_prices
+from store.run_store import NON_RUN_FILES, _load_json_list
+
+PARTITIONS = ("domain", "date")
+
+# Column order of the dataset; price columns are null for non-price rows
+COLUMNS = [
+    ("domain", "string"), ("date", "string"), ("run_ts", "string"), ("url", "string"),
+    ("signal_type", "string"), ("position", "int32"), ("text", "string"),
+    ("amount", "float64"), ("currency", "string"), ("period", "string"), ("unit", "string"),
+    ("plan", "string"),
+]
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("The signal warehouse needs pyarrow: pip install pyarrow") from e
+    return pa, ds, pq
+
+
+def signal_rows(result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten one per-site result into warehouse rows"""
+    if result.get("error") or not result.get("signals"):
+        return []
+    timestamp = result.get("timestamp", "")
+    base = {"domain": result.get("domain", "unknown"), "date": timestamp[:10], "run_ts": timestamp,
+            "url": result.get("url")}
+    rows = []
+    signals = result["signals"]
+    for signal_type, items in signals.items():
+        if signal_type == "price_records" or not isinstance(items, list):
+            continue
+        if signal_type == "prices":
+            # structured records carry the same prices plus amount/currency/period;
+            # results mined before the price engine only have the display strings
+            records = signals.get("price_records")
+            if not isinstance(records, list):
+                records = [r for item in items for r in extract_prices(str(item))[:1]]
+            for i, record in enumerate(records):
+                rows.append({**base, "signal_type": "prices", "position": i, "text": record.get("raw"),
+                             "amount": record.get("amount"), "currency": record.get("currency"),
+                             "period": record.get("period"), "unit": record.get("unit"),
+                             "plan": record.get("plan")})
+            continue
+        for i, item in enumerate(items):
+            text = "; ".join(map(str, item)) if isinstance(item, list) else str(item)
+            rows.append({**base, "signal_type": signal_type, "position": i, "text": text})
+    return rows
+
+
+class SignalWarehouse:
+    """Parquet dataset under `root`, hive-partitioned as domain=<d>/date=<YYYY-MM-DD>/.
+
+    Each run is written as its own file named after the run timestamp, so
+    re-ingesting a run replaces it rather than duplicating rows. Queries go
+    through pyarrow.dataset: domain and date filters prune whole
+    directories, other filters are checked against row-group statistics,
+    and only the requested columns are read.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.pa, self.ds, self.pq = _arrow()
+        pa = self.pa
+        self.schema = pa.schema([(name, getattr(pa, kind)()) for name, kind in COLUMNS])
+        self.partitioning = self.ds.partitioning(
+            pa.schema([(name, pa.string()) for name in PARTITIONS]), flavor="hive"
+        )
+
+    def append_run(self, result: Dict[str, Any]) -> int:
+        rows = signal_rows(result)
+        if not rows:
+            return 0
+        table = self.pa.Table.from_pylist(rows, schema=self.schema)
+        stamp = "".join(ch for ch in rows[0]["run_ts"] if ch.isalnum()) or "run"
+        self.pq.write_to_dataset(
+            table, self.root, partitioning=self.partitioning,
+            basename_template=f"{stamp}-{{i}}.parquet", existing_data_behavior="overwrite_or_ignore",
+        )
+        return len(rows)
+
+    def ingest_dir(self, output_dir: str) -> int:
+        """Append every per-site result file found in a miner output directory"""
+        written = 0
+        for fname in sorted(os.listdir(output_dir)):
+            if fname.endswith(".json") and fname not in NON_RUN_FILES:
+                for item in _load_json_list(os.path.join(output_dir, fname)):
+                    if isinstance(item, dict) and "signals" in item:
+                        written += self.append_run(item)
+        return written
+
+    def _dataset(self):
+        return self.ds.dataset(self.root, format="parquet", partitioning=self.partitioning, schema=self.schema)
+
+    def query(self, columns: Optional[Sequence[str]] = None, domain: Optional[str] = None,
+              since: Optional[str] = None, until: Optional[str] = None,
+              signal_type: Optional[str] = None):
+        """Matching rows as a pyarrow Table; `since`/`until` are inclusive YYYY-MM-DD dates"""
+        if not os.path.isdir(self.root):
+            return self.schema.empty_table().select(list(columns or self.schema.names))
+        field = self.ds.field
+        predicate = None
+        for condition in (
+            field("domain") == domain if domain else None,
+            field("date") >= since if since else None,
+            field("date") <= until if until else None,
+            field("signal_type") == signal_type if signal_type else None,
+        ):
+            if condition is not None:
+                predicate = condition if predicate is None else predicate & condition
+        return self._dataset().to_table(columns=list(columns) if columns else None, filter=predicate)
+
+    def price_history(self, domain: str, days: int = 90) -> List[Dict[str, Any]]:
+        """Every price seen for `domain` in the last `days` days, oldest run first"""
+        since = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d")
+        table = self.query(
+            columns=["run_ts", "plan", "amount", "currency", "period", "unit", "text"],
+            domain=domain, since=since, signal_type="prices",
+        )
+        return sorted(table.to_pylist(), key=lambda r: (r["run_ts"], r["plan"] or "", r["amount"] or 0))
+
+
+def price_changes(history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Runs where the amounts listed for a plan differ from the previous run that listed it"""
+    runs: Dict[str, Dict[Any, set]] = {}
+    for row in history:
+        key = (row["plan"], row["currency"], row["period"], row["unit"])
+        runs.setdefault(row["run_ts"], {}).setdefault(key, set()).add(row["amount"])
+    last: Dict[Any, set] = {}
+    changes = []
+    for run_ts in sorted(runs):
+        for key, amounts in runs[run_ts].items():
+            previous = last.get(key)
+            if previous is not None and previous != amounts:
+                plan, currency, period, unit = key
+                changes.append({"run_ts": run_ts, "plan": plan, "currency": currency, "period": period,
+                                "unit": unit, "previous": sorted(previous), "amounts": sorted(amounts)})
+            last[key] = amounts
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Signal warehouse (Parquet) ingest and queries")
+    parser.add_argument("--warehouse", default=os.path.join("output", "warehouse"), help="dataset directory")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="append per-site results from a miner output directory")
+    ingest.add_argument("output_dir", nargs="?", default="output")
+    prices = sub.add_parser("prices", help="price history and changes for one domain")
+    prices.add_argument("domain")
+    prices.add_argument("--days", type=int, default=90)
+    args = parser.parse_args()
+
+    warehouse = SignalWarehouse(args.warehouse)
+    if args.command == "ingest":
+        print(f"[INFO] Wrote {warehouse.ingest_dir(args.output_dir)} rows to {args.warehouse}")
+    else:
+        history = warehouse.price_history(args.domain, args.days)
+        print(json.dumps({"history": history, "changes": price_changes(history)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
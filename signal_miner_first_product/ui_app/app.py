@@ -1,8 +1,7 @@
 import json
 import os
 import sys
-from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 import streamlit as st
 
@@ -11,7 +10,16 @@ SIGNAL_MINER_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."
 sys.path.insert(0, SIGNAL_MINER_PATH)
 
 OUTPUT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Signal_Miner", "output"))
-TELEMETRY_PATH = os.path.join(OUTPUT_DIR, "telemetry.json")
+LEGACY_TELEMETRY_PATH = os.path.join(OUTPUT_DIR, "telemetry.json")
+# one job table and scheduler for every workspace, so quotas are enforced across tenants
+JOBS_DB_PATH = os.path.join(OUTPUT_DIR, "jobs.db")
+DEFAULT_WORKSPACE = "(default)"
+
+
+def _workspace():
+    """The workspace selected in the sidebar (paths, namespace and quota)"""
+    from store.tenants import Workspace
+    return Workspace(st.session_state.get("tenant"))
 
 
 def _get_demo_password() -> str:
@@ -21,49 +29,137 @@ def _get_demo_password() -> str:
         return ""
 
 
+@st.cache_resource
+def _telemetry_log(path: str):
+    from store.telemetry import TelemetryLog, migrate_legacy_json
+    log = TelemetryLog(path)
+    if os.path.dirname(path) == OUTPUT_DIR:
+        migrate_legacy_json(LEGACY_TELEMETRY_PATH, log)
+    return log
+
+
 def _log_telemetry(action: str, run: Dict[str, Any], user_email: str = "") -> None:
     try:
-        os.makedirs(OUTPUT_DIR, exist_ok=True)
-        events = []
-        if os.path.exists(TELEMETRY_PATH):
-            with open(TELEMETRY_PATH, "r", encoding="utf-8") as f:
-                try:
-                    events = json.load(f) or []
-                except Exception:
-                    events = []
         run_id = f"{run.get('domain','unknown')}__{run.get('timestamp','')}"
-        events.append({
+        _telemetry_log(_workspace().telemetry_path).log({
             "run_id": run_id,
             "user_email": user_email or st.session_state.get("user_email", ""),
             "action": action,
-            "timestamp": datetime.utcnow().isoformat() + "Z",
         })
-        with open(TELEMETRY_PATH, "w", encoding="utf-8") as f:
-            json.dump(events, f, indent=2)
     except Exception:
         # Best-effort; do not break UI on telemetry errors
         pass
 
 
-def load_combined() -> List[Dict[str, Any]]:
-    combined_path = os.path.join(OUTPUT_DIR, "signals.json")
-    if os.path.exists(combined_path):
-        with open(combined_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    # Fallback: read all *.json files excluding signals.json
-    items = []
-    for fname in os.listdir(OUTPUT_DIR):
-        if not fname.endswith(".json"):
-            continue
-        if fname == "signals.json":
-            continue
-        with open(os.path.join(OUTPUT_DIR, fname), "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-                items.append(data)
-            except Exception:
-                continue
-    return items
+RUNS_PAGE_SIZES = [10, 25, 50, 100]
+EVIDENCE_PAGE_SIZE = 10
+STATUS_FILTERS = {"All": None, "OK": "ok", "Errors": "error"}
+
+
+def _run_store(db_path: Optional[str] = None):
+    from store.run_store import RunStore
+    workspace = _workspace()
+    store = RunStore(db_path or workspace.db_path)
+    if store.is_empty():
+        store.backfill(os.path.dirname(db_path) if db_path else workspace.output_dir)
+    return store
+
+
+@st.cache_data(show_spinner=False)
+def load_run_summary(db_path: str, version: tuple) -> Dict[str, Any]:
+    """Dashboard headline stats from the run index; `db_path` and `version` key the cache"""
+    with _run_store(db_path) as store:
+        return store.summary()
+
+
+@st.cache_data(show_spinner=False)
+def load_run_page(db_path: str, version: tuple, search: str, status: str, latest_only: bool,
+                  page: int, page_size: int) -> Dict[str, Any]:
+    """One page of the run list, filtered in SQLite"""
+    with _run_store(db_path) as store:
+        runs, total = store.query_runs(search=search or None, status=status, latest_only=latest_only,
+                                       offset=page * page_size, limit=page_size)
+    return {"runs": runs, "total": total}
+
+
+def _run_index_version() -> tuple:
+    from store.run_store import db_version
+    return db_version(_workspace().db_path)
+
+
+# jobs run on worker threads, so they get their tenant explicitly rather than from the session
+def _job_mine(url: str, tenant: Optional[str] = None) -> Dict[str, Any]:
+    from signal_miner import mine_and_record
+    from store.tenants import Workspace
+    return mine_and_record(url, out_dir=Workspace(tenant).output_dir)
+
+
+def _job_generate_pack(run_path: Optional[str] = None, run_id: Optional[int] = None,
+                       tenant: Optional[str] = None) -> Dict[str, Any]:
+    from rfg.generate_pack import generate_pack_for_run
+    from store.tenants import Workspace
+    return generate_pack_for_run(run_path, run_id=run_id, db_path=Workspace(tenant).db_path, tenant=tenant)
+
+
+def _tenant_job_limit(tenant: str) -> int:
+    from store.tenants import Workspace
+    return Workspace(tenant or None).quota["max_jobs"]
+
+
+@st.cache_resource
+def _job_runner():
+    from store.jobs import JobRunner
+    return JobRunner(JOBS_DB_PATH, handlers={"mine": _job_mine, "generate_pack": _job_generate_pack},
+                     tenant_limit=_tenant_job_limit)
+
+
+def _read_allowlist() -> List[str]:
+    from miner.daemon import load_allowlist
+    path = _workspace().urls_file
+    return list(load_allowlist(path)) if os.path.exists(path) else []
+
+
+def _jobs_table(jobs: List[Dict[str, Any]]):
+    st.dataframe(
+        [{"target": j["key"], "status": j["status"], "created": j["created_at"], "error": j["error"] or ""} for j in jobs],
+        use_container_width=True, hide_index=True,
+    )
+
+
+@st.fragment(run_every=2)
+def _live_jobs(kind: str):
+    """Poll active jobs without rerunning the page; full rerun once they settle"""
+    jobs = _job_runner().list_jobs(kind=kind, tenant=_workspace().tenant or "", limit=10)
+    _jobs_table(jobs)
+    if not any(j["status"] in ("queued", "running") for j in jobs):
+        st.rerun()
+
+
+def render_jobs(kind: str):
+    jobs = _job_runner().list_jobs(kind=kind, tenant=_workspace().tenant or "", limit=10)
+    if any(j["status"] in ("queued", "running") for j in jobs):
+        _live_jobs(kind)
+    elif jobs:
+        with st.expander("Recent jobs", expanded=False):
+            _jobs_table(jobs)
+
+
+@st.fragment(run_every=2)
+def _pack_job_status(domain: str, run: Dict[str, Any]):
+    """Poll this session's pack job and load the result into the editor when done"""
+    job_key = f"pack-job-{domain}"
+    job = _job_runner().get(st.session_state[job_key])
+    if job is None or job["status"] in ("queued", "running"):
+        st.info("Generating Decision Pack in the background...")
+        return
+    del st.session_state[job_key]
+    if job["status"] == "done":
+        st.session_state[f"pack-{domain}"] = job["result"]["pack"]
+        st.session_state[f"metadata-{domain}"] = job["result"]["metadata"]
+        _log_telemetry("generate_pack", run)
+    else:
+        st.session_state[f"pack-error-{domain}"] = job["error"]
+    st.rerun()
 
 
 def card(title: str, body: str, key: str):
@@ -76,60 +172,104 @@ def page_dashboard():
     st.title("GrowthSignal Dashboard")
     st.caption("Ship evidence-backed growth experiments in 48 hours.")
 
-    data = load_combined()
-    last_run_time = None
-    signals_count = 0
-    for item in data:
-        ts = item.get("timestamp")
-        if ts:
-            try:
-                t = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-                if last_run_time is None or t > last_run_time:
-                    last_run_time = t
-            except Exception:
-                pass
-        signals = item.get("signals", {})
-        for k, v in signals.items():
-            if isinstance(v, list):
-                signals_count += len(v)
+    version = _run_index_version()
+    db_path = _workspace().db_path
+    summary = load_run_summary(db_path, version)
 
     cols = st.columns(3)
     with cols[0]:
-        card("Last run", last_run_time.isoformat() if last_run_time else "—", "last_run")
+        card("Last run", summary["last_run"] or "—", "last_run")
     with cols[1]:
-        card("Extracted signals", f"{signals_count}", "sig_count")
+        card("Extracted signals", f"{summary['signals_count']}", "sig_count")
     with cols[2]:
         if st.button("Run miner", use_container_width=True):
-            st.info("Run miner from terminal: python Signal_Miner/signal_miner.py")
+            urls = _read_allowlist()
+            runner = _job_runner()
+            for url in urls:
+                runner.submit("mine", url, tenant=_workspace().tenant, url=url)
+            st.info(f"Queued {len(urls)} mining job(s).")
+    render_jobs("mine")
 
     st.markdown("### Last runs")
-    for item in data:
+    f1, f2, f3, f4 = st.columns([2, 1, 1, 1])
+    with f1:
+        search = st.text_input("Search domain or URL", key="runs_search")
+    with f2:
+        status = STATUS_FILTERS[st.selectbox("Status", list(STATUS_FILTERS), key="runs_status")]
+    with f3:
+        page_size = st.selectbox("Per page", RUNS_PAGE_SIZES, key="runs_page_size")
+    with f4:
+        latest_only = not st.checkbox("Include history", key="runs_history")
+
+    # reset to the first page whenever the filters change
+    filters = (search, status, latest_only, page_size)
+    if st.session_state.get("runs_filters") != filters:
+        st.session_state["runs_filters"] = filters
+        st.session_state["runs_page"] = 0
+    page = st.session_state.get("runs_page", 0)
+
+    result = load_run_page(db_path, version, search, status, latest_only, page, page_size)
+    total = result["total"]
+    pages = max(1, (total + page_size - 1) // page_size)
+
+    for item in result["runs"]:
         domain = item.get("domain", "unknown")
         ts = item.get("timestamp", "—")
         error = item.get("error")
         with st.container(border=True):
             st.write(f"**{domain}**  ")
-            st.write(f"Time: {ts}")
+            st.write(f"Time: {ts} · Signals: {item.get('signal_count', 0)}")
             if error:
                 st.warning(f"Error: {error}")
-            if st.button("View run", key=f"view-{domain}"):
+            if st.button("View run", key=f"view-{item['id']}"):
                 st.session_state["selected_run"] = domain
+                st.session_state["selected_run_id"] = item["id"]
                 st.session_state["page"] = "detail"
-                st.experimental_rerun()
-
-
-def load_run(domain: str) -> Dict[str, Any]:
-    safe_name = domain.replace("/", "_")
-    path = os.path.join(OUTPUT_DIR, f"{safe_name}.json")
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    # fallback: best-effort
-    data = load_combined()
-    for item in data:
-        if item.get("domain") == domain:
-            return item
-    return {}
+                st.rerun()
+
+    prev_col, info_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        if st.button("← Previous", disabled=page == 0, use_container_width=True):
+            st.session_state["runs_page"] = page - 1
+            st.rerun()
+    with info_col:
+        st.caption(f"Page {page + 1} of {pages} · {total} runs")
+    with next_col:
+        if st.button("Next →", disabled=page + 1 >= pages, use_container_width=True):
+            st.session_state["runs_page"] = page + 1
+            st.rerun()
+
+
+def load_run(domain: str, run_id: Optional[int] = None) -> Dict[str, Any]:
+    """Selected run (or the domain's latest) from the run store, with its store id"""
+    with _run_store() as store:
+        if run_id is None:
+            latest = store.latest_run(domain)
+            run_id = latest["id"] if latest else None
+        run = store.load_result(run_id) if run_id is not None else None
+    return {**run, "run_id": run_id} if run else {}
+
+
+def load_history(domain: str) -> Dict[str, Any]:
+    with _run_store() as store:
+        return {"packs": store.packs(domain, limit=5), "pr_results": store.pr_results(domain, limit=5)}
+
+
+def render_evidence(domain: str, key: str, items: List[Any], expanded: bool):
+    """Evidence section that is only rendered when opened, one page at a time"""
+    if not st.toggle(f"{key} ({len(items)})", value=expanded, key=f"ev-{domain}-{key}"):
+        return
+    shown_key = f"ev-shown-{domain}-{key}"
+    shown = st.session_state.get(shown_key, EVIDENCE_PAGE_SIZE)
+    lines = []
+    for i, it in enumerate(items[:shown]):
+        snippet = "; ".join(it) if isinstance(it, list) else str(it)
+        lines.append(f"{i+1}. {snippet}")
+    st.markdown("\n".join(lines))
+    if shown < len(items):
+        if st.button(f"Show more ({len(items) - shown} left)", key=f"ev-more-{domain}-{key}"):
+            st.session_state[shown_key] = shown + EVIDENCE_PAGE_SIZE
+            st.rerun()
 
 
 def page_detail():
@@ -138,10 +278,10 @@ def page_detail():
         st.info("Select a run from Dashboard.")
         if st.button("Back to Dashboard"):
             st.session_state["page"] = "dashboard"
-            st.experimental_rerun()
+            st.rerun()
         return
 
-    run = load_run(domain)
+    run = load_run(domain, st.session_state.get("selected_run_id"))
     st.title(f"Run: {domain}")
     st.caption(run.get("url", ""))
 
@@ -169,59 +309,26 @@ def page_detail():
     with col_left:
         st.subheader("Evidence")
         signals = run.get("signals", {})
-        for key, items in signals.items():
-            with st.expander(key, expanded=True):
-                for i, it in enumerate(items):
-                    snippet = "; ".join(it) if isinstance(it, list) else str(it)
-                    st.write(f"{i+1}. {snippet}")
+        for n, (key, items) in enumerate(signals.items()):
+            render_evidence(domain, key, items, expanded=n == 0)
 
     with col_center:
         st.subheader("Decision Pack")
         
-        # Auto-generate button
+        # Auto-generate button (runs as a background job)
         if st.button("🚀 Auto-generate Decision Pack", type="primary"):
-            try:
-                # Show loading state
-                with st.spinner("Generating Decision Pack..."):
-                    # Import the RAG module
-                    from rfg.generate_pack import generate_pack_for_run
-                    
-                    # Get the run file path
-                    safe_name = domain.replace("/", "_")
-                    run_path = os.path.join(OUTPUT_DIR, f"{safe_name}.json")
-                    
-                    if not os.path.exists(run_path):
-                        st.error(f"Run file not found: {run_path}")
-                        return
-                    
-                    # Generate the pack
-                    result = generate_pack_for_run(run_path)
-                    pack = result["pack"]
-                    metadata = result["metadata"]
-                    
-                    # Store in session state
-                    pack_key = f"pack-{domain}"
-                    st.session_state[pack_key] = pack
-                    st.session_state[f"metadata-{domain}"] = metadata
-                    
-                    st.success("Decision Pack generated successfully!")
-                    _log_telemetry("generate_pack", run)
-                    
-                    # Show metadata
-                    with st.expander("Generation Details", expanded=True):
-                        st.write(f"**Model:** {metadata['model']}")
-                        st.write(f"**Embedding Model:** {metadata['embed_model']}")
-                        st.write(f"**Embedding Time:** {metadata['embed_ms']}ms")
-                        
-                        st.write("**Top Citations:**")
-                        for i, citation in enumerate(metadata['citations'][:5], 1):
-                            st.write(f"{i}. Score: {citation['score']:.3f} | {citation['snippet']}")
-                
-                st.experimental_rerun()
-                
-            except Exception as e:
-                st.error(f"Generation failed: {str(e)}")
-                st.info("Please check your OPENAI_API_KEY environment variable and try again, or edit manually.")
+            if not run.get("run_id"):
+                st.error(f"No stored run for {domain}")
+                return
+            st.session_state[f"pack-job-{domain}"] = _job_runner().submit(
+                "generate_pack", domain, tenant=_workspace().tenant, run_id=run["run_id"])
+
+        if f"pack-job-{domain}" in st.session_state:
+            _pack_job_status(domain, run)
+        pack_error = st.session_state.pop(f"pack-error-{domain}", None)
+        if pack_error:
+            st.error(f"Generation failed: {pack_error}")
+            st.info("Please check your OPENAI_API_KEY environment variable and try again, or edit manually.")
         
         # Show generation metadata if available
         metadata_key = f"metadata-{domain}"
@@ -278,7 +385,8 @@ def page_detail():
         if st.button("💾 Save Decision Pack"):
             try:
                 from rfg.generate_pack import save_pack
-                outfile = save_pack(pack, domain)
+                outfile = save_pack(pack, domain, metadata=st.session_state.get(metadata_key),
+                                    run_id=run.get("run_id"), tenant=_workspace().tenant)
                 st.success(f"Saved to: {outfile}")
             except Exception as e:
                 st.error(f"Save failed: {str(e)}")
@@ -324,7 +432,8 @@ def page_detail():
                 
                 # Save pack to file
                 from rfg.generate_pack import save_pack
-                pack_path = save_pack(pack, domain)
+                pack_path = save_pack(pack, domain, metadata=st.session_state.get(f"metadata-{domain}"),
+                                      run_id=run.get("run_id"), tenant=_workspace().tenant)
                 
                 # Generate landing page HTML from LP snippet
                 lp_html = f"""
@@ -364,7 +473,8 @@ def page_detail():
                         lp_html=lp_html,
                         domain=domain,
                         github_token=github_token if github_token else None,
-                        github_repo=github_repo if github_repo else None
+                        github_repo=github_repo if github_repo else None,
+                        db_path=_workspace().db_path
                     )
                 
                 if result["success"]:
@@ -387,18 +497,38 @@ def page_detail():
                 st.error(f"Failed to create PR: {str(e)}")
                 st.info("Check your GitHub token and repository settings")
 
+    history = load_history(domain)
+    if history["packs"] or history["pr_results"]:
+        with st.expander("History", expanded=False):
+            for item in history["packs"]:
+                st.write(f"Pack · {item['created_at']} · {item['pack'].get('title') or 'untitled'}")
+            for item in history["pr_results"]:
+                outcome = item["mode"] if item["success"] else "failed"
+                st.write(f"PR · {item['created_at']} · {outcome} · {item['url'] or item['message']}")
+
     if st.button("Back to Dashboard"):
         st.session_state["page"] = "dashboard"
-        st.experimental_rerun()
+        st.rerun()
 
 
 def page_settings():
     st.title("Settings")
     st.caption("Configuration for miner and APIs")
 
-    allowed_domains_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "Signal_Miner", "url.txt"))
+    workspace = _workspace()
+    allowed_domains_path = workspace.urls_file
     apis_path = os.path.join(OUTPUT_DIR, "api_keys.json")
 
+    if workspace.tenant:
+        from store.run_store import RunStore
+        quota = workspace.quota
+        with RunStore(workspace.db_path) as store:
+            spent = store.spend_on()
+        st.subheader(f"Workspace: {workspace.tenant}")
+        budget = quota["daily_budget_usd"]
+        st.write(f"Jobs at once: {quota['max_jobs']} · Crawl concurrency: {quota['concurrency']} · "
+                 f"API spend today: ${spent:.4f}" + (f" of ${budget:.2f}" if budget is not None else ""))
+
     st.subheader("Allowlist URLs")
     allow_text = ""
     if os.path.exists(allowed_domains_path):
@@ -406,6 +536,7 @@ def page_settings():
             allow_text = f.read()
     allow_text_new = st.text_area("One URL per line", value=allow_text, height=200)
     if st.button("Save allowlist"):
+        os.makedirs(os.path.dirname(allowed_domains_path), exist_ok=True)
         with open(allowed_domains_path, "w", encoding="utf-8") as f:
             f.write(allow_text_new)
         st.success("Saved allowlist.")
@@ -424,6 +555,15 @@ def page_settings():
 def main():
     st.set_page_config(page_title="GrowthSignal", page_icon="🚀", layout="wide")
 
+    from store.tenants import list_tenants
+    choice = st.sidebar.selectbox("Workspace", [DEFAULT_WORKSPACE] + list_tenants())
+    tenant = None if choice == DEFAULT_WORKSPACE else choice
+    if st.session_state.get("tenant") != tenant:
+        # runs and jobs of the previous workspace are not visible in this one
+        for key in ("selected_run", "selected_run_id", "runs_page"):
+            st.session_state.pop(key, None)
+        st.session_state["tenant"] = tenant
+
     tabs = st.sidebar.radio("Navigate", ["Dashboard", "Run detail", "Settings"])  # simple routing
     if tabs == "Dashboard":
         st.session_state["page"] = "dashboard"